@@ -0,0 +1,46 @@
+"""Add transaction query indexes
+
+Revision ID: add_transaction_query_indexes
+Revises: add_region_table
+Create Date: 2025-08-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_transaction_query_indexes'
+down_revision = 'add_region_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Create the composite and partial indexes used by transaction queries.
+    """
+    op.create_index(
+        'ix_transactions_constituency_timestamp',
+        'transactions',
+        ['constituency_id', 'timestamp'],
+        unique=False,
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_transactions_constituency_anomaly',
+        'transactions',
+        ['constituency_id'],
+        unique=False,
+        postgresql_where=sa.text('anomaly_detected = true'),
+        sqlite_where=sa.text('anomaly_detected = 1'),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    """
+    Drop the transaction query indexes.
+    """
+    op.drop_index('ix_transactions_constituency_anomaly', table_name='transactions')
+    op.drop_index('ix_transactions_constituency_timestamp', table_name='transactions')
@@ -0,0 +1,48 @@
+"""Add transaction search trigram index
+
+Revision ID: add_transaction_search_index
+Revises: add_transaction_query_indexes
+Create Date: 2025-08-14
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_transaction_search_index'
+down_revision = 'add_transaction_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Create the trigram index used by transaction search (PostgreSQL only).
+    
+    The expression must match app.models.transaction.search_document as of
+    this revision, or PostgreSQL will not use the index for searches.
+    """
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_search_trgm ON transactions "
+        "USING gin (("
+        "coalesce(id, '') || ' ' || "
+        "coalesce(constituency_id, '') || ' ' || "
+        "coalesce(type, '') || ' ' || "
+        "coalesce(status, '') || ' ' || "
+        "coalesce(source, '') || ' ' || "
+        "coalesce(file_id, '') || ' ' || "
+        "coalesce(anomaly_reason, '')"
+        ") gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    """
+    Drop the transaction search trigram index.
+    """
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS ix_transactions_search_trgm')
@@ -0,0 +1,35 @@
+"""Add transaction constituency/type index
+
+Revision ID: add_transaction_type_index
+Revises: add_transaction_search_index
+Create Date: 2025-08-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_transaction_type_index'
+down_revision = 'add_transaction_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Create the index used by per-constituency transaction counts by type.
+    """
+    op.create_index(
+        'ix_transactions_constituency_type',
+        'transactions',
+        ['constituency_id', 'type'],
+        unique=False,
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    """
+    Drop the transaction constituency/type index.
+    """
+    op.drop_index('ix_transactions_constituency_type', table_name='transactions')
@@ -2,7 +2,7 @@ from typing import AsyncGenerator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.database import get_db
+from app.models.database import get_db, SessionLocal
 from app.services.health import HealthService
 from app.services.constituency import ConstituencyService
 from app.services.election import ElectionService
@@ -43,7 +43,7 @@ async def get_transaction_validator_instance():
 async def get_transaction_batch_processor_instance(db: AsyncSession = Depends(get_db)):
     """Dependency for transaction batch processor"""
     TransactionBatchProcessor = get_transaction_batch_processor()
-    return TransactionBatchProcessor(db)
+    return TransactionBatchProcessor(db, session_factory=SessionLocal)
 
 async def get_transaction_query_service_instance(db: AsyncSession = Depends(get_db)):
     """Dependency for transaction query service"""
@@ -7,6 +7,7 @@ This module provides a generic CRUD class for database operations.
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.models.database import Base
@@ -40,6 +41,9 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Get a record by ID.
         
+        Session.get returns the instance from the identity map when it is
+        already loaded, so repeated lookups within a session skip the SELECT.
+        
         Args:
             db: Database session
             id: ID of the record to get
@@ -47,7 +51,7 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             The record if found, None otherwise
         """
-        return db.query(self.model).filter(self.model.id == id).first()
+        return db.get(self.model, id)
     
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
@@ -147,7 +151,7 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             The number of records
         """
-        return db.query(self.model).count()
+        return db.scalar(select(func.count()).select_from(self.model))
     
     def exists(self, db: Session, id: Any) -> bool:
         """
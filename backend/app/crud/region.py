@@ -4,7 +4,8 @@ CRUD operations for regions.
 This module provides functions for creating, reading, updating, and deleting regions.
 """
 
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.models.region import Region
@@ -22,7 +23,7 @@ def get(db: Session, id: str) -> Optional[Region]:
     Returns:
         Region if found, None otherwise
     """
-    return db.query(Region).filter(Region.id == id).first()
+    return db.get(Region, id)
 
 
 def get_by_name(db: Session, name: str) -> Optional[Region]:
@@ -137,4 +138,46 @@ def create_or_update(db: Session, id: str, name: str, country: str = "Russia") -
         db.refresh(db_region)
         return db_region
     else:
-        return create(db, RegionCreate(id=id, name=name, country=country))
\ No newline at end of file
+        return create(db, RegionCreate(id=id, name=name, country=country))
+
+
+def bulk_create_or_update(db: Session, regions: Iterable[Tuple[str, str, str]]) -> int:
+    """
+    Create or update several regions with a single upsert statement.
+    
+    Uses INSERT ... ON CONFLICT (id) DO UPDATE on PostgreSQL and SQLite and
+    falls back to create_or_update for other databases. When the same ID
+    appears more than once, the last entry wins.
+    
+    Args:
+        db: Database session
+        regions: (id, name, country) tuples
+        
+    Returns:
+        Number of distinct regions written
+    """
+    rows = {
+        region_id: {"id": region_id, "name": name, "country": country}
+        for region_id, name, country in regions
+    }
+    if not rows:
+        return 0
+    
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        for row in rows.values():
+            create_or_update(db, row["id"], row["name"], row["country"])
+        return len(rows)
+    
+    stmt = insert(Region).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Region.id],
+        set_={"name": stmt.excluded.name, "country": stmt.excluded.country}
+    )
+    db.execute(stmt)
+    db.commit()
+    return len(rows)
\ No newline at end of file
@@ -4,10 +4,11 @@ Transaction CRUD operations for the Election Monitoring System.
 This module provides CRUD operations for the Transaction model.
 """
 
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc, and_
+from sqlalchemy import func, desc, asc, and_, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 
 from .base import BaseCRUD
 from app.models.transaction import Transaction
@@ -34,6 +35,29 @@ class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, TransactionUpdate
         """
         return db.query(Transaction).filter(Transaction.constituency_id == constituency_id).all()
     
+    def get_by_constituency_stream(
+        self, db: Session, *, constituency_id: str, chunk_size: int = 1000
+    ) -> Iterator[Transaction]:
+        """
+        Iterate over a constituency's transactions without loading them all.
+        
+        Rows are fetched from the cursor chunk_size at a time, so memory stays
+        bounded for constituencies with many transactions.
+        
+        Args:
+            db: Database session
+            constituency_id: ID of the constituency to get transactions for
+            chunk_size: Number of rows fetched per round-trip
+            
+        Returns:
+            Iterator over the constituency's transactions
+        """
+        return iter(
+            db.query(Transaction)
+            .filter(Transaction.constituency_id == constituency_id)
+            .yield_per(chunk_size)
+        )
+    
     def get_by_election(self, db: Session, *, election_id: str) -> List[Transaction]:
         """
         Get transactions by election ID.
@@ -105,6 +129,22 @@ class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, TransactionUpdate
         """
         return db.query(Transaction).order_by(desc(Transaction.timestamp)).limit(limit).all()
     
+    def get_latest_timestamp(self, db: Session, *, constituency_id: str) -> Optional[datetime]:
+        """
+        Get the timestamp of the most recent transaction of a constituency.
+        
+        Args:
+            db: Database session
+            constituency_id: ID of the constituency
+            
+        Returns:
+            Latest transaction timestamp, or None if there are no transactions
+        """
+        return db.scalar(
+            select(func.max(Transaction.timestamp))
+            .where(Transaction.constituency_id == constituency_id)
+        )
+    
     def get_with_anomalies(self, db: Session) -> List[Transaction]:
         """
         Get transactions with anomalies.
@@ -171,19 +211,23 @@ class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, TransactionUpdate
             db.refresh(transaction)
         return transaction
     
-    def get_transaction_counts_by_type(self, db: Session) -> Dict[str, int]:
+    def get_transaction_counts_by_type(
+        self, db: Session, *, constituency_id: Optional[str] = None
+    ) -> Dict[str, int]:
         """
         Get transaction counts by type.
         
         Args:
             db: Database session
+            constituency_id: Only count transactions of this constituency
             
         Returns:
             Dictionary of transaction counts by type
         """
-        result = db.query(
-            Transaction.type, func.count(Transaction.id)
-        ).group_by(Transaction.type).all()
+        query = db.query(Transaction.type, func.count(Transaction.id))
+        if constituency_id:
+            query = query.filter(Transaction.constituency_id == constituency_id)
+        result = query.group_by(Transaction.type).all()
         
         return {type_: count for type_, count in result}
     
@@ -297,28 +341,28 @@ class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, TransactionUpdate
         Returns:
             Tuple of (transactions, total_count)
         """
-        query = db.query(Transaction)
-        
-        # Apply filters
+        # Build filters
+        filters = []
         if constituency_id:
-            query = query.filter(Transaction.constituency_id == constituency_id)
+            filters.append(Transaction.constituency_id == constituency_id)
         if transaction_type:
-            query = query.filter(Transaction.type == transaction_type)
+            filters.append(Transaction.type == transaction_type)
         if start_time:
-            query = query.filter(Transaction.timestamp >= start_time)
+            filters.append(Transaction.timestamp >= start_time)
         if end_time:
-            query = query.filter(Transaction.timestamp <= end_time)
+            filters.append(Transaction.timestamp <= end_time)
         if status:
-            query = query.filter(Transaction.status == status)
+            filters.append(Transaction.status == status)
         if anomaly_detected is not None:
-            query = query.filter(Transaction.anomaly_detected == anomaly_detected)
+            filters.append(Transaction.anomaly_detected == anomaly_detected)
         if source:
-            query = query.filter(Transaction.source == source)
+            filters.append(Transaction.source == source)
         if file_id:
-            query = query.filter(Transaction.file_id == file_id)
+            filters.append(Transaction.file_id == file_id)
         
-        # Get total count
-        total = query.count()
+        # Return the total with every row through a COUNT(*) OVER () window,
+        # so the page and its total come from one scan
+        query = db.query(Transaction, func.count().over().label("total")).filter(*filters)
         
         # Apply sorting
         if sort_by:
@@ -329,12 +373,19 @@ class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, TransactionUpdate
                 query = query.order_by(desc(sort_column))
         
         # Apply pagination
-        query = query.offset((page - 1) * limit).limit(limit)
+        rows = query.offset((page - 1) * limit).limit(limit).all()
+        
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
         
-        return query.all(), total
+        # Past the last page the window yields no rows to read the total from
+        total = 0
+        if page > 1:
+            total = db.scalar(select(func.count()).select_from(Transaction).where(*filters))
+        return [], total
     
     def create_batch(
-        self, db: Session, *, obj_in_list: List[TransactionCreate]
+        self, db: Session, *, obj_in_list: List[TransactionCreate], commit: bool = True
     ) -> Dict[str, Any]:
         """
         Create multiple transactions in a batch.
@@ -342,6 +393,8 @@ class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, TransactionUpdate
         Args:
             db: Database session
             obj_in_list: List of transaction data to create
+            commit: Whether to commit the batch; when False the rows are only
+                written inside the caller's open transaction
             
         Returns:
             Dictionary with processing results
@@ -353,21 +406,76 @@ class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, TransactionUpdate
             "errors": []
         }
         
-        for i, obj_in in enumerate(obj_in_list):
-            try:
-                self.create(db=db, obj_in=obj_in)
-                result["processed"] += 1
-            except Exception as e:
-                result["failed"] += 1
-                result["errors"].append({
-                    "index": i,
-                    "error": str(e),
-                    "data": obj_in.dict()
-                })
-                result["success"] = False
+        if not obj_in_list:
+            return result
+        
+        # model_dump() directly; the v1-style dict() wrapper adds a
+        # deprecation warning per call, which dominates on large batches
+        rows = [obj_in.model_dump() for obj_in in obj_in_list]
+        
+        # Insert the whole batch with a single executemany, which the engine
+        # sends as multi-row INSERT pages (insertmanyvalues). The savepoint
+        # lets a failed batch be undone without losing the outer transaction.
+        try:
+            with db.begin_nested():
+                db.execute(insert(Transaction), rows)
+            result["processed"] = len(rows)
+        except Exception:
+            # Fall back to row-by-row inserts to find out which rows failed
+            for i, row in enumerate(rows):
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(Transaction), [row])
+                    result["processed"] += 1
+                except Exception as e:
+                    result["failed"] += 1
+                    result["errors"].append({
+                        "index": i,
+                        "error": str(e),
+                        "data": row
+                    })
+                    result["success"] = False
+        
+        if commit:
+            db.commit()
         
         return result
     
+    def create_ignore_existing(
+        self, db: Session, *, rows: List[Dict[str, Any]], commit: bool = True
+    ) -> int:
+        """
+        Insert transaction rows, skipping any whose ID is already stored.
+        
+        Runs one INSERT ... ON CONFLICT (id) DO NOTHING executemany, so the
+        database skips duplicates without a prior existence check.
+        
+        Args:
+            db: Database session
+            rows: Transaction column values, each including the ``id``
+            commit: Whether to commit after inserting
+            
+        Returns:
+            Number of rows actually inserted
+        """
+        if not rows:
+            return 0
+        
+        dialect_insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+        stmt = (
+            dialect_insert(Transaction)
+            .on_conflict_do_nothing(index_elements=[Transaction.id])
+            .returning(Transaction.id)
+        )
+        # RETURNING gives an exact inserted count; executemany rowcount is
+        # not reliable across drivers
+        inserted = len(db.scalars(stmt, rows).all())
+        
+        if commit:
+            db.commit()
+        
+        return inserted
+    
     def update_batch(
         self, db: Session, *, id_list: List[str], obj_in: TransactionUpdate
     ) -> Dict[str, Any]:
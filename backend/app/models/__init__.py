@@ -4,7 +4,7 @@ Models package for the Election Monitoring System.
 This package exports all the SQLAlchemy models for the application.
 """
 
-from .database import Base, TimestampMixin, UUIDMixin, get_db, create_tables
+from .database import Base, TimestampMixin, UUIDMixin, get_db, create_tables, get_pool_status
 from .election import Election
 from .constituency import Constituency
 from .transaction import Transaction
@@ -18,6 +18,7 @@ __all__ = [
     "UUIDMixin",
     "get_db",
     "create_tables",
+    "get_pool_status",
     "Election",
     "Constituency",
     "Transaction",
@@ -5,14 +5,18 @@ This module provides the SQLAlchemy Base class, database connection,
 session management, and common model mixins.
 """
 
+import atexit
 import os
 import logging
-from sqlalchemy import create_engine, Column, String, DateTime
+import threading
+from sqlalchemy import create_engine, event, Column, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
 import uuid
-from typing import Generator
+import orjson
+from typing import Dict, Generator, Union
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,13 +36,184 @@ else:
     DATABASE_URL = f"sqlite:///{db_path}"
     logger.info(f"Database URL: {DATABASE_URL}")
 
-# Create engine with SQLite-specific arguments
-# In production, this would be replaced with PostgreSQL connection
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # SQLite-specific
+# Connection pool settings
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "25"))
+MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "25"))
+POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+
+# Parameter sets per psycopg2 execute_batch() call for executemany UPDATE/DELETE
+EXECUTEMANY_BATCH_PAGE_SIZE = int(os.environ.get("DB_EXECUTEMANY_BATCH_PAGE_SIZE", "1000"))
+# Set to 1 to let the bulk load scripts trade SQLite durability for speed
+BULK_LOAD_PRAGMAS = os.environ.get("DB_BULK_LOAD_PRAGMAS") == "1"
+
+# Applied to each new SQLite connection when bulk load pragmas are enabled
+SQLITE_BULK_LOAD_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-200000",
+    "PRAGMA mmap_size=268435456",
 )
 
+
+def _json_serializer(value) -> str:
+    # orjson returns bytes; the JSON column types expect str
+    return orjson.dumps(value).decode()
+
+
+engine_kwargs = {
+    # Encode/decode JSON columns (raw_data, operation_data, ...) with orjson
+    "json_serializer": _json_serializer,
+    "json_deserializer": orjson.loads,
+}
+if DATABASE_URL.startswith("sqlite"):
+    engine_kwargs["connect_args"] = {"check_same_thread": False}  # SQLite-specific
+elif DATABASE_URL.startswith(("postgresql://", "postgresql+psycopg2://")):
+    # Use psycopg2's fast execution helpers for executemany(): multi-row
+    # VALUES pages for INSERT, execute_batch() pages for UPDATE/DELETE
+    engine_kwargs["executemany_mode"] = "values_plus_batch"
+    engine_kwargs["executemany_batch_page_size"] = EXECUTEMANY_BATCH_PAGE_SIZE
+
+# In-memory SQLite databases cannot be shared through a QueuePool
+if ":memory:" not in DATABASE_URL:
+    engine_kwargs.update(
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+
+def enable_sqlite_savepoints(sqlite_engine) -> None:
+    """
+    Let SQLAlchemy, not pysqlite, emit BEGIN on a SQLite engine.
+    
+    pysqlite defers BEGIN until the first DML statement, so a SAVEPOINT opened
+    by Session.begin_nested() can run outside any transaction and its RELEASE
+    commits the rows. Turning off pysqlite's own transaction handling and
+    emitting BEGIN when SQLAlchemy starts a transaction keeps savepoints nested
+    inside the session's transaction, so a later rollback still undoes them.
+    
+    Args:
+        sqlite_engine: SQLAlchemy engine using the pysqlite driver
+    """
+    @event.listens_for(sqlite_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(sqlite_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+# Create engine
+# In production, this would be replaced with PostgreSQL connection
+engine = create_engine(DATABASE_URL, **engine_kwargs)
+if engine.dialect.name == "sqlite":
+    enable_sqlite_savepoints(engine)
+
+# Connection pool counters, updated by the pool event listeners below
+pool_metrics: Dict[str, int] = {
+    "connections_created": 0,
+    "checkouts": 0,
+    "checkins": 0,
+}
+_pool_metrics_lock = threading.Lock()
+
+
+def _increment_pool_metric(name: str) -> None:
+    with _pool_metrics_lock:
+        pool_metrics[name] += 1
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    _increment_pool_metric("connections_created")
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _increment_pool_metric("checkouts")
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    _increment_pool_metric("checkins")
+
+
+def get_pool_status() -> Dict[str, Union[int, str]]:
+    """
+    Get connection pool usage for the application engine.
+    
+    Returns:
+        Dict with the pool counters and, for a QueuePool, its current size,
+        checked-out connections and overflow
+    """
+    with _pool_metrics_lock:
+        status: Dict[str, Union[int, str]] = dict(pool_metrics)
+    
+    pool = engine.pool
+    status["pool_class"] = type(pool).__name__
+    if isinstance(pool, QueuePool):
+        status["pool_size"] = pool.size()
+        status["checked_out"] = pool.checkedout()
+        status["overflow"] = pool.overflow()
+    return status
+
+
+def enable_bulk_load_pragmas() -> bool:
+    """
+    Speed up bulk loads into a SQLite database by skipping fsyncs.
+    
+    Only takes effect when DB_BULK_LOAD_PRAGMAS=1 is set, so production
+    databases keep their default durability. Call it before the engine
+    opens its first connection.
+    
+    The WAL journal mode is stored in the database file, unlike the other
+    pragmas, so the previous journal mode is restored when the process exits.
+    
+    Returns:
+        True if the pragmas will be applied to new connections, False otherwise
+    """
+    if not BULK_LOAD_PRAGMAS or engine.dialect.name != "sqlite":
+        return False
+    
+    previous_journal_mode = None
+    
+    @event.listens_for(engine, "connect")
+    def _set_bulk_load_pragmas(dbapi_connection, connection_record):
+        nonlocal previous_journal_mode
+        cursor = dbapi_connection.cursor()
+        if previous_journal_mode is None:
+            previous_journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+        for pragma in SQLITE_BULK_LOAD_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+    
+    def _restore_journal_mode():
+        # Nothing to restore if no connection was opened, the database was
+        # already in WAL mode, or a script deleted the database file
+        database = engine.url.database
+        if previous_journal_mode in (None, "wal") or not database or not os.path.exists(database):
+            return
+        
+        # Leaving WAL mode needs the only connection to the database
+        engine.dispose()
+        dbapi_connection = engine.raw_connection()
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA journal_mode={previous_journal_mode}")
+            cursor.close()
+        finally:
+            dbapi_connection.close()
+        engine.dispose()
+        logger.info(f"SQLite journal mode restored to {previous_journal_mode}")
+    
+    atexit.register(_restore_journal_mode)
+    logger.info("SQLite bulk load pragmas enabled")
+    return True
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
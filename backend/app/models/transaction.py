@@ -5,8 +5,12 @@ This module defines the Transaction model, which represents a blockchain
 transaction from the voting system.
 """
 
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Boolean, Index
+from sqlalchemy import (
+    Column, String, Integer, DateTime, ForeignKey, JSON, Boolean, Index, DDL,
+    event, func, literal
+)
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import ColumnElement
 from datetime import datetime
 
 from .database import Base, UUIDMixin, TimestampMixin
@@ -57,8 +61,60 @@ class Transaction(Base, UUIDMixin, TimestampMixin):
     # Composite indexes for improved query performance
     __table_args__ = (
         Index('ix_transactions_constituency_timestamp', 'constituency_id', 'timestamp'),
+        # Covers the per-constituency GROUP BY type counts
+        Index('ix_transactions_constituency_type', 'constituency_id', 'type'),
+        # Partial index for the anomaly dashboards, which only read flagged rows
+        Index(
+            'ix_transactions_constituency_anomaly',
+            'constituency_id',
+            postgresql_where=anomaly_detected == True,
+            sqlite_where=anomaly_detected == True
+        ),
     )
     
     def __repr__(self):
         """String representation of the Transaction model."""
-        return f"<Transaction(id='{self.id}', type='{self.type}', status='{self.status}', block_height={self.block_height})>"
\ No newline at end of file
+        return f"<Transaction(id='{self.id}', type='{self.type}', status='{self.status}', block_height={self.block_height})>"
+
+
+# Columns matched by free-text transaction search
+SEARCH_COLUMNS = (
+    "id", "constituency_id", "type", "status", "source", "file_id", "anomaly_reason"
+)
+
+
+def search_document(columns) -> ColumnElement:
+    """
+    Build the text that transaction search matches against.
+    
+    The searchable columns are concatenated into one expression so a search
+    is a single predicate, which PostgreSQL can serve from a trigram index.
+    
+    Args:
+        columns: Column collection of the transactions table
+        
+    Returns:
+        SQL expression concatenating the searchable columns
+    """
+    # Constants are rendered inline so the expression matches the index
+    empty = literal("", literal_execute=True)
+    separator = literal(" ", literal_execute=True)
+    
+    document = func.coalesce(columns[SEARCH_COLUMNS[0]], empty)
+    for name in SEARCH_COLUMNS[1:]:
+        document = document + separator + func.coalesce(columns[name], empty)
+    return document
+
+
+# Trigram index for substring search; PostgreSQL only (needs pg_trgm)
+event.listen(
+    Transaction.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+Index(
+    "ix_transactions_search_trgm",
+    search_document(Transaction.__table__.c).label("search_document"),
+    postgresql_using="gin",
+    postgresql_ops={"search_document": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
@@ -211,11 +211,7 @@ class ConstituencyMetricsService:
             Updated constituency
         """
         # Update constituency fields
-        constituency.bulletins_issued = metrics["total_bulletins_issued"]
-        constituency.votes_cast = metrics["total_votes_cast"]
-        constituency.participation_rate = metrics["participation_rate"]
-        constituency.anomaly_score = metrics["anomaly_score"]
-        constituency.last_update_time = datetime.utcnow()
+        self._apply_constituency_metrics(constituency, metrics)
         
         # Save to database
         self.db.add(constituency)
@@ -225,6 +221,82 @@ class ConstituencyMetricsService:
         logger.info(f"Updated metrics for constituency {constituency.id}")
         return constituency
     
+    def _apply_constituency_metrics(
+        self, constituency: Constituency, metrics: Dict[str, Any]
+    ) -> None:
+        """
+        Copy calculated metrics onto a constituency without saving it.
+        
+        Args:
+            constituency: Constituency object
+            metrics: Dictionary of calculated metrics
+        """
+        constituency.bulletins_issued = metrics["total_bulletins_issued"]
+        constituency.votes_cast = metrics["total_votes_cast"]
+        constituency.participation_rate = metrics["participation_rate"]
+        constituency.anomaly_score = metrics["anomaly_score"]
+        constituency.last_update_time = datetime.utcnow()
+    
+    def calculate_metrics_batch(
+        self, 
+        constituency_ids: List[str], 
+        start_time: Optional[datetime] = None, 
+        end_time: Optional[datetime] = None,
+        update_constituencies: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate metrics for several constituencies in a fixed number of queries.
+        
+        Constituencies and their hourly stats are each loaded with a single
+        IN query and all updates are committed together.
+        
+        Args:
+            constituency_ids: List of constituency IDs
+            start_time: Optional start time of the range
+            end_time: Optional end time of the range
+            update_constituencies: If True, update constituencies with calculated metrics
+            
+        Returns:
+            Dictionary mapping constituency IDs to metrics; unknown IDs are
+            left out, so callers must check the keys against the requested IDs
+        """
+        constituencies = self.db.query(Constituency).filter(
+            Constituency.id.in_(constituency_ids)
+        ).all()
+        
+        missing = set(constituency_ids) - {constituency.id for constituency in constituencies}
+        for constituency_id in missing:
+            logger.error(f"Constituency not found: {constituency_id}")
+        
+        # Get hourly stats for all constituencies, grouped by constituency
+        query = self.db.query(HourlyStats).filter(
+            HourlyStats.constituency_id.in_(constituency_ids)
+        )
+        if start_time:
+            query = query.filter(HourlyStats.hour >= HourlyStats.round_hour(start_time))
+        if end_time:
+            query = query.filter(HourlyStats.hour <= HourlyStats.round_hour(end_time))
+        
+        stats_by_constituency: Dict[str, List[HourlyStats]] = {}
+        for stats in query.order_by(HourlyStats.constituency_id, HourlyStats.hour):
+            stats_by_constituency.setdefault(stats.constituency_id, []).append(stats)
+        
+        # Calculate metrics for each constituency
+        results = {}
+        for constituency in constituencies:
+            metrics = self._calculate_metrics_from_hourly_stats(
+                stats_by_constituency.get(constituency.id, []), constituency
+            )
+            if update_constituencies:
+                self._apply_constituency_metrics(constituency, metrics)
+            results[constituency.id] = metrics
+        
+        if update_constituencies and constituencies:
+            self.db.commit()
+            logger.info(f"Updated metrics for {len(constituencies)} constituencies")
+        
+        return results
+    
     def calculate_metrics_by_time_period(
         self, 
         constituency_id: str, 
@@ -8,10 +8,11 @@ and transaction extraction from CSV files.
 import os
 import re
 import csv
-import json
 import logging
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
 from datetime import datetime, date
 
 from app.models.schemas.file_metadata import FileMetadata
@@ -24,6 +25,9 @@ from app.api.errors.exceptions import (
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Upper bound on files read and parsed at the same time by process_directory
+DIRECTORY_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
 
 class FileService:
     """
@@ -132,12 +136,15 @@ class FileService:
         except Exception as e:
             raise MetadataExtractionError(f"Failed to extract metadata from path: {e}")
     
-    def extract_transactions_from_csv(self, file_content: str, metadata: FileMetadata) -> List[TransactionData]:
+    def extract_transactions_from_csv(
+        self, file_content: Union[str, Iterable[str]], metadata: FileMetadata
+    ) -> List[TransactionData]:
         """
         Extract transactions from CSV content.
         
         Args:
-            file_content: Content of the CSV file
+            file_content: Content of the CSV file, or an iterable of its lines
+                such as an open file, which is then parsed as it is read
             metadata: Metadata extracted from filename and path
             
         Returns:
@@ -150,7 +157,8 @@ class FileService:
             transactions = []
             
             # Parse CSV content
-            csv_reader = csv.reader(file_content.splitlines(), delimiter=';')
+            lines = file_content.splitlines() if isinstance(file_content, str) else file_content
+            csv_reader = csv.reader(lines, delimiter=';')
             
             for row in csv_reader:
                 if len(row) < 12:
@@ -232,33 +240,39 @@ class FileService:
             if data_str.startswith('[') and data_str.endswith(']'):
                 data_str = data_str[1:-1]
             
-            # Split by commas, but not within JSON objects
+            # Fast path: the items are comma-separated JSON values, so as an
+            # array they parse in one C-level call. Fall back to splitting
+            # item by item when some item is not valid JSON.
+            try:
+                return orjson.loads(f"[{data_str}]")
+            except orjson.JSONDecodeError:
+                pass
+            
+            # Split by commas, but not within JSON objects; items are sliced
+            # out by index rather than built up character by character
             items = []
-            current_item = ""
+            start = 0
             brace_count = 0
             
-            for char in data_str:
+            for i, char in enumerate(data_str):
                 if char == '{':
                     brace_count += 1
                 elif char == '}':
                     brace_count -= 1
-                
-                if char == ',' and brace_count == 0:
-                    if current_item:
-                        items.append(current_item.strip())
-                        current_item = ""
-                else:
-                    current_item += char
+                elif char == ',' and brace_count == 0:
+                    if i > start:
+                        items.append(data_str[start:i].strip())
+                    start = i + 1
             
-            if current_item:
-                items.append(current_item.strip())
+            if start < len(data_str):
+                items.append(data_str[start:].strip())
             
             # Parse each item as JSON
             result = []
             for item in items:
                 try:
-                    result.append(json.loads(item))
-                except json.JSONDecodeError:
+                    result.append(orjson.loads(item))
+                except orjson.JSONDecodeError:
                     # Skip items that can't be parsed as JSON
                     pass
             
@@ -314,12 +328,10 @@ class FileService:
             # Use the updated metadata
             metadata = filename_metadata
             
-            # Read file content
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract transactions
-            transactions = self.extract_transactions_from_csv(content, metadata)
+            # Extract transactions, streaming the file through the CSV reader
+            # instead of holding its whole content and a list of its lines
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                transactions = self.extract_transactions_from_csv(f, metadata)
             
             # Create processing result
             result = ProcessingResult(
@@ -338,6 +350,28 @@ class FileService:
         except Exception as e:
             raise FileProcessingError(f"Failed to process file {file_path}: {e}")
     
+    def _process_directory_file(
+        self, file_path: Path
+    ) -> Optional[Tuple[ProcessingResult, List[TransactionData]]]:
+        """
+        Process one file of a directory, logging instead of raising on failure.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            ProcessingResult and list of transactions, or None if processing failed
+        """
+        try:
+            logger.info(f"Processing file: {file_path}")
+            result, transactions = self.process_file(file_path)
+            logger.info(f"Processed {result.transactions_processed} transactions from {file_path}")
+            return result, transactions
+        except Exception as e:
+            # Log error but continue processing other files
+            logger.error(f"Error processing file {file_path}: {e}")
+            return None
+    
     def process_directory(self, directory_path: str) -> Tuple[DirectoryProcessingResult, List[TransactionData]]:
         """
         Process all CSV files in a directory with enhanced metadata extraction.
@@ -374,24 +408,28 @@ class FileService:
             constituency_name = None
             constituency_id = None
             
-            for file_path in csv_files:
-                try:
-                    logger.info(f"Processing file: {file_path}")
-                    result, transactions = self.process_file(file_path)
-                    logger.info(f"Processed {result.transactions_processed} transactions from {file_path}")
-                    total_transactions_processed += result.transactions_processed
-                    all_transactions.extend(transactions)
-                    
-                    # Set metadata from the first successful file
-                    if constituency_id is None:
-                        constituency_id = result.constituency_id
-                        region_id = result.region_id
-                        region_name = result.region_name
-                        election_name = result.election_name
-                        constituency_name = result.constituency_name
-                except Exception as e:
-                    # Log error but continue processing other files
-                    logger.error(f"Error processing file {file_path}: {e}")
+            # Read and parse the files on a thread pool, so reading one file
+            # overlaps parsing another; map() keeps the results in file order
+            with ThreadPoolExecutor(
+                max_workers=min(DIRECTORY_MAX_WORKERS, len(csv_files)),
+                thread_name_prefix="csv-file"
+            ) as executor:
+                file_results = list(executor.map(self._process_directory_file, csv_files))
+            
+            for file_result in file_results:
+                if file_result is None:
+                    continue
+                result, transactions = file_result
+                total_transactions_processed += result.transactions_processed
+                all_transactions.extend(transactions)
+                
+                # Set metadata from the first successful file
+                if constituency_id is None:
+                    constituency_id = result.constituency_id
+                    region_id = result.region_id
+                    region_name = result.region_name
+                    election_name = result.election_name
+                    constituency_name = result.constituency_name
             
             # Create directory processing result
             result = DirectoryProcessingResult(
@@ -81,7 +81,7 @@ class FileEventHandler(FileSystemEventHandler):
             
             # Create or update region if region information is available
             if result.region_id and result.region_name:
-                self.region_service.create_or_update_region(result.region_id, result.region_name)
+                self.region_service.bulk_create_or_update_regions([(result.region_id, result.region_name)])
             
             # Convert TransactionData objects to TransactionCreate objects
             transaction_creates = []
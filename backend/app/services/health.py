@@ -3,7 +3,7 @@ import traceback
 import os
 import logging
 from sqlalchemy import text
-from app.models.database import engine, SessionLocal
+from app.models.database import engine, SessionLocal, get_pool_status
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +25,7 @@ class HealthService:
             - API status
             - Database connection status
             - Response time
+            - Database connection pool usage
         """
         start_time = time.time()
         db_status = "ok"
@@ -56,7 +57,8 @@ class HealthService:
         response = {
             "status": "healthy" if db_status == "ok" else "unhealthy",
             "database_connection": db_status,
-            "response_time": f"{(time.time() - start_time) * 1000:.2f}ms"
+            "response_time": f"{(time.time() - start_time) * 1000:.2f}ms",
+            "database_pool": get_pool_status()
         }
         
         # Add error details if there was an error
@@ -8,7 +8,7 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, case
 
 from app.models.hourly_stats import HourlyStats
 from app.models.transaction import Transaction
@@ -77,18 +77,14 @@ class HourlyStatsService:
             logger.info(f"Hourly stats already exist for constituency {constituency_id} and hour {rounded_hour}")
             return existing_stats
         
-        # Get transactions for this constituency and hour
+        # Aggregate transactions for this constituency and hour in the database
         start_time = rounded_hour
         end_time = start_time + timedelta(hours=1)
         
-        transactions = self.db.query(Transaction).filter(
-            Transaction.constituency_id == constituency_id,
-            Transaction.timestamp >= start_time,
-            Transaction.timestamp < end_time
-        ).all()
+        counts = self._count_transactions(constituency_id, start_time, end_time)
         
         # Calculate metrics
-        metrics = self._calculate_metrics(transactions, constituency)
+        metrics = self._calculate_metrics(counts, constituency)
         
         # Create or update hourly stats
         if existing_stats:
@@ -126,14 +122,50 @@ class HourlyStatsService:
             logger.info(f"Created hourly stats for constituency {constituency_id} and hour {rounded_hour}")
             return new_stats
     
+    def _count_transactions(
+        self, constituency_id: str, start_time: datetime, end_time: datetime
+    ) -> Dict[str, int]:
+        """
+        Count transactions by kind for a constituency and time range.
+        
+        The counts are computed by a single aggregate query so that the
+        transactions themselves are never loaded.
+        
+        Args:
+            constituency_id: ID of the constituency
+            start_time: Start of the range (inclusive)
+            end_time: End of the range (exclusive)
+            
+        Returns:
+            Dictionary with transaction_count, bulletins_issued, votes_cast
+            and anomaly_count
+        """
+        transaction_count, bulletins_issued, votes_cast, anomaly_count = self.db.query(
+            func.count(Transaction.id),
+            func.sum(case((Transaction.type == "BULLETIN_ISSUED", 1), else_=0)),
+            func.sum(case((Transaction.type == "VOTE_CAST", 1), else_=0)),
+            func.sum(case((Transaction.anomaly_detected.is_(True), 1), else_=0))
+        ).filter(
+            Transaction.constituency_id == constituency_id,
+            Transaction.timestamp >= start_time,
+            Transaction.timestamp < end_time
+        ).one()
+        
+        return {
+            "transaction_count": transaction_count or 0,
+            "bulletins_issued": bulletins_issued or 0,
+            "votes_cast": votes_cast or 0,
+            "anomaly_count": anomaly_count or 0
+        }
+    
     def _calculate_metrics(
-        self, transactions: List[Transaction], constituency: Any
+        self, counts: Dict[str, int], constituency: Any
     ) -> Dict[str, Any]:
         """
-        Calculate metrics based on transaction data.
+        Calculate metrics based on aggregated transaction counts.
         
         Args:
-            transactions: List of transactions
+            counts: Transaction counts as returned by _count_transactions
             constituency: Constituency object or HourlyStats object
             
         Returns:
@@ -141,26 +173,15 @@ class HourlyStatsService:
         """
         # Initialize metrics
         metrics = {
-            "bulletins_issued": 0,
-            "votes_cast": 0,
-            "transaction_count": len(transactions),
+            "bulletins_issued": counts["bulletins_issued"],
+            "votes_cast": counts["votes_cast"],
+            "transaction_count": counts["transaction_count"],
             "bulletin_velocity": 0.0,
             "vote_velocity": 0.0,
             "participation_rate": 0.0,
-            "anomaly_count": 0
+            "anomaly_count": counts["anomaly_count"]
         }
         
-        # Count bulletins and votes
-        for transaction in transactions:
-            if transaction.type == "BULLETIN_ISSUED":
-                metrics["bulletins_issued"] += 1
-            elif transaction.type == "VOTE_CAST":
-                metrics["votes_cast"] += 1
-            
-            # Count anomalies
-            if transaction.anomaly_detected:
-                metrics["anomaly_count"] += 1
-        
         # Calculate velocities (per hour)
         metrics["bulletin_velocity"] = float(metrics["bulletins_issued"])
         metrics["vote_velocity"] = float(metrics["votes_cast"])
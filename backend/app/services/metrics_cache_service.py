@@ -13,6 +13,7 @@ from datetime import datetime, timedelta
 from functools import wraps
 import threading
 import traceback
+import weakref
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +24,9 @@ class CacheEntry:
     """
     Represents a cached entry.
     
+    Entries are referenced weakly from the tag index, so the cache dict
+    holds the only strong reference to a live entry.
+    
     Attributes:
         key (str): Cache key
         value (Any): Cached value
@@ -64,14 +68,18 @@ class CacheEntry:
 class InMemoryCache:
     """
     In-memory cache implementation.
+    
+    The tag index maps each tag to a WeakSet of the entries carrying it.
+    Tags whose set becomes empty are dropped immediately, so the index
+    never holds more tags than the live entries reference.
     """
     
     def __init__(self):
         """
         Initialize a new in-memory cache.
         """
-        self.cache = {}
-        self.tag_index = {}
+        self.cache: Dict[str, CacheEntry] = {}
+        self.tag_index: Dict[str, "weakref.WeakSet[CacheEntry]"] = {}
         self.lock = threading.RLock()
     
     def get(self, key: str) -> Optional[Any]:
@@ -125,11 +133,11 @@ class InMemoryCache:
             self.cache[key] = entry
             
             # Update tag index
-            if tags:
-                for tag in tags:
-                    if tag not in self.tag_index:
-                        self.tag_index[tag] = set()
-                    self.tag_index[tag].add(key)
+            for tag in entry.tags:
+                entries = self.tag_index.get(tag)
+                if entries is None:
+                    entries = self.tag_index[tag] = weakref.WeakSet()
+                entries.add(entry)
     
     def delete(self, key: str) -> bool:
         """
@@ -161,11 +169,14 @@ class InMemoryCache:
             Number of entries invalidated
         """
         with self.lock:
-            keys = self.tag_index.get(tag, set())
-            count = 0
+            entries = self.tag_index.pop(tag, None)
+            if not entries:
+                return 0
             
-            for key in list(keys):
-                if self.delete(key):
+            count = 0
+            for entry in list(entries):
+                if self.cache.get(entry.key) is entry:
+                    self._remove_entry(entry)
                     count += 1
             
             return count
@@ -178,14 +189,16 @@ class InMemoryCache:
             entry: Cache entry to remove
         """
         # Remove from cache
-        self.cache.pop(entry.key, None)
+        if self.cache.get(entry.key) is entry:
+            del self.cache[entry.key]
         
-        # Remove from tag index
+        # Remove from tag index, dropping tags that no longer have entries
         for tag in entry.tags:
-            if tag in self.tag_index:
-                self.tag_index[tag].discard(entry.key)
-                if not self.tag_index[tag]:
-                    self.tag_index.pop(tag)
+            entries = self.tag_index.get(tag)
+            if entries is not None:
+                entries.discard(entry)
+                if not entries:
+                    del self.tag_index[tag]
     
     def clear(self) -> int:
         """
@@ -216,6 +229,10 @@ class InMemoryCache:
                     self._remove_entry(entry)
                     count += 1
             
+            # Sweep tags whose entries were all collected
+            for tag in [tag for tag, entries in self.tag_index.items() if not entries]:
+                del self.tag_index[tag]
+            
             return count
 
 
@@ -6,14 +6,12 @@ This module provides services for automatically updating metrics.
 
 import logging
 import asyncio
+import heapq
 import time
 from typing import Dict, List, Optional, Any, Callable, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-import threading
-from queue import Queue, PriorityQueue
-import traceback
+from sqlalchemy import func, and_, select
 
 from app.models.election import Election
 from app.models.constituency import Constituency
@@ -25,6 +23,33 @@ from app.services.constituency_metrics_service import ConstituencyMetricsService
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Queue depth above which a periodic update cycle is skipped
+PERIODIC_UPDATE_HIGH_WATER = 1000
+
+# Window in seconds over which transaction-triggered updates for the same
+# constituency and hour are coalesced into a single set of tasks
+TRANSACTION_DEBOUNCE_SECONDS = 2.0
+
+# Maximum number of queued tasks of the same type processed together
+TASK_BATCH_SIZE = 50
+
+
+def _epoch_hour(dt: datetime) -> int:
+    """
+    Convert a datetime to the number of whole hours since the Unix epoch.
+    
+    Naive datetimes are treated as UTC, matching how timestamps are stored.
+    
+    Args:
+        dt: The datetime to convert
+        
+    Returns:
+        Hours since 1970-01-01T00:00:00Z
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) // 3600
+
 
 class UpdateTask:
     """
@@ -41,6 +66,17 @@ class UpdateTask:
         last_error (str): Last error message if the task failed
     """
     
+    __slots__ = (
+        "task_id",
+        "priority",
+        "task_type",
+        "params",
+        "created_at",
+        "attempts",
+        "max_attempts",
+        "last_error",
+    )
+    
     def __init__(
         self, 
         task_id: str, 
@@ -86,6 +122,8 @@ class MetricsUpdateService:
     Service for automatically updating metrics.
     
     This service provides methods for scheduling and processing metrics updates.
+    The worker runs as a task on the application's event loop; the database
+    work for each task is run in a worker thread so it does not block the loop.
     """
     
     def __init__(self, db_factory: Callable[[], Session]):
@@ -93,26 +131,52 @@ class MetricsUpdateService:
         Initialize the service with a database session factory.
         
         Args:
-            db_factory: Function that returns a new database session
+            db_factory: Function that returns a new database session; the
+                session is used as a context manager so it is always closed
         """
         self.db_factory = db_factory
-        self.task_queue = PriorityQueue()
+        # Pending tasks as a heap of (priority, sequence, task); the sequence
+        # number keeps equal priorities in FIFO order
+        self._heap: List[Tuple[int, int, UpdateTask]] = []
+        self._counter = 0
+        self._task_available = asyncio.Event()
         self.running = False
-        self.worker_thread = None
-        self.scheduled_tasks = {}  # Map of task_id to scheduled task info
+        self.worker_task: Optional[asyncio.Task] = None
+        self.periodic_task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.scheduled_tasks: Dict[str, UpdateTask] = {}  # Map of task_id to pending task
+        self._debounce: Dict[Tuple[str, int], asyncio.TimerHandle] = {}
+        
+        # Map of task type to the method that processes it
+        self._handlers: Dict[str, Callable[[Session, UpdateTask], None]] = {
+            "hourly_stats": self._process_hourly_stats_task,
+            "constituency_metrics": self._process_constituency_metrics_task,
+        }
+        
+        # Task types whose queued tasks can be processed together; a batch
+        # handler returns one error message (or None) per task
+        self._batch_handlers: Dict[
+            str, Callable[[Session, List[UpdateTask]], List[Optional[str]]]
+        ] = {
+            "constituency_metrics": self._process_constituency_metrics_batch,
+        }
+        
+        # Per task type counters and processing latency, see get_stats()
+        self.task_stats: Dict[str, Dict[str, float]] = {}
     
     def start(self):
         """
         Start the metrics update service.
+        
+        Must be called from a running event loop (e.g. the FastAPI lifespan).
         """
         if self.running:
             logger.warning("Metrics update service is already running")
             return
         
         self.running = True
-        self.worker_thread = threading.Thread(target=self._worker_loop)
-        self.worker_thread.daemon = True
-        self.worker_thread.start()
+        self.loop = asyncio.get_running_loop()
+        self.worker_task = asyncio.create_task(self._worker_loop())
         
         logger.info("Metrics update service started")
     
@@ -125,43 +189,149 @@ class MetricsUpdateService:
             return
         
         self.running = False
-        if self.worker_thread:
-            self.worker_thread.join(timeout=5.0)
+        for task in (self.worker_task, self.periodic_task):
+            if task:
+                task.cancel()
+        self.worker_task = None
+        self.periodic_task = None
         
         logger.info("Metrics update service stopped")
     
-    def _worker_loop(self):
+    def _run_on_loop(self, callback: Callable[..., None], *args: Any):
+        """
+        Run a callback on the event loop thread.
+        
+        The callback runs immediately when called from the loop thread or when
+        the service has no running loop, and is handed over with
+        call_soon_threadsafe when called from another thread.
+        
+        Args:
+            callback: The callback to run
+            *args: Arguments for the callback
+        """
+        loop = self.loop
+        if loop is not None and loop.is_running():
+            try:
+                on_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                on_loop = False
+            if not on_loop:
+                loop.call_soon_threadsafe(callback, *args)
+                return
+        
+        callback(*args)
+    
+    def _enqueue(self, task: UpdateTask):
+        """
+        Put a task on the queue from either the event loop or another thread.
+        
+        Args:
+            task: The task to enqueue
+        """
+        self._run_on_loop(self._push_task, task)
+    
+    def _push_task(self, task: UpdateTask):
+        """
+        Push a task onto the heap and wake the worker.
+        
+        Args:
+            task: The task to push
+        """
+        heapq.heappush(self._heap, (task.priority, self._counter, task))
+        self._counter += 1
+        self._task_available.set()
+    
+    def _pop_task(self) -> Optional[UpdateTask]:
+        """
+        Pop the highest priority task from the heap.
+        
+        Returns:
+            The task, or None if the queue is empty
+        """
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[2]
+    
+    def _pop_task_batch(self) -> List[UpdateTask]:
+        """
+        Pop the next task plus any following tasks that can be batched with it.
+        
+        Tasks whose type has a batch handler are drained from the front of the
+        queue, up to TASK_BATCH_SIZE, as long as they share the same type.
+        
+        Returns:
+            Non-empty list of tasks in priority order
+        """
+        tasks = [self._pop_task()]
+        task_type = tasks[0].task_type
+        if task_type not in self._batch_handlers:
+            return tasks
+        
+        while (
+            len(tasks) < TASK_BATCH_SIZE
+            and self._heap
+            and self._heap[0][2].task_type == task_type
+        ):
+            tasks.append(self._pop_task())
+        
+        return tasks
+    
+    def queue_size(self) -> int:
+        """
+        Get the number of tasks waiting in the queue.
+        
+        Returns:
+            Number of queued tasks
+        """
+        return len(self._heap)
+    
+    async def _worker_loop(self):
         """
         Main worker loop for processing tasks.
         """
         while self.running:
             try:
-                # Get the next task from the queue with a timeout
-                try:
-                    task = self.task_queue.get(timeout=1.0)
-                except Exception:
-                    # No task available, continue the loop
-                    continue
+                # Wait for the next task; the loop stays idle while the queue is empty
+                while not self._heap:
+                    self._task_available.clear()
+                    await self._task_available.wait()
+                tasks = self._pop_task_batch()
+                
+                # Once dequeued the tasks are no longer pending, so updates scheduled
+                # while they are being processed get fresh tasks
+                for task in tasks:
+                    if self.scheduled_tasks.get(task.task_id) is task:
+                        del self.scheduled_tasks[task.task_id]
                 
-                # Process the task
-                success = self._process_task(task)
+                # Process the tasks without blocking the event loop
+                if len(tasks) == 1:
+                    results = [await asyncio.to_thread(self._process_task, tasks[0])]
+                else:
+                    results = await asyncio.to_thread(self._process_task_batch, tasks)
                 
-                # If the task failed and hasn't reached max attempts, requeue it
-                if not success and task.attempts < task.max_attempts:
+                # If a task failed and hasn't reached max attempts, requeue it
+                # unless an equivalent task has been scheduled in the meantime
+                retries = [
+                    task for task, success in zip(tasks, results)
+                    if not success and task.attempts < task.max_attempts
+                ]
+                if retries:
+                    # Add a delay before retrying
+                    await asyncio.sleep(1.0)
+                for task in retries:
                     # Increase priority (higher number = lower priority)
                     task.priority += 1
-                    # Add a delay before retrying
-                    time.sleep(1.0)
-                    self.task_queue.put(task)
-                
-                # Mark the task as done
-                self.task_queue.task_done()
+                    if self.scheduled_tasks.setdefault(task.task_id, task) is task:
+                        self._get_task_stats(task.task_type)["retried"] += 1
+                        self._push_task(task)
             
-            except Exception as e:
-                logger.error(f"Error in metrics update worker loop: {str(e)}")
-                logger.error(traceback.format_exc())
+            except asyncio.CancelledError:
+                raise
+            
+            except Exception:
+                logger.exception("Error in metrics update worker loop")
                 # Sleep to avoid tight loop in case of persistent errors
-                time.sleep(1.0)
+                await asyncio.sleep(1.0)
     
     def _process_task(self, task: UpdateTask) -> bool:
         """
@@ -174,36 +344,126 @@ class MetricsUpdateService:
             True if the task was processed successfully, False otherwise
         """
         task.attempts += 1
+        stats = self._get_task_stats(task.task_type)
+        start = time.perf_counter()
         
         try:
-            # Get a new database session
-            db = self.db_factory()
-            
-            # Process the task based on its type
-            if task.task_type == "hourly_stats":
-                self._process_hourly_stats_task(db, task)
-            elif task.task_type == "constituency_metrics":
-                self._process_constituency_metrics_task(db, task)
-            else:
-                logger.error(f"Unknown task type: {task.task_type}")
-                task.last_error = f"Unknown task type: {task.task_type}"
-                return False
-            
-            # Close the database session
-            db.close()
+            # Get a new database session; it is closed when the block exits
+            with self.db_factory() as db:
+                # Process the task based on its type
+                handler = self._handlers.get(task.task_type)
+                if handler is None:
+                    raise ValueError(f"Unknown task type: {task.task_type}")
+                handler(db, task)
             
+            stats["processed"] += 1
             return True
         
         except Exception as e:
-            logger.error(f"Error processing task {task.task_id}: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception("Error processing task %s", task.task_id)
             task.last_error = str(e)
             
-            # Close the database session if it exists
-            if 'db' in locals():
-                db.close()
-            
+            stats["failed"] += 1
             return False
+        
+        finally:
+            elapsed = time.perf_counter() - start
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+    
+    def _process_task_batch(self, tasks: List[UpdateTask]) -> List[bool]:
+        """
+        Process several tasks of the same type with one batch handler call.
+        
+        Args:
+            tasks: Tasks of a type that has a batch handler
+            
+        Returns:
+            Per task success flags, in the order of the given tasks
+        """
+        task_type = tasks[0].task_type
+        stats = self._get_task_stats(task_type)
+        start = time.perf_counter()
+        for task in tasks:
+            task.attempts += 1
+        
+        try:
+            # Get a new database session; it is closed when the block exits
+            with self.db_factory() as db:
+                errors = self._batch_handlers[task_type](db, tasks)
+        
+        except Exception as e:
+            logger.exception("Error processing batch of %d %s tasks", len(tasks), task_type)
+            for task in tasks:
+                task.last_error = str(e)
+            
+            stats["failed"] += len(tasks)
+            return [False] * len(tasks)
+        
+        finally:
+            elapsed = time.perf_counter() - start
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+        
+        # Tasks the handler could not process fail individually
+        results = []
+        for task, error in zip(tasks, errors):
+            if error is None:
+                stats["processed"] += 1
+                results.append(True)
+            else:
+                logger.error("Error processing task %s: %s", task.task_id, error)
+                task.last_error = error
+                stats["failed"] += 1
+                results.append(False)
+        return results
+    
+    def _get_task_stats(self, task_type: str) -> Dict[str, float]:
+        """
+        Get the counters for a task type, creating them on first use.
+        
+        Args:
+            task_type: Type of the task
+            
+        Returns:
+            Mutable dictionary of counters for the task type
+        """
+        stats = self.task_stats.get(task_type)
+        if stats is None:
+            stats = self.task_stats[task_type] = {
+                "processed": 0,
+                "failed": 0,
+                "retried": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+            }
+        return stats
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of the queue depth and per task type processing stats.
+        
+        Returns:
+            Dictionary with the current queue depth, the number of pending
+            tasks and, per task type, the processed/failed/retried counts and
+            the average and maximum processing time in seconds
+        """
+        task_types = {}
+        for task_type, stats in self.task_stats.items():
+            attempts = stats["processed"] + stats["failed"]
+            task_types[task_type] = {
+                "processed": stats["processed"],
+                "failed": stats["failed"],
+                "retried": stats["retried"],
+                "average_seconds": stats["total_seconds"] / attempts if attempts else 0.0,
+                "max_seconds": stats["max_seconds"],
+            }
+        
+        return {
+            "queue_depth": self.queue_size(),
+            "pending_tasks": len(self.scheduled_tasks),
+            "task_types": task_types,
+        }
     
     def _process_hourly_stats_task(self, db: Session, task: UpdateTask):
         """
@@ -225,7 +485,8 @@ class MetricsUpdateService:
         if isinstance(hour, str):
             hour = datetime.fromisoformat(hour)
         
-        # Create the service and aggregate hourly stats
+        # Create the service and aggregate hourly stats; unless forced, the
+        # service keeps stats that are already stored
         hourly_stats_service = HourlyStatsService(db)
         hourly_stats_service.aggregate_hourly_stats(
             constituency_id=constituency_id,
@@ -269,6 +530,101 @@ class MetricsUpdateService:
         
         logger.info(f"Updated metrics for constituency {constituency_id}")
     
+    def _process_constituency_metrics_batch(
+        self, db: Session, tasks: List[UpdateTask]
+    ) -> List[Optional[str]]:
+        """
+        Process several constituency metrics update tasks together.
+        
+        Tasks are grouped by time range and update flag, and each group is
+        calculated with a single ConstituencyMetricsService.calculate_metrics_batch call.
+        
+        Args:
+            db: Database session
+            tasks: The tasks to process
+            
+        Returns:
+            Per task error messages, None for tasks that were processed; like the
+            single task path, a task whose constituency does not exist fails
+        """
+        groups: Dict[Tuple[Any, Any, bool], List[str]] = {}
+        task_keys: List[Tuple[Any, Any, bool]] = []
+        for task in tasks:
+            constituency_id = task.params.get("constituency_id")
+            if not constituency_id:
+                raise ValueError("Missing required parameter: constituency_id")
+            
+            start_time = task.params.get("start_time")
+            end_time = task.params.get("end_time")
+            
+            # Convert time strings to datetime if needed
+            if isinstance(start_time, str):
+                start_time = datetime.fromisoformat(start_time)
+            if isinstance(end_time, str):
+                end_time = datetime.fromisoformat(end_time)
+            
+            key = (start_time, end_time, task.params.get("update_constituency", True))
+            groups.setdefault(key, []).append(constituency_id)
+            task_keys.append(key)
+        
+        constituency_metrics_service = ConstituencyMetricsService(db)
+        calculated = set()
+        for (start_time, end_time, update_constituency), constituency_ids in groups.items():
+            results = constituency_metrics_service.calculate_metrics_batch(
+                constituency_ids=constituency_ids,
+                start_time=start_time,
+                end_time=end_time,
+                update_constituencies=update_constituency
+            )
+            calculated.update(
+                (start_time, end_time, update_constituency, constituency_id)
+                for constituency_id in results
+            )
+        
+        errors = [
+            None if (*key, task.params["constituency_id"]) in calculated
+            else f"Constituency not found: {task.params['constituency_id']}"
+            for task, key in zip(tasks, task_keys)
+        ]
+        
+        logger.info(f"Updated metrics for {errors.count(None)} constituencies in batch")
+        return errors
+    
+    @staticmethod
+    def _hourly_stats_task_id(constituency_id: str, hour: datetime) -> str:
+        """
+        Build the task ID for an hourly stats update.
+        
+        Args:
+            constituency_id: ID of the constituency
+            hour: Hour to update stats for
+            
+        Returns:
+            Task ID
+        """
+        return f"hs:{constituency_id}:{_epoch_hour(hour)}"
+    
+    @staticmethod
+    def _constituency_metrics_task_id(
+        constituency_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> str:
+        """
+        Build the task ID for a constituency metrics update.
+        
+        Args:
+            constituency_id: ID of the constituency
+            start_time: Optional start time of the range
+            end_time: Optional end time of the range
+            
+        Returns:
+            Task ID
+        """
+        start_str = start_time.isoformat() if start_time else "none"
+        end_str = end_time.isoformat() if end_time else "none"
+        return f"cm:{constituency_id}:{start_str}:{end_str}"
+    
     def schedule_hourly_stats_update(
         self, 
         constituency_id: str, 
@@ -289,7 +645,14 @@ class MetricsUpdateService:
             Task ID
         """
         # Create a unique task ID
-        task_id = f"hourly_stats_{constituency_id}_{hour.isoformat()}"
+        task_id = self._hourly_stats_task_id(constituency_id, hour)
+        
+        # Coalesce with an identical task that is still waiting in the queue
+        pending = self.scheduled_tasks.get(task_id)
+        if pending is not None:
+            if force_recalculate:
+                pending.params["force_recalculate"] = True
+            return task_id
         
         # Create the task
         task = UpdateTask(
@@ -304,7 +667,8 @@ class MetricsUpdateService:
         )
         
         # Add the task to the queue
-        self.task_queue.put(task)
+        self.scheduled_tasks[task_id] = task
+        self._enqueue(task)
         
         logger.info(f"Scheduled hourly stats update for constituency {constituency_id}, hour {hour}")
         return task_id
@@ -315,7 +679,8 @@ class MetricsUpdateService:
         start_time: Optional[datetime] = None, 
         end_time: Optional[datetime] = None,
         priority: int = 20,
-        update_constituency: bool = True
+        update_constituency: bool = True,
+        batch: bool = False
     ) -> str:
         """
         Schedule a constituency metrics update.
@@ -326,12 +691,20 @@ class MetricsUpdateService:
             end_time: Optional end time of the range
             priority: Priority of the task (lower is higher priority)
             update_constituency: If True, update the constituency with calculated metrics
+            batch: If True, the call is part of a bulk schedule and logs at debug level
             
         Returns:
             Task ID
         """
-        # Create a unique task ID
-        task_id = f"constituency_metrics_{constituency_id}_{datetime.utcnow().isoformat()}"
+        # Create a task ID that is stable for the same constituency and range
+        task_id = self._constituency_metrics_task_id(constituency_id, start_time, end_time)
+        
+        # Coalesce with an identical task that is still waiting in the queue
+        pending = self.scheduled_tasks.get(task_id)
+        if pending is not None:
+            if update_constituency:
+                pending.params["update_constituency"] = True
+            return task_id
         
         # Create the task
         task = UpdateTask(
@@ -347,9 +720,13 @@ class MetricsUpdateService:
         )
         
         # Add the task to the queue
-        self.task_queue.put(task)
+        self.scheduled_tasks[task_id] = task
+        self._enqueue(task)
         
-        logger.info(f"Scheduled constituency metrics update for constituency {constituency_id}")
+        if batch:
+            logger.debug("Scheduled constituency metrics update for constituency %s", constituency_id)
+        else:
+            logger.info(f"Scheduled constituency metrics update for constituency {constituency_id}")
         return task_id
     
     def schedule_election_metrics_update(
@@ -373,33 +750,28 @@ class MetricsUpdateService:
         Returns:
             List of task IDs
         """
-        # Get a new database session
-        db = self.db_factory()
-        
-        try:
-            # Get all constituencies for this election
-            constituencies = db.query(Constituency).filter(
-                Constituency.election_id == election_id
-            ).all()
+        # Get a new database session; it is closed when the block exits
+        with self.db_factory() as db:
+            # Get the IDs of all constituencies for this election
+            constituency_ids = db.execute(
+                select(Constituency.id).where(Constituency.election_id == election_id)
+            ).scalars().all()
             
             # Schedule updates for each constituency
-            task_ids = []
-            for constituency in constituencies:
-                task_id = self.schedule_constituency_metrics_update(
-                    constituency_id=constituency.id,
+            task_ids = [
+                self.schedule_constituency_metrics_update(
+                    constituency_id=constituency_id,
                     start_time=start_time,
                     end_time=end_time,
                     priority=priority,
-                    update_constituency=update_constituencies
+                    update_constituency=update_constituencies,
+                    batch=True
                 )
-                task_ids.append(task_id)
+                for constituency_id in constituency_ids
+            ]
             
             logger.info(f"Scheduled metrics updates for {len(task_ids)} constituencies in election {election_id}")
             return task_ids
-        
-        finally:
-            # Close the database session
-            db.close()
     
     def schedule_transaction_triggered_update(
         self, 
@@ -409,6 +781,11 @@ class MetricsUpdateService:
         """
         Schedule updates triggered by a new transaction.
         
+        While the service is running on an event loop, updates for the same
+        constituency and hour are coalesced: the first transaction opens a
+        TRANSACTION_DEBOUNCE_SECONDS window and the tasks are scheduled once
+        when it closes, however many transactions arrived in between.
+        
         Args:
             transaction: The new transaction
             priority: Priority of the task (lower is higher priority)
@@ -416,32 +793,89 @@ class MetricsUpdateService:
         Returns:
             List of task IDs
         """
-        task_ids = []
+        constituency_id = transaction.constituency_id
+        
+        # Round the transaction timestamp down to the hour
+        hour = transaction.timestamp.replace(minute=0, second=0, microsecond=0)
+        
+        if self.loop is not None and self.loop.is_running():
+            self._run_on_loop(self._debounce_transaction_update, constituency_id, hour, priority)
+            return [
+                self._hourly_stats_task_id(constituency_id, hour),
+                self._constituency_metrics_task_id(constituency_id)
+            ]
+        
+        return self._schedule_transaction_updates(constituency_id, hour, priority)
+    
+    def _debounce_transaction_update(self, constituency_id: str, hour: datetime, priority: int):
+        """
+        Open a coalescing window for a constituency and hour unless one is open.
+        
+        Must run on the event loop thread.
+        
+        Args:
+            constituency_id: ID of the constituency
+            hour: Hour of the transaction
+            priority: Priority of the task (lower is higher priority)
+        """
+        key = (constituency_id, _epoch_hour(hour))
+        if key in self._debounce:
+            return
         
-        # Round the transaction timestamp to the nearest hour
-        hour = datetime(
-            transaction.timestamp.year,
-            transaction.timestamp.month,
-            transaction.timestamp.day,
-            transaction.timestamp.hour
+        self._debounce[key] = self.loop.call_later(
+            TRANSACTION_DEBOUNCE_SECONDS,
+            self._flush_transaction_update,
+            constituency_id,
+            hour,
+            priority
         )
+    
+    def _flush_transaction_update(self, constituency_id: str, hour: datetime, priority: int):
+        """
+        Close a coalescing window and schedule its updates.
+        
+        Args:
+            constituency_id: ID of the constituency
+            hour: Hour of the transaction
+            priority: Priority of the task (lower is higher priority)
+        """
+        self._debounce.pop((constituency_id, _epoch_hour(hour)), None)
+        self._schedule_transaction_updates(constituency_id, hour, priority)
+    
+    def _schedule_transaction_updates(
+        self, constituency_id: str, hour: datetime, priority: int
+    ) -> List[str]:
+        """
+        Schedule the hourly stats and metrics updates for a transaction.
+        
+        Args:
+            constituency_id: ID of the constituency
+            hour: Hour of the transaction
+            priority: Priority of the task (lower is higher priority)
+            
+        Returns:
+            List of task IDs
+        """
+        task_ids = []
         
-        # Schedule hourly stats update
+        # Schedule hourly stats update; the transaction is new data, so the
+        # stored stats must be recalculated however recently they were written
         hourly_stats_task_id = self.schedule_hourly_stats_update(
-            constituency_id=transaction.constituency_id,
+            constituency_id=constituency_id,
             hour=hour,
-            priority=priority
+            priority=priority,
+            force_recalculate=True
         )
         task_ids.append(hourly_stats_task_id)
         
         # Schedule constituency metrics update
         metrics_task_id = self.schedule_constituency_metrics_update(
-            constituency_id=transaction.constituency_id,
+            constituency_id=constituency_id,
             priority=priority + 10
         )
         task_ids.append(metrics_task_id)
         
-        logger.info(f"Scheduled transaction-triggered updates for constituency {transaction.constituency_id}")
+        logger.info(f"Scheduled transaction-triggered updates for constituency {constituency_id}")
         return task_ids
     
     def schedule_periodic_updates(
@@ -452,48 +886,78 @@ class MetricsUpdateService:
         """
         Schedule periodic updates for all active elections.
         
+        The updates run as a task on the event loop, so this must be called
+        from a running loop after the service has been started.
+        
         Args:
             interval_seconds: Interval between updates in seconds
             priority: Priority of the task (lower is higher priority)
         """
-        def _periodic_update():
-            while self.running:
-                try:
-                    # Get a new database session
-                    db = self.db_factory()
-                    
-                    # Get all active elections
-                    active_elections = db.query(Election).filter(
-                        Election.status == "ACTIVE"
-                    ).all()
-                    
-                    # Schedule updates for each active election
-                    for election in active_elections:
-                        self.schedule_election_metrics_update(
-                            election_id=election.id,
-                            priority=priority
-                        )
-                    
-                    logger.info(f"Scheduled periodic updates for {len(active_elections)} active elections")
-                
-                except Exception as e:
-                    logger.error(f"Error in periodic update: {str(e)}")
-                    logger.error(traceback.format_exc())
-                
-                finally:
-                    # Close the database session if it exists
-                    if 'db' in locals():
-                        db.close()
-                    
-                    # Sleep until the next update
-                    time.sleep(interval_seconds)
-        
-        # Start the periodic update thread
-        periodic_thread = threading.Thread(target=_periodic_update)
-        periodic_thread.daemon = True
-        periodic_thread.start()
+        self.periodic_task = asyncio.create_task(
+            self._periodic_update(interval_seconds, priority)
+        )
         
         logger.info(f"Started periodic updates with interval {interval_seconds} seconds")
+    
+    async def _periodic_update(self, interval_seconds: int, priority: int):
+        """
+        Periodically schedule metrics updates for all active elections.
+        
+        A cycle is skipped while the queue holds more than
+        PERIODIC_UPDATE_HIGH_WATER tasks so that a slow worker is not buried
+        under another full round of updates.
+        
+        Args:
+            interval_seconds: Interval between updates in seconds
+            priority: Priority of the task (lower is higher priority)
+        """
+        while self.running:
+            try:
+                queue_size = self.queue_size()
+                if queue_size > PERIODIC_UPDATE_HIGH_WATER:
+                    logger.warning(
+                        f"Skipping periodic update: {queue_size} tasks still queued"
+                    )
+                else:
+                    election_count = await asyncio.to_thread(
+                        self._schedule_active_election_updates, priority
+                    )
+                    logger.info(f"Scheduled periodic updates for {election_count} active elections")
+            
+            except asyncio.CancelledError:
+                raise
+            
+            except Exception:
+                logger.exception("Error in periodic update")
+            
+            # Sleep until the next update
+            await asyncio.sleep(interval_seconds)
+    
+    def _schedule_active_election_updates(self, priority: int) -> int:
+        """
+        Schedule metrics updates for every active election.
+        
+        Args:
+            priority: Priority of the task (lower is higher priority)
+            
+        Returns:
+            Number of active elections scheduled
+        """
+        # Get a new database session; it is closed when the block exits
+        with self.db_factory() as db:
+            # Get the IDs of all active elections
+            election_ids = db.execute(
+                select(Election.id).where(Election.status == "ACTIVE")
+            ).scalars().all()
+        
+        # Schedule updates for each active election
+        for election_id in election_ids:
+            self.schedule_election_metrics_update(
+                election_id=election_id,
+                priority=priority
+            )
+        
+        return len(election_ids)
 
 
 # Create a function to get the service
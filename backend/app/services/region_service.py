@@ -4,13 +4,18 @@ Region service for the Election Monitoring System.
 This module provides services for creating, updating, and retrieving regions.
 """
 
-from typing import List, Optional
+import re
+from typing import Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.region import Region
 from app.models.schemas.region import RegionCreate, RegionUpdate
 from app.crud import region as region_crud
 
+# Expected format: "[RegionID] - [RegionName]"
+# Example: "90 - Пермский край"
+_REGION_RE = re.compile(r"(\d+)\s*-\s*(.*)")
+
 
 class RegionService:
     """
@@ -116,6 +121,23 @@ class RegionService:
         """
         return region_crud.create_or_update(self.db, region_id, region_name, country)
     
+    def bulk_create_or_update_regions(
+        self, regions: Iterable[Tuple[str, str]], country: str = "Russia"
+    ) -> int:
+        """
+        Create or update several regions in one database round-trip.
+        
+        Args:
+            regions: (region_id, region_name) tuples
+            country: Country name (default: "Russia")
+            
+        Returns:
+            Number of distinct regions written
+        """
+        return region_crud.bulk_create_or_update(
+            self.db, ((region_id, region_name, country) for region_id, region_name in regions)
+        )
+    
     def extract_region_from_path(self, path_part: str) -> tuple:
         """
         Extract region ID and name from a path part.
@@ -129,11 +151,7 @@ class RegionService:
         Raises:
             ValueError: If the path part does not contain valid region information
         """
-        import re
-        
-        # Expected format: "[RegionID] - [RegionName]"
-        # Example: "90 - Пермский край"
-        match = re.match(r"(\d+)\s*-\s*(.*)", path_part)
+        match = _REGION_RE.match(path_part)
         if not match:
             raise ValueError(f"Invalid region format: {path_part}")
         
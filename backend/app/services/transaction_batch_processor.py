@@ -4,8 +4,10 @@ Transaction batch processor for the Election Monitoring System.
 This module provides batch processing services for transaction data.
 """
 
+import atexit
 import logging
-from typing import List, Dict, Any, Optional
+import os
+from typing import List, Dict, Any, Optional, Callable
 from sqlalchemy.orm import Session
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
@@ -13,11 +15,19 @@ from datetime import datetime
 
 from app.models.schemas.transaction import TransactionCreate, TransactionBatchRequest, TransactionBatchResponse
 from app.crud.transaction import transaction_crud
+from app.models.database import POOL_SIZE
+from app.services.transaction_query_service import invalidate_transaction_stats
 from app.api.errors.exceptions import BatchProcessingError
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Shared pool for async batch processing; bounded so concurrent large
+# batches cannot spawn an unbounded number of threads
+MAX_BATCH_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_BATCH_WORKERS, thread_name_prefix="txn-batch")
+atexit.register(_EXECUTOR.shutdown, wait=False)
+
 
 class TransactionBatchProcessor:
     """
@@ -26,26 +36,39 @@ class TransactionBatchProcessor:
     This class provides methods for processing transaction data in batches.
     """
     
-    def __init__(self, db: Session, batch_size: int = 100):
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = 100,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
         """
         Initialize the batch processor.
         
         Args:
-            db: Database session
+            db: Database session checked out from the shared, pooled
+                engine (``SessionLocal``); do not dispose the engine while
+                the session is in use
             batch_size: Size of each batch
+            session_factory: Optional session factory; when given, async
+                batches each run in their own session so they can be
+                processed in parallel
         """
         self.db = db
         self.batch_size = batch_size
+        self.session_factory = session_factory
         # Lazy import to avoid circular dependencies
         from app.services.transaction_validator import TransactionValidator
         self.validator = TransactionValidator()
     
-    def process_batch(self, transactions: List[TransactionCreate]) -> Dict[str, Any]:
+    def process_batch(self, transactions: List[TransactionCreate], commit: bool = True) -> Dict[str, Any]:
         """
         Process a batch of transactions.
         
         Args:
             transactions: List of transactions to process
+            commit: Whether to commit the batch; when False the caller is
+                responsible for committing
             
         Returns:
             Dictionary with processing results
@@ -54,11 +77,18 @@ class TransactionBatchProcessor:
             BatchProcessingError: If processing fails
         """
         try:
-            # Validate transactions
-            validation_results = self.validator.validate_transaction_batch(self.db, transactions)
+            # Resolve referenced constituencies with one query, then validate in memory
+            existing_constituency_ids = self.validator.get_existing_constituency_ids(
+                self.db, {t.constituency_id for t in transactions}
+            )
+            validation_results = self.validator.validate_transaction_batch(
+                self.db, transactions, existing_constituency_ids=existing_constituency_ids
+            )
             
             # Create batch
-            result = transaction_crud.create_batch(db=self.db, obj_in_list=transactions)
+            result = transaction_crud.create_batch(
+                db=self.db, obj_in_list=transactions, commit=commit
+            )
             
             # Add validation errors to result
             for index, errors in validation_results.items():
@@ -70,6 +100,9 @@ class TransactionBatchProcessor:
                         "validation_errors": errors
                     })
             
+            if commit and result["processed"]:
+                invalidate_transaction_stats(t.constituency_id for t in transactions)
+            
             logger.info(f"Processed {result['processed']} transactions in batch (failed: {result['failed']})")
             return result
         except Exception as e:
@@ -92,12 +125,61 @@ class TransactionBatchProcessor:
             for i in range(0, len(transactions), self.batch_size)
         ]
     
-    def process_large_batch(self, transactions: List[TransactionCreate]) -> Dict[str, Any]:
+    def _merge_result(self, combined_result: Dict[str, Any], batch_number: int, result: Dict[str, Any]) -> None:
+        """
+        Merge a sub-batch result into a combined result.
+        
+        Error indices are rebased from positions within the sub-batch to
+        positions within the whole large batch.
+        
+        Args:
+            combined_result: Combined result to update in place
+            batch_number: Position of the sub-batch within the large batch
+            result: Sub-batch result to merge
+        """
+        combined_result["success"] = combined_result["success"] and result["success"]
+        combined_result["processed"] += result["processed"]
+        combined_result["failed"] += result["failed"]
+        
+        offset = batch_number * self.batch_size
+        combined_result["errors"].extend(
+            {**error, "batch": batch_number, "batch_index": error["index"], "index": offset + error["index"]}
+            if "index" in error else {**error, "batch": batch_number}
+            for error in result.get("errors", [])
+        )
+    
+    def _combine_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine sub-batch results into a single result.
+        
+        Args:
+            results: Sub-batch results, in batch order
+            
+        Returns:
+            Dictionary with the combined processing results
+        """
+        combined_result = {
+            "success": True,
+            "processed": 0,
+            "failed": 0,
+            "errors": []
+        }
+        for i, result in enumerate(results):
+            self._merge_result(combined_result, i, result)
+        return combined_result
+    
+    def process_large_batch(
+        self, transactions: List[TransactionCreate], commit_size: int = 10
+    ) -> Dict[str, Any]:
         """
         Process a large batch of transactions by splitting it into smaller batches.
         
+        The sub-batches share one transaction that is committed every
+        ``commit_size`` sub-batches and once more at the end.
+        
         Args:
             transactions: List of transactions to process
+            commit_size: Number of sub-batches to write per commit
             
         Returns:
             Dictionary with processing results
@@ -106,33 +188,28 @@ class TransactionBatchProcessor:
             BatchProcessingError: If processing fails
         """
         try:
+            if len(transactions) <= self.batch_size:
+                # A single batch needs no splitting or intermediate commits
+                return self._combine_results([self.process_batch(transactions)])
+            
             # Split into batches
             batches = self.split_into_batches(transactions)
             logger.info(f"Split {len(transactions)} transactions into {len(batches)} batches")
             
-            # Process each batch
-            results = []
-            for i, batch in enumerate(batches):
-                logger.info(f"Processing batch {i+1}/{len(batches)} with {len(batch)} transactions")
-                result = self.process_batch(batch)
-                results.append(result)
-            
-            # Combine results
+            # Process each batch, merging its result as soon as it is done
             combined_result = {
-                "success": all(r["success"] for r in results),
-                "processed": sum(r["processed"] for r in results),
-                "failed": sum(r["failed"] for r in results),
+                "success": True,
+                "processed": 0,
+                "failed": 0,
                 "errors": []
             }
-            
-            # Combine errors
-            for i, result in enumerate(results):
-                for error in result["errors"]:
-                    # Adjust index to account for batching
-                    error["batch"] = i
-                    error["batch_index"] = error["index"]
-                    error["index"] = i * self.batch_size + error["index"]
-                    combined_result["errors"].append(error)
+            for i, batch in enumerate(batches):
+                logger.info(f"Processing batch {i+1}/{len(batches)} with {len(batch)} transactions")
+                self._merge_result(combined_result, i, self.process_batch(batch, commit=False))
+                if (i + 1) % commit_size == 0:
+                    self.db.commit()
+            self.db.commit()
+            invalidate_transaction_stats(t.constituency_id for t in transactions)
             
             logger.info(f"Processed {combined_result['processed']} transactions in large batch (failed: {combined_result['failed']})")
             return combined_result
@@ -141,6 +218,19 @@ class TransactionBatchProcessor:
             self.db.rollback()
             raise BatchProcessingError(f"Failed to process large transaction batch: {e}")
     
+    def _process_batch_in_new_session(self, transactions: List[TransactionCreate]) -> Dict[str, Any]:
+        """
+        Process a batch of transactions in a short-lived session of its own.
+        
+        Args:
+            transactions: List of transactions to process
+            
+        Returns:
+            Dictionary with processing results
+        """
+        with self.session_factory() as db:
+            return TransactionBatchProcessor(db, self.batch_size).process_batch(transactions)
+    
     async def process_batch_async(self, transactions: List[TransactionCreate]) -> Dict[str, Any]:
         """
         Process a batch of transactions asynchronously.
@@ -155,12 +245,14 @@ class TransactionBatchProcessor:
             BatchProcessingError: If processing fails
         """
         try:
-            # Run in thread pool to avoid blocking
-            with ThreadPoolExecutor() as executor:
-                result = await asyncio.get_event_loop().run_in_executor(
-                    executor, self.process_batch, transactions
-                )
-            return result
+            process = self.process_batch
+            if self.session_factory is not None:
+                process = self._process_batch_in_new_session
+            
+            # Run in the shared thread pool to avoid blocking
+            return await asyncio.get_running_loop().run_in_executor(
+                _EXECUTOR, process, transactions
+            )
         except Exception as e:
             logger.exception("Failed to process transaction batch asynchronously")
             raise BatchProcessingError(f"Failed to process transaction batch asynchronously: {e}")
@@ -183,41 +275,47 @@ class TransactionBatchProcessor:
             batches = self.split_into_batches(transactions)
             logger.info(f"Split {len(transactions)} transactions into {len(batches)} batches for async processing")
             
-            # Process each batch asynchronously
-            tasks = [self.process_batch_async(batch) for batch in batches]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle exceptions
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"Batch {i} failed: {result}")
-                    results[i] = {
-                        "success": False,
-                        "processed": 0,
-                        "failed": len(batches[i]),
-                        "errors": [{
-                            "batch": i,
-                            "error": str(result)
-                        }]
-                    }
+            # Batches sharing self.db must run one at a time; with a session
+            # per batch, run as many as there are workers and pooled connections
+            concurrency = 1
+            if self.session_factory is not None:
+                concurrency = min(MAX_BATCH_WORKERS, POOL_SIZE)
             
-            # Combine results
             combined_result = {
-                "success": all(r["success"] for r in results),
-                "processed": sum(r["processed"] for r in results),
-                "failed": sum(r["failed"] for r in results),
+                "success": True,
+                "processed": 0,
+                "failed": 0,
                 "errors": []
             }
+            pending = iter(enumerate(batches))
+            
+            async def run_batches() -> None:
+                # Workers share one iterator, so each batch is taken exactly once
+                for i, batch in pending:
+                    try:
+                        result = await self.process_batch_async(batch)
+                    except Exception as e:
+                        logger.error(f"Batch {i} failed: {e}")
+                        result = {
+                            "success": False,
+                            "processed": 0,
+                            "failed": len(batch),
+                            "errors": [{
+                                "batch": i,
+                                "error": str(e)
+                            }]
+                        }
+                    self._merge_result(combined_result, i, result)
+            
+            # Only as many batches are in flight as there are workers
+            worker_count = min(concurrency, len(batches))
+            if worker_count == 1:
+                await run_batches()
+            else:
+                await asyncio.gather(*(run_batches() for _ in range(worker_count)))
             
-            # Combine errors
-            for i, result in enumerate(results):
-                for error in result.get("errors", []):
-                    # Adjust index to account for batching
-                    error["batch"] = i
-                    if "index" in error:
-                        error["batch_index"] = error["index"]
-                        error["index"] = i * self.batch_size + error["index"]
-                    combined_result["errors"].append(error)
+            # Results are merged in completion order; report errors in batch order
+            combined_result["errors"].sort(key=lambda error: error["batch"])
             
             logger.info(f"Processed {combined_result['processed']} transactions in async large batch (failed: {combined_result['failed']})")
             return combined_result
@@ -4,18 +4,120 @@ Transaction query service for the Election Monitoring System.
 This module provides advanced query capabilities for transaction data.
 """
 
+import copy
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from functools import wraps
+from itertools import chain
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc, and_, or_, extract
-from datetime import datetime, timedelta
+from collections import defaultdict
+from sqlalchemy import func, desc, asc, and_, extract, case, tuple_, select, DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from datetime import datetime
 
-from app.models.transaction import Transaction
+from app.models.transaction import Transaction, search_document
 from app.crud.transaction import transaction_crud
+from app.services.metrics_cache_service import MetricsCacheService, cached
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# How long dashboard statistics are served from the cache, in seconds
+STATS_CACHE_TTL = 10
+
+# Rows fetched per round trip when execute_query streams its results
+STREAM_YIELD_PER = 200
+
+# Statistics cache shared by all query service instances
+stats_cache = MetricsCacheService()
+
+
+class utc_hours_ago(FunctionElement):
+    """
+    Database-side UTC time a number of hours ago.
+    
+    The cutoff is computed by the database clock, so the statement text and
+    parameters stay the same between calls. Usage: ``utc_hours_ago(hours)``.
+    """
+    type = DateTime()
+    inherit_cache = True
+    name = "utc_hours_ago"
+
+
+@compiles(utc_hours_ago)
+def _compile_utc_hours_ago(element, compiler, **kw):
+    hours = compiler.process(element.clauses, **kw)
+    return f"(timezone('utc', now()) - make_interval(hours => {hours}))"
+
+
+@compiles(utc_hours_ago, "sqlite")
+def _compile_utc_hours_ago_sqlite(element, compiler, **kw):
+    hours = compiler.process(element.clauses, **kw)
+    return f"datetime('now', '-' || {hours} || ' hours')"
+
+
+class utc_now(FunctionElement):
+    """
+    Database-side current UTC time, for naive UTC DateTime columns.
+    """
+    type = DateTime()
+    inherit_cache = True
+    name = "utc_now"
+
+
+@compiles(utc_now)
+def _compile_utc_now(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+@compiles(utc_now, "sqlite")
+def _compile_utc_now_sqlite(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+def _stats_tag(constituency_id: Optional[str]) -> str:
+    return f"transactions:{constituency_id or 'all'}"
+
+
+def _cached_stats(name: str):
+    """
+    Cache a statistics method, keyed by its constituency and hours arguments.
+    
+    Each call returns a deep copy of the cached result, so a caller that
+    mutates its result cannot corrupt what other callers are served.
+    """
+    cache_decorator = cached(
+        ttl=STATS_CACHE_TTL,
+        key_fn=lambda self, constituency_id=None, hours=1: f"transaction_stats:{name}:{constituency_id}:{hours}",
+        tags_fn=lambda self, constituency_id=None, hours=1: [_stats_tag(constituency_id)]
+    )
+    
+    def decorator(func):
+        cached_func = cache_decorator(func)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return copy.deepcopy(cached_func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def invalidate_transaction_stats(constituency_ids: Iterable[str]) -> int:
+    """
+    Invalidate cached statistics after transactions were written.
+    
+    Args:
+        constituency_ids: IDs of the constituencies that received transactions
+        
+    Returns:
+        Number of cache entries invalidated
+    """
+    count = stats_cache.invalidate_tag(_stats_tag(None))
+    for constituency_id in set(constituency_ids):
+        count += stats_cache.invalidate_tag(_stats_tag(constituency_id))
+    return count
+
 
 class TransactionQueryService:
     """
@@ -29,10 +131,14 @@ class TransactionQueryService:
         """
         Initialize the query service.
         
+        Statistics are cached in the shared ``stats_cache``, the cache that
+        invalidate_transaction_stats clears after transactions are written.
+        
         Args:
-            db: Database session
+            db: Database session from the pooled ``SessionLocal`` factory
         """
         self.db = db
+        self.cache = stats_cache
     
     def build_query(
         self,
@@ -108,29 +214,110 @@ class TransactionQueryService:
         
         return query
     
-    def execute_query(self, query, page: int = 1, limit: int = 100) -> Tuple[List[Transaction], int]:
+    def _count(self, query) -> int:
+        """
+        Count the rows matching a transaction query's filters.
+        
+        Issues ``SELECT count(*) FROM transactions WHERE ...`` directly instead
+        of ``Query.count()``, which wraps the whole query in a subselect.
+        
+        Args:
+            query: SQLAlchemy query over Transaction
+            
+        Returns:
+            Number of matching transactions
+        """
+        count_stmt = select(func.count()).select_from(Transaction)
+        if query.whereclause is not None:
+            count_stmt = count_stmt.where(query.whereclause)
+        return self.db.scalar(count_stmt) or 0
+    
+    def execute_query(
+        self,
+        query,
+        page: int = 1,
+        limit: int = 100,
+        stream: bool = False
+    ) -> Tuple[Union[List[Transaction], Iterator[Transaction]], int]:
         """
         Execute a query with pagination.
         
+        The total count is returned with every row by a ``COUNT(*) OVER ()``
+        window, so the filtered set is only scanned once.
+        
         Args:
             query: SQLAlchemy query
             page: Page number
             limit: Items per page
+            stream: Return an iterator that fetches rows from the database in
+                chunks of STREAM_YIELD_PER instead of a fully loaded list
             
         Returns:
             Tuple of (transactions, total_count)
         """
-        # Get total count
-        total = query.count()
+        # Apply pagination with the total count as an extra column
+        paged_query = query.add_columns(
+            func.count().over().label("total_count")
+        ).offset((page - 1) * limit).limit(limit)
+        
+        if stream:
+            rows = iter(paged_query.yield_per(STREAM_YIELD_PER))
+            first_row = next(rows, None)
+            if first_row is None:
+                return iter(()), self._count(query) if page > 1 else 0
+            return (row[0] for row in chain([first_row], rows)), first_row[-1]
         
-        # Apply pagination
-        query = query.offset((page - 1) * limit).limit(limit)
+        rows = paged_query.all()
         
-        # Execute query
-        transactions = query.all()
+        if not rows:
+            # Past the last page the window yields no rows to read it from
+            total = self._count(query) if page > 1 else 0
+            return [], total
+        
+        transactions = [row[0] for row in rows]
+        total = rows[0][-1]
         
         return transactions, total
     
+    def execute_keyset_query(
+        self,
+        query,
+        cursor: Optional[Tuple[datetime, str]] = None,
+        limit: int = 100
+    ) -> Tuple[List[Transaction], Optional[Tuple[datetime, str]]]:
+        """
+        Execute a query with keyset pagination, newest transactions first.
+        
+        Rather than skipping ``OFFSET`` rows, each page starts right after the
+        ``(timestamp, id)`` of the previous page's last row, so deep pages
+        cost the same as the first one. Any ordering on the query is replaced
+        by ``timestamp DESC, id DESC``.
+        
+        Args:
+            query: SQLAlchemy query
+            cursor: ``(timestamp, id)`` of the last row of the previous page,
+                or None for the first page
+            limit: Items per page
+            
+        Returns:
+            Tuple of (transactions, next_cursor); next_cursor is None on the
+            last page
+        """
+        query = query.order_by(None).order_by(desc(Transaction.timestamp), desc(Transaction.id))
+        
+        if cursor is not None:
+            query = query.filter(tuple_(Transaction.timestamp, Transaction.id) < tuple_(*cursor))
+        
+        transactions = query.limit(limit).all()
+        
+        next_cursor = None
+        if len(transactions) == limit:
+            last = transactions[-1]
+            next_cursor = (last.timestamp, last.id)
+        
+        return transactions, next_cursor
+    
+    @_cached_stats("transaction_counts_by_hour")
     def get_transaction_counts_by_hour(self, constituency_id: str) -> Dict[int, int]:
         """
         Get transaction counts by hour for a constituency.
@@ -150,6 +337,7 @@ class TransactionQueryService:
         
         return {int(hour): count for hour, count in result}
     
+    @_cached_stats("transaction_counts_by_day")
     def get_transaction_counts_by_day(self, constituency_id: str) -> Dict[str, int]:
         """
         Get transaction counts by day for a constituency.
@@ -169,6 +357,7 @@ class TransactionQueryService:
         
         return {str(day): count for day, count in result}
     
+    @_cached_stats("transaction_counts_by_type")
     def get_transaction_counts_by_type(self, constituency_id: Optional[str] = None) -> Dict[str, int]:
         """
         Get transaction counts by type.
@@ -191,6 +380,7 @@ class TransactionQueryService:
         
         return {type_: count for type_, count in result}
     
+    @_cached_stats("transaction_counts_by_status")
     def get_transaction_counts_by_status(self, constituency_id: Optional[str] = None) -> Dict[str, int]:
         """
         Get transaction counts by status.
@@ -213,6 +403,7 @@ class TransactionQueryService:
         
         return {status: count for status, count in result}
     
+    @_cached_stats("transaction_counts_by_source")
     def get_transaction_counts_by_source(self, constituency_id: Optional[str] = None) -> Dict[str, int]:
         """
         Get transaction counts by source.
@@ -235,6 +426,7 @@ class TransactionQueryService:
         
         return {source if source else "unknown": count for source, count in result}
     
+    @_cached_stats("transaction_rate")
     def get_transaction_rate(
         self,
         constituency_id: Optional[str] = None,
@@ -250,23 +442,19 @@ class TransactionQueryService:
         Returns:
             Transactions per hour
         """
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(hours=hours)
-        
-        query = self.db.query(func.count(Transaction.id))
-        
-        query = query.filter(
-            Transaction.timestamp >= start_time,
-            Transaction.timestamp <= end_time
-        )
+        filters = [
+            Transaction.timestamp >= utc_hours_ago(hours),
+            Transaction.timestamp <= utc_hours_ago(0)
+        ]
         
         if constituency_id:
-            query = query.filter(Transaction.constituency_id == constituency_id)
+            filters.append(Transaction.constituency_id == constituency_id)
         
-        count = query.scalar() or 0
+        count = self.db.query(func.count(Transaction.id)).filter(*filters).scalar() or 0
         
         return count / hours if hours > 0 else 0
     
+    @_cached_stats("anomaly_statistics")
     def get_anomaly_statistics(self, constituency_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get statistics about anomalies.
@@ -277,79 +465,138 @@ class TransactionQueryService:
         Returns:
             Dictionary with anomaly statistics
         """
-        # Base query
-        query = self.db.query(Transaction)
+        # One grouped count yields the total, the anomaly count and the reasons
+        query = self.db.query(
+            Transaction.anomaly_detected,
+            Transaction.anomaly_reason,
+            func.count(Transaction.id)
+        )
         
         if constituency_id:
             query = query.filter(Transaction.constituency_id == constituency_id)
         
-        # Total transactions
-        total_count = query.count()
+        result = query.group_by(Transaction.anomaly_detected, Transaction.anomaly_reason).all()
         
-        # Anomaly count
-        anomaly_count = query.filter(Transaction.anomaly_detected == True).count()
+        total_count = 0
+        anomaly_count = 0
+        anomaly_reasons = defaultdict(int)
+        for anomaly_detected, reason, count in result:
+            total_count += count
+            if anomaly_detected:
+                anomaly_count += count
+                anomaly_reasons[reason if reason else "unknown"] += count
         
         # Anomaly percentage
         anomaly_percentage = (anomaly_count / total_count * 100) if total_count > 0 else 0
         
-        # Anomaly reasons
-        reason_query = self.db.query(
-            Transaction.anomaly_reason,
-            func.count(Transaction.id)
-        ).filter(
-            Transaction.anomaly_detected == True
-        )
-        
-        if constituency_id:
-            reason_query = reason_query.filter(Transaction.constituency_id == constituency_id)
-        
-        reason_result = reason_query.group_by(Transaction.anomaly_reason).all()
-        
-        anomaly_reasons = {
-            reason if reason else "unknown": count
-            for reason, count in reason_result
-        }
-        
         return {
             "total_transactions": total_count,
             "anomaly_count": anomaly_count,
             "anomaly_percentage": anomaly_percentage,
-            "anomaly_reasons": anomaly_reasons
+            "anomaly_reasons": dict(anomaly_reasons)
         }
     
+    @_cached_stats("transaction_statistics")
     def get_transaction_statistics(self, constituency_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get comprehensive transaction statistics.
         
+        All statistics are computed from a single aggregate query grouped by
+        every dimension that is reported, and then rolled up per dimension.
+        
         Args:
             constituency_id: Optional constituency ID to filter by
             
         Returns:
             Dictionary with transaction statistics
         """
+        now = utc_hours_ago(0)
+        hour_ago = utc_hours_ago(1)
+        day_ago = utc_hours_ago(24)
+        
+        group_columns = [
+            Transaction.type,
+            Transaction.status,
+            Transaction.source,
+            Transaction.anomaly_detected,
+            Transaction.anomaly_reason
+        ]
+        if constituency_id:
+            group_columns += [
+                extract('hour', Transaction.timestamp).label('hour'),
+                func.date(Transaction.timestamp).label('day')
+            ]
+        
+        query = self.db.query(
+            *group_columns,
+            func.count(Transaction.id),
+            func.sum(case((and_(Transaction.timestamp >= hour_ago, Transaction.timestamp <= now), 1), else_=0)),
+            func.sum(case((and_(Transaction.timestamp >= day_ago, Transaction.timestamp <= now), 1), else_=0))
+        )
+        
+        if constituency_id:
+            query = query.filter(Transaction.constituency_id == constituency_id)
+        
+        rows = query.group_by(*group_columns).all()
+        
+        counts_by_type = defaultdict(int)
+        counts_by_status = defaultdict(int)
+        counts_by_source = defaultdict(int)
+        counts_by_hour = defaultdict(int)
+        counts_by_day = defaultdict(int)
+        anomaly_reasons = defaultdict(int)
+        anomaly_count = 0
+        last_hour_count = 0
+        last_day_count = 0
+        
+        for row in rows:
+            type_, status, source, anomaly_detected, anomaly_reason = row[:5]
+            count, last_hour, last_day = row[-3:]
+            
+            counts_by_type[type_] += count
+            counts_by_status[status] += count
+            counts_by_source[source if source else "unknown"] += count
+            last_hour_count += last_hour or 0
+            last_day_count += last_day or 0
+            
+            if anomaly_detected:
+                anomaly_count += count
+                anomaly_reasons[anomaly_reason if anomaly_reason else "unknown"] += count
+            
+            if constituency_id:
+                hour, day = row[5], row[6]
+                counts_by_hour[int(hour)] += count
+                counts_by_day[str(day)] += count
+        
         stats = {}
         
         # Basic counts
-        stats["counts_by_type"] = self.get_transaction_counts_by_type(constituency_id)
-        stats["counts_by_status"] = self.get_transaction_counts_by_status(constituency_id)
-        stats["counts_by_source"] = self.get_transaction_counts_by_source(constituency_id)
+        stats["counts_by_type"] = dict(counts_by_type)
+        stats["counts_by_status"] = dict(counts_by_status)
+        stats["counts_by_source"] = dict(counts_by_source)
         
         # Total counts
-        stats["total_transactions"] = sum(stats["counts_by_type"].values())
-        stats["total_bulletins"] = stats["counts_by_type"].get("blindSigIssue", 0)
-        stats["total_votes"] = stats["counts_by_type"].get("vote", 0)
+        total_count = sum(counts_by_type.values())
+        stats["total_transactions"] = total_count
+        stats["total_bulletins"] = counts_by_type.get("blindSigIssue", 0)
+        stats["total_votes"] = counts_by_type.get("vote", 0)
         
         # Rates
-        stats["transactions_per_hour"] = self.get_transaction_rate(constituency_id, 1)
-        stats["transactions_per_day"] = self.get_transaction_rate(constituency_id, 24)
+        stats["transactions_per_hour"] = float(last_hour_count)
+        stats["transactions_per_day"] = last_day_count / 24
         
         # Time-based statistics
         if constituency_id:
-            stats["counts_by_hour"] = self.get_transaction_counts_by_hour(constituency_id)
-            stats["counts_by_day"] = self.get_transaction_counts_by_day(constituency_id)
+            stats["counts_by_hour"] = dict(counts_by_hour)
+            stats["counts_by_day"] = dict(counts_by_day)
         
         # Anomaly statistics
-        stats["anomalies"] = self.get_anomaly_statistics(constituency_id)
+        stats["anomalies"] = {
+            "total_transactions": total_count,
+            "anomaly_count": anomaly_count,
+            "anomaly_percentage": (anomaly_count / total_count * 100) if total_count > 0 else 0,
+            "anomaly_reasons": dict(anomaly_reasons)
+        }
         
         return stats
     
@@ -357,6 +604,9 @@ class TransactionQueryService:
         """
         Search for transactions.
         
+        The term is split on whitespace and a transaction matches when every
+        word occurs in one of its searchable columns.
+        
         Args:
             search_term: Search term
             page: Page number
@@ -365,17 +615,11 @@ class TransactionQueryService:
         Returns:
             Tuple of (transactions, total_count)
         """
-        # Build query with OR conditions for different fields
+        # Match against the concatenated searchable columns, one predicate per
+        # word; words contain no spaces, so a match never spans two columns
+        document = search_document(Transaction.__table__.c)
         query = self.db.query(Transaction).filter(
-            or_(
-                Transaction.id.ilike(f"%{search_term}%"),
-                Transaction.constituency_id.ilike(f"%{search_term}%"),
-                Transaction.type.ilike(f"%{search_term}%"),
-                Transaction.status.ilike(f"%{search_term}%"),
-                Transaction.source.ilike(f"%{search_term}%"),
-                Transaction.file_id.ilike(f"%{search_term}%"),
-                Transaction.anomaly_reason.ilike(f"%{search_term}%")
-            )
+            *(document.ilike(f"%{word}%") for word in search_term.split())
         )
         
         return self.execute_query(query, page, limit)
\ No newline at end of file
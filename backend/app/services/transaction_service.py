@@ -7,6 +7,7 @@ transactions to the database and updating constituency metrics.
 
 import logging
 from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -14,7 +15,10 @@ from app.crud.transaction import transaction_crud
 from app.crud.constituency import constituency_crud
 from app.models.schemas.processing_result import TransactionData
 from app.models.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse
+from app.models.constituency import Constituency
 from app.models.transaction import Transaction
+from app.services.transaction_query_service import invalidate_transaction_stats, utc_now
+from app.services.transaction_validator import VALID_TYPES
 from app.api.errors.exceptions import (
     TransactionSaveError, MetricsUpdateError, TransactionCreateError,
     TransactionUpdateError, TransactionDeleteError, TransactionValidationError
@@ -23,6 +27,13 @@ from app.api.errors.exceptions import (
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Number of new transactions staged before save_transactions commits
+SAVE_COMMIT_SIZE = 10_000
+
+# Rows per savepoint in process_transaction_batch; a failing chunk is rolled
+# back and retried row by row without affecting the other chunks
+BATCH_CHUNK_SIZE = 500
+
 
 class TransactionService:
     """
@@ -59,55 +70,64 @@ class TransactionService:
         """
         try:
             saved_count = 0
+            pending: List[Dict[str, Any]] = []
             
             logger.info(f"Saving {len(transactions)} transactions to database")
             
+            # Map each transaction straight to its column values
+            rows = []
             for transaction_data in transactions:
-                logger.debug(f"Processing transaction: {transaction_data.transaction_id}")
-                
-                # Check if transaction already exists using validator
-                if self.validator.check_duplicate(self.db, transaction_data.transaction_id):
-                    logger.debug(f"Transaction {transaction_data.transaction_id} already exists, skipping")
+                try:
+                    timestamp = datetime.fromisoformat(transaction_data.timestamp)
+                except (TypeError, ValueError):
+                    logger.warning(
+                        f"Transaction {transaction_data.transaction_id} has an unparseable "
+                        f"timestamp {transaction_data.timestamp!r}, skipping"
+                    )
                     continue
+                # The rows below skip the schema, which is what checks the type
+                if transaction_data.type not in VALID_TYPES:
+                    logger.warning(
+                        f"Transaction {transaction_data.transaction_id} has an unknown "
+                        f"type {transaction_data.type!r}, skipping"
+                    )
+                    continue
+                rows.append({
+                    "id": transaction_data.transaction_id,
+                    "constituency_id": transaction_data.constituency_id,
+                    "block_height": transaction_data.block_height,
+                    "timestamp": timestamp,
+                    "type": transaction_data.type,
+                    "raw_data": transaction_data.raw_data,
+                    "operation_data": transaction_data.operation_data,
+                    "status": "processed",
+                    "source": "file_upload",
+                    "file_id": getattr(transaction_data, 'file_id', None)
+                })
+            
+            # Validate the whole input at once; model_construct() skips the
+            # schema validation, whose rules were applied while mapping the rows
+            validation_results = self.validator.validate_transaction_batch(
+                self.db,
+                [TransactionCreate.model_construct(**row) for row in rows]
+            )
+            
+            for i, row in enumerate(rows):
+                # Lazy %-formatting: this runs per row and debug is usually off
+                logger.debug("Processing transaction: %s", row["id"])
                 
-                # Convert TransactionData to TransactionCreate
-                transaction_create = TransactionCreate(
-                    constituency_id=transaction_data.constituency_id,
-                    block_height=transaction_data.block_height,
-                    timestamp=datetime.fromisoformat(transaction_data.timestamp),
-                    type=transaction_data.type,
-                    raw_data=transaction_data.raw_data,
-                    operation_data=transaction_data.operation_data,
-                    status="processed",
-                    source="file_upload",
-                    file_id=getattr(transaction_data, 'file_id', None)
-                )
-                
-                # Validate transaction data
-                errors = self.validator.validate_transaction(self.db, transaction_create)
+                errors = validation_results.get(i)
                 if errors:
-                    logger.warning(f"Transaction {transaction_data.transaction_id} validation failed: {errors}")
+                    logger.warning(f"Transaction {row['id']} validation failed: {errors}")
                     continue
                 
-                # Create transaction with the transaction_id as the ID
-                from app.models.transaction import Transaction
-                db_obj = Transaction(
-                    id=transaction_data.transaction_id,
-                    constituency_id=transaction_create.constituency_id,
-                    block_height=transaction_create.block_height,
-                    timestamp=transaction_create.timestamp,
-                    type=transaction_create.type,
-                    raw_data=transaction_create.raw_data,
-                    operation_data=transaction_create.operation_data,
-                    status=transaction_create.status,
-                    source=transaction_create.source,
-                    file_id=transaction_create.file_id
-                )
-                self.db.add(db_obj)
-                self.db.commit()
-                self.db.refresh(db_obj)
-                saved_count += 1
-                logger.debug(f"Saved transaction {transaction_data.transaction_id}")
+                # Duplicates are skipped by the insert itself
+                pending.append(row)
+                
+                if len(pending) >= SAVE_COMMIT_SIZE:
+                    saved_count += self._commit_pending(pending)
+            
+            saved_count += self._commit_pending(pending)
             
             logger.info(f"Saved {saved_count} transactions to database")
             return saved_count
@@ -116,6 +136,27 @@ class TransactionService:
             self.db.rollback()
             raise TransactionSaveError(f"Failed to save transactions: {e}")
     
+    def _commit_pending(self, pending: List[Dict[str, Any]]) -> int:
+        """
+        Insert staged transaction rows and commit them in one go.
+        
+        Args:
+            pending: Staged transaction rows; cleared once committed
+            
+        Returns:
+            Number of transactions inserted, excluding already stored IDs
+        """
+        if not pending:
+            return 0
+        
+        count = transaction_crud.create_ignore_existing(db=self.db, rows=pending)
+        logger.debug("Committed %d of %d transactions", count, len(pending))
+        if count:
+            # The cached dashboard statistics no longer match the committed rows
+            invalidate_transaction_stats(row["constituency_id"] for row in pending)
+        pending.clear()
+        return count
+    
     def update_constituency_metrics(self, constituency_id: str) -> None:
         """
         Update constituency metrics based on transactions.
@@ -127,36 +168,52 @@ class TransactionService:
             MetricsUpdateError: If update fails
         """
         try:
-            # Get constituency
-            constituency = constituency_crud.get(db=self.db, id=constituency_id)
-            if not constituency:
+            # Read only the columns the metrics depend on
+            current = self.db.execute(
+                select(
+                    Constituency.registered_voters,
+                    Constituency.bulletins_issued,
+                    Constituency.votes_cast,
+                    Constituency.participation_rate
+                ).where(Constituency.id == constituency_id)
+            ).first()
+            if current is None:
                 raise MetricsUpdateError(f"Constituency not found: {constituency_id}")
             
-            # Get transactions for constituency
-            transactions = transaction_crud.get_by_constituency(
+            # Count bulletins and votes in the database
+            counts = transaction_crud.get_transaction_counts_by_type(
                 db=self.db,
                 constituency_id=constituency_id
             )
-            
-            # Count bulletins and votes
-            bulletins_issued = sum(1 for t in transactions if t.type == "blindSigIssue")
-            votes_cast = sum(1 for t in transactions if t.type == "vote")
+            bulletins_issued = counts.get("blindSigIssue", 0)
+            votes_cast = counts.get("vote", 0)
             
             # Calculate participation rate
             participation_rate = 0.0
-            if constituency.registered_voters > 0 and bulletins_issued > 0:
-                participation_rate = (votes_cast / constituency.registered_voters) * 100
-            
-            # Update constituency
-            constituency.bulletins_issued = bulletins_issued
-            constituency.votes_cast = votes_cast
-            constituency.participation_rate = participation_rate
-            constituency.last_update_time = datetime.utcnow()
-            
-            # Save changes
-            self.db.add(constituency)
+            if current.registered_voters > 0 and bulletins_issued > 0:
+                participation_rate = (votes_cast / current.registered_voters) * 100
+            
+            # Skip the write when nothing changed since the last update
+            if (
+                current.bulletins_issued == bulletins_issued
+                and current.votes_cast == votes_cast
+                and current.participation_rate == participation_rate
+            ):
+                logger.debug("Metrics for constituency %s unchanged, skipping update", constituency_id)
+                return
+            
+            # Update constituency in place, stamped by the database clock
+            self.db.execute(
+                update(Constituency)
+                .where(Constituency.id == constituency_id)
+                .values(
+                    bulletins_issued=bulletins_issued,
+                    votes_cast=votes_cast,
+                    participation_rate=participation_rate,
+                    last_update_time=utc_now()
+                )
+            )
             self.db.commit()
-            self.db.refresh(constituency)
             
             logger.info(
                 f"Updated metrics for constituency {constituency_id}: "
@@ -185,26 +242,21 @@ class TransactionService:
                 logger.warning(f"Constituency not found: {constituency_id}")
                 return {}
             
-            # Get transactions for constituency
-            transactions = transaction_crud.get_by_constituency(
+            # Count transactions by type
+            transaction_counts = transaction_crud.get_transaction_counts_by_type(
                 db=self.db,
                 constituency_id=constituency_id
             )
             
-            # Count transactions by type
-            transaction_counts = {}
-            for t in transactions:
-                transaction_counts[t.type] = transaction_counts.get(t.type, 0) + 1
-            
             # Get latest transaction timestamp
-            latest_timestamp = None
-            if transactions:
-                latest_transaction = max(transactions, key=lambda t: t.timestamp)
-                latest_timestamp = latest_transaction.timestamp
+            latest_timestamp = transaction_crud.get_latest_timestamp(
+                db=self.db,
+                constituency_id=constituency_id
+            )
             
             # Create statistics
             statistics = {
-                "total_transactions": len(transactions),
+                "total_transactions": sum(transaction_counts.values()),
                 "bulletins_issued": constituency.bulletins_issued,
                 "votes_cast": constituency.votes_cast,
                 "participation_rate": constituency.participation_rate,
@@ -263,6 +315,7 @@ class TransactionService:
             
             # Create transaction
             transaction = transaction_crud.create(db=self.db, obj_in=transaction_data)
+            invalidate_transaction_stats([transaction.constituency_id])
             logger.info(f"Created transaction {transaction.id}")
             return transaction
         except TransactionValidationError as e:
@@ -294,8 +347,11 @@ class TransactionService:
                 logger.warning(f"Transaction not found: {transaction_id}")
                 return None
             
-            # Update transaction
+            # Update transaction; it may move to another constituency, so
+            # invalidate the stats of both the old and the new one
+            old_constituency_id = transaction.constituency_id
             transaction = transaction_crud.update(db=self.db, id=transaction_id, obj_in=transaction_data)
+            invalidate_transaction_stats([old_constituency_id, transaction.constituency_id])
             logger.info(f"Updated transaction {transaction_id}")
             return transaction
         except Exception as e:
@@ -324,7 +380,9 @@ class TransactionService:
                 return False
             
             # Delete transaction
+            constituency_id = transaction.constituency_id
             transaction_crud.remove(db=self.db, id=transaction_id)
+            invalidate_transaction_stats([constituency_id])
             logger.info(f"Deleted transaction {transaction_id}")
             return True
         except Exception as e:
@@ -393,6 +451,9 @@ class TransactionService:
         """
         Process a batch of transactions.
         
+        The chunks are committed together, so an error in any chunk rolls
+        back the whole batch.
+        
         Args:
             transactions: List of transactions to process
             
@@ -406,13 +467,37 @@ class TransactionService:
             # Validate transactions
             validation_results = self.validator.validate_transaction_batch(self.db, transactions)
             
-            # Create batch
-            result = transaction_crud.create_batch(db=self.db, obj_in_list=transactions)
+            result = {
+                "success": True,
+                "processed": 0,
+                "failed": 0,
+                "errors": []
+            }
+            
+            # Insert chunk by chunk; create_batch wraps each chunk in its own
+            # savepoint, and everything is committed once at the end
+            for start in range(0, len(transactions), BATCH_CHUNK_SIZE):
+                chunk_result = transaction_crud.create_batch(
+                    db=self.db,
+                    obj_in_list=transactions[start:start + BATCH_CHUNK_SIZE],
+                    commit=False
+                )
+                result["success"] = result["success"] and chunk_result["success"]
+                result["processed"] += chunk_result["processed"]
+                result["failed"] += chunk_result["failed"]
+                result["errors"].extend(
+                    {**error, "index": error["index"] + start}
+                    for error in chunk_result["errors"]
+                )
+            self.db.commit()
+            if result["processed"]:
+                invalidate_transaction_stats(t.constituency_id for t in transactions)
             
             # Add validation errors to result
+            errors_by_index = {error["index"]: error for error in result["errors"]}
             for index, errors in validation_results.items():
-                if index < len(result["errors"]):
-                    result["errors"][index]["validation_errors"] = errors
+                if index in errors_by_index:
+                    errors_by_index[index]["validation_errors"] = errors
                 else:
                     result["errors"].append({
                         "index": index,
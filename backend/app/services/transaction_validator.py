@@ -4,13 +4,29 @@ Transaction validator for the Election Monitoring System.
 This module provides validation services for transaction data.
 """
 
-from typing import List, Dict, Optional
+import time
+from collections import OrderedDict
+from typing import List, Dict, Optional, Set, Iterable
 from datetime import datetime
+from sqlalchemy import exists, lambda_stmt, select
 from sqlalchemy.orm import Session
 
+from app.models.constituency import Constituency
+from app.models.transaction import Transaction
 from app.models.schemas.transaction import TransactionCreate
-from app.crud.transaction import transaction_crud
-from app.crud.constituency import constituency_crud
+
+# Maximum number of confirmed constituency IDs a validator remembers
+CONSTITUENCY_CACHE_SIZE = 256
+
+# Seconds a confirmed constituency ID is trusted before it is looked up again
+CONSTITUENCY_CACHE_TTL = 60
+
+# Maximum number of IDs bound into one IN (...) lookup
+IN_CLAUSE_CHUNK_SIZE = 500
+
+# Allowed values checked by validate_transaction
+VALID_TYPES = frozenset({"blindSigIssue", "vote"})
+VALID_SOURCES = frozenset({"file_upload", "api", "batch"})
 
 
 class TransactionValidator:
@@ -20,13 +36,72 @@ class TransactionValidator:
     This class provides methods for validating transaction data against business rules.
     """
     
-    def validate_transaction(self, db: Session, transaction_data: TransactionCreate) -> List[str]:
+    def __init__(self):
+        """
+        Initialize the validator.
+        
+        Only constituencies confirmed to exist are remembered, so a lookup
+        can never be answered from a stale negative result. Remembered IDs
+        form an LRU cache whose entries expire after CONSTITUENCY_CACHE_TTL.
+        """
+        # Constituency ID -> monotonic time the entry expires at
+        self._known_constituency_ids: OrderedDict[str, float] = OrderedDict()
+    
+    def _remember_constituencies(self, constituency_ids: Iterable[str]) -> None:
+        """
+        Remember constituency IDs confirmed to exist, evicting the least
+        recently used IDs beyond CONSTITUENCY_CACHE_SIZE.
+        
+        Args:
+            constituency_ids: IDs known to exist
+        """
+        expires_at = time.monotonic() + CONSTITUENCY_CACHE_TTL
+        for constituency_id in constituency_ids:
+            self._known_constituency_ids[constituency_id] = expires_at
+            self._known_constituency_ids.move_to_end(constituency_id)
+        while len(self._known_constituency_ids) > CONSTITUENCY_CACHE_SIZE:
+            self._known_constituency_ids.popitem(last=False)
+    
+    def _recall_constituencies(self, constituency_ids: Iterable[str]) -> Set[str]:
+        """
+        Get which of the given constituency IDs are remembered and unexpired.
+        
+        Args:
+            constituency_ids: IDs to look up
+            
+        Returns:
+            Set of the IDs known to exist
+        """
+        now = time.monotonic()
+        known = set()
+        for constituency_id in constituency_ids:
+            expires_at = self._known_constituency_ids.get(constituency_id)
+            if expires_at is None:
+                continue
+            if expires_at <= now:
+                del self._known_constituency_ids[constituency_id]
+                continue
+            self._known_constituency_ids.move_to_end(constituency_id)
+            known.add(constituency_id)
+        return known
+    
+    def validate_transaction(
+        self,
+        db: Session,
+        transaction_data: TransactionCreate,
+        existing_constituency_ids: Optional[Set[str]] = None,
+        now: Optional[datetime] = None
+    ) -> List[str]:
         """
         Validate a transaction.
         
         Args:
             db: Database session
             transaction_data: Transaction data to validate
+            existing_constituency_ids: Optional set of known constituency IDs;
+                when given, constituency existence is checked against it
+                instead of the database
+            now: Optional reference time for the timestamp check
             
         Returns:
             List of validation errors, empty if valid
@@ -34,11 +109,29 @@ class TransactionValidator:
         errors = []
         
         # Validate constituency existence
-        if not self._validate_constituency_exists(db, transaction_data.constituency_id):
-            errors.append(f"Constituency with ID {transaction_data.constituency_id} does not exist")
+        if not self._validate_constituency_exists(
+            db, transaction_data.constituency_id, existing_constituency_ids
+        ):
+            errors.append(self._constituency_error(transaction_data.constituency_id))
+        
+        errors.extend(self._validate_fields(transaction_data, now))
+        return errors
+    
+    def _validate_fields(self, transaction_data: TransactionCreate, now: Optional[datetime] = None) -> List[str]:
+        """
+        Run the in-memory checks of a transaction, without touching the database.
+        
+        Args:
+            transaction_data: Transaction data to validate
+            now: Optional reference time for the timestamp check
+            
+        Returns:
+            List of validation errors, empty if valid
+        """
+        errors = []
         
         # Validate timestamp
-        if not self._validate_timestamp(transaction_data.timestamp):
+        if not self._validate_timestamp(transaction_data.timestamp, now):
             errors.append("Timestamp is invalid or in the future")
         
         # Validate block height
@@ -49,24 +142,22 @@ class TransactionValidator:
         if not self._validate_raw_data(transaction_data.raw_data):
             errors.append("Raw data has invalid structure")
         
-        # Validate transaction type
-        # Note: This is already validated by Pydantic schema, but we include it here for completeness
-        if transaction_data.type not in ["blindSigIssue", "vote"]:
-            errors.append("Transaction type must be one of: blindSigIssue, vote")
-        
-        # Validate status
-        # Note: This is already validated by Pydantic schema, but we include it here for completeness
-        if transaction_data.status not in ["pending", "processed", "failed"]:
-            errors.append("Status must be one of: pending, processed, failed")
+        # Type and status are enforced by the TransactionCreate schema
         
         # Validate source
-        if transaction_data.source and transaction_data.source not in ["file_upload", "api", "batch"]:
+        if transaction_data.source and transaction_data.source not in VALID_SOURCES:
             errors.append("Source must be one of: file_upload, api, batch")
         
         return errors
     
+    def _constituency_error(self, constituency_id: str) -> str:
+        return f"Constituency with ID {constituency_id} does not exist"
+    
     def validate_transaction_batch(
-        self, db: Session, transactions: List[TransactionCreate]
+        self,
+        db: Session,
+        transactions: List[TransactionCreate],
+        existing_constituency_ids: Optional[Set[str]] = None
     ) -> Dict[int, List[str]]:
         """
         Validate a batch of transactions.
@@ -74,17 +165,37 @@ class TransactionValidator:
         Args:
             db: Database session
             transactions: List of transactions to validate
+            existing_constituency_ids: Optional prefetched set of the batch's
+                constituency IDs that exist; looked up when not given
             
         Returns:
             Dictionary mapping transaction index to validation errors
         """
         validation_results = {}
         
+        # Run the cheap in-memory checks first, all against the same
+        # reference time
+        now = datetime.utcnow()
         for i, transaction in enumerate(transactions):
-            errors = self.validate_transaction(db, transaction)
+            errors = self._validate_fields(transaction, now)
             if errors:
                 validation_results[i] = errors
         
+        # Only rows that passed still need their constituency checked; look
+        # those up with one query
+        candidates = [
+            (i, transaction) for i, transaction in enumerate(transactions)
+            if i not in validation_results
+        ]
+        if existing_constituency_ids is None:
+            existing_constituency_ids = self.get_existing_constituency_ids(
+                db, {transaction.constituency_id for _, transaction in candidates}
+            )
+        
+        for i, transaction in candidates:
+            if transaction.constituency_id not in existing_constituency_ids:
+                validation_results[i] = [self._constituency_error(transaction.constituency_id)]
+        
         return validation_results
     
     def check_duplicate(self, db: Session, transaction_id: str) -> bool:
@@ -98,34 +209,111 @@ class TransactionValidator:
         Returns:
             True if duplicate, False otherwise
         """
-        transaction = transaction_crud.get(db, transaction_id)
-        return transaction is not None
+        # lambda_stmt caches the statement construction as well as its
+        # compiled form; transaction_id is extracted as a bound parameter
+        return bool(db.scalar(
+            lambda_stmt(lambda: select(exists().where(Transaction.id == transaction_id)))
+        ))
     
-    def _validate_constituency_exists(self, db: Session, constituency_id: str) -> bool:
+    def get_existing_transaction_ids(self, db: Session, transaction_ids: Iterable[str]) -> Set[str]:
+        """
+        Get which of the given transaction IDs are already stored.
+        
+        Args:
+            db: Database session
+            transaction_ids: Transaction IDs to look up
+            
+        Returns:
+            Set of the IDs that already exist
+        """
+        return self._select_existing_ids(db, Transaction.id, set(transaction_ids))
+    
+    def _validate_constituency_exists(
+        self,
+        db: Session,
+        constituency_id: str,
+        known_ids: Optional[Set[str]] = None
+    ) -> bool:
         """
         Validate that a constituency exists.
         
         Args:
             db: Database session
             constituency_id: Constituency ID to check
+            known_ids: Optional prefetched set of existing constituency IDs;
+                when given, no query is issued
             
         Returns:
             True if constituency exists, False otherwise
         """
-        constituency = constituency_crud.get(db, constituency_id)
-        return constituency is not None
+        if known_ids is not None:
+            return constituency_id in known_ids
+        if self._recall_constituencies([constituency_id]):
+            return True
+        
+        if not db.scalar(
+            lambda_stmt(lambda: select(exists().where(Constituency.id == constituency_id)))
+        ):
+            return False
+        self._remember_constituencies([constituency_id])
+        return True
     
-    def _validate_timestamp(self, timestamp: datetime) -> bool:
+    def get_existing_constituency_ids(self, db: Session, constituency_ids: Iterable[str]) -> Set[str]:
+        """
+        Get which of the given constituency IDs exist.
+        
+        Args:
+            db: Database session
+            constituency_ids: Constituency IDs to look up
+            
+        Returns:
+            Set of the IDs that exist
+        """
+        constituency_ids = set(constituency_ids)
+        known = self._recall_constituencies(constituency_ids)
+        unknown = constituency_ids - known
+        if not unknown:
+            return known
+        
+        found = self._select_existing_ids(db, Constituency.id, unknown)
+        self._remember_constituencies(found)
+        return known | found
+    
+    def _select_existing_ids(self, db: Session, id_column, ids: Set[str]) -> Set[str]:
+        """
+        Select which of the given IDs exist, in IN_CLAUSE_CHUNK_SIZE chunks.
+        
+        Chunking keeps each statement well under the bound parameter limits
+        of SQLite and PostgreSQL for very large imports.
+        
+        Args:
+            db: Database session
+            id_column: Primary key column to match against
+            ids: IDs to look up
+            
+        Returns:
+            Set of the IDs that exist
+        """
+        ids = list(ids)
+        found: Set[str] = set()
+        for start in range(0, len(ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+            found.update(db.scalars(select(id_column).where(id_column.in_(chunk))).all())
+        return found
+    
+    def _validate_timestamp(self, timestamp: datetime, now: Optional[datetime] = None) -> bool:
         """
         Validate that a timestamp is valid and not in the future.
         
         Args:
             timestamp: Timestamp to validate
+            now: Optional reference time (defaults to the current UTC time)
             
         Returns:
             True if timestamp is valid, False otherwise
         """
-        now = datetime.utcnow()
+        if now is None:
+            now = datetime.utcnow()
         return timestamp <= now
     
     def _validate_block_height(self, block_height: int) -> bool:
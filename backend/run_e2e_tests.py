@@ -6,15 +6,20 @@ This script starts the FastAPI application with a test database
 and runs E2E tests against the running API.
 """
 
+import argparse
 import os
 import sys
 import subprocess
-import time
 import uvicorn
 import asyncio
 import pytest
 from multiprocessing import Process
 
+from runner_utils import HEALTH_PATH, port_is_open, server_is_healthy, wait_for_port
+
+# Written by --keep-server so a reused server can be stopped later
+SERVER_PID_FILE = "e2e_server.pid"
+
 def run_api_server():
     """Run the FastAPI application in a separate process."""
     # Set environment variable to use test database
@@ -24,14 +29,30 @@ def run_api_server():
     from app.main import app
     
     # Run the server
-    uvicorn.run(app, host="127.0.0.1", port=8000, log_level="info")
+    uvicorn.run(
+        app, host="127.0.0.1", port=8000, loop="uvloop", http="httptools", log_level="warning"
+    )
+
+def start_detached_server():
+    """Start the API server in its own session so it outlives this script."""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", "8000",
+            "--loop", "uvloop", "--http", "httptools", "--log-level", "warning",
+        ],
+        env=dict(os.environ, TESTING="1"),
+        start_new_session=True,
+    )
+    with open(SERVER_PID_FILE, "w") as f:
+        f.write(str(process.pid))
 
 def run_tests():
     """Run the E2E tests."""
-    # Wait for the server to start
-    time.sleep(2)
+    # Wait for the server to start accepting connections
+    wait_for_port("127.0.0.1", 8000)
     
-    # Run the tests
+    # Run serially: every test drives the same server and database
     result = pytest.main(["-xvs", "tests/e2e"])
     
     return result
@@ -69,7 +90,6 @@ async def setup_test_database():
             description="Election for E2E testing",
             timezone="UTC"
         )
-        session.add(test_election)
         
         # Add test constituency
         test_constituency = Constituency(
@@ -85,15 +105,33 @@ async def setup_test_database():
             participation_rate=0.0,
             anomaly_score=0.0
         )
-        session.add(test_constituency)
         
+        session.add_all([test_election, test_constituency])
         await session.commit()
 
 def main():
     """Main function to run the E2E tests."""
+    parser = argparse.ArgumentParser(description="Run the E2E tests against a running API server.")
+    parser.add_argument(
+        "--keep-server",
+        action="store_true",
+        help=f"Leave the API server running (PID in {SERVER_PID_FILE}) and reuse it on later runs"
+    )
+    args = parser.parse_args()
+    
     # Set up the test database
     asyncio.run(setup_test_database())
     
+    if args.keep_server:
+        # Reuse a server left running by an earlier --keep-server run, but
+        # only if what is listening on the port is this API
+        if port_is_open("127.0.0.1", 8000):
+            if not server_is_healthy("127.0.0.1", 8000):
+                sys.exit(f"Port 8000 is in use by a server that does not pass {HEALTH_PATH}")
+        else:
+            start_detached_server()
+        sys.exit(run_tests())
+    
     # Start the API server in a separate process
     server_process = Process(target=run_api_server)
     server_process.start()
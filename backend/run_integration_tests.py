@@ -9,12 +9,13 @@ and runs integration tests against the running API.
 import os
 import sys
 import subprocess
-import time
 import uvicorn
 import asyncio
 import pytest
 from multiprocessing import Process
 
+from runner_utils import wait_for_port
+
 def run_api_server():
     """Run the FastAPI application in a separate process."""
     # Set environment variable to use test database
@@ -28,11 +29,12 @@ def run_api_server():
 
 def run_tests():
     """Run the integration tests."""
-    # Wait for the server to start
-    time.sleep(2)
+    # Wait for the server to start accepting connections
+    wait_for_port("127.0.0.1", 8000)
     
-    # Run the tests
-    result = pytest.main(["-xvs", "tests/api"])
+    # Run the tests in parallel; each worker gets its own database (see
+    # tests/conftest.py) and loadfile keeps a file's tests on one worker
+    result = pytest.main(["-xvs", "tests/api", "-n", "auto", "--dist=loadfile"])
     
     return result
 
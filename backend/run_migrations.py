@@ -10,8 +10,12 @@ import os
 import sys
 import subprocess
 import argparse
+import re
 import sqlite3
 
+# Matches the database URL line of alembic.ini
+SQLALCHEMY_URL_RE = re.compile(r"sqlalchemy\.url = (.*)")
+
 
 def print_header(message):
     """Print a header message."""
@@ -112,8 +116,7 @@ def reset_database(args):
     with open("alembic.ini", "r") as f:
         config = f.read()
     
-    import re
-    match = re.search(r"sqlalchemy.url = (.*)", config)
+    match = SQLALCHEMY_URL_RE.search(config)
     if not match:
         print("Error: Could not find database URL in alembic.ini.")
         return False
@@ -165,9 +168,7 @@ def setup_database_connection(args):
         config = f.read()
     
     # Update the database URL
-    import re
-    config = re.sub(
-        r"sqlalchemy.url = .*",
+    config = SQLALCHEMY_URL_RE.sub(
         f"sqlalchemy.url = {args.database_url}",
         config
     )
@@ -51,6 +51,11 @@ def run_tests(args):
     if args.coverage:
         command.append("--cov=app")
     
+    if args.parallel:
+        # Each worker gets its own database (see tests/conftest.py);
+        # loadfile keeps a file's tests on one worker
+        command.extend(["-n", "auto", "--dist=loadfile"])
+    
     if args.test_path:
         command.append(args.test_path)
     
@@ -140,6 +145,7 @@ def main():
     parser = argparse.ArgumentParser(description="Run tests for the Election Monitoring System.")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
     parser.add_argument("-c", "--coverage", action="store_true", help="Enable coverage report")
+    parser.add_argument("-p", "--parallel", action="store_true", help="Run tests in parallel with pytest-xdist")
     parser.add_argument("--test-path", help="Path to specific test file or directory")
     parser.add_argument("--list", action="store_true", help="List all available tests")
     args = parser.parse_args()
@@ -0,0 +1,43 @@
+"""
+Shared helpers for the integration and E2E test runners.
+
+This module provides the readiness checks used before running tests
+against the API server started by run_integration_tests.py and
+run_e2e_tests.py.
+"""
+
+import json
+import socket
+import time
+import urllib.request
+
+# Health endpoint of the Election Monitoring API
+HEALTH_PATH = "/api/health"
+
+
+def port_is_open(host, port):
+    """Check whether a server is accepting connections on host:port."""
+    try:
+        socket.create_connection((host, port), timeout=0.2).close()
+        return True
+    except OSError:
+        return False
+
+
+def wait_for_port(host, port, timeout=10.0):
+    """Wait until a TCP connection to host:port succeeds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if port_is_open(host, port):
+            return
+        time.sleep(0.05)
+    raise TimeoutError(f"Server at {host}:{port} did not start within {timeout} seconds")
+
+
+def server_is_healthy(host, port, timeout=2.0):
+    """Check whether the server on host:port is this API and reports itself healthy."""
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{HEALTH_PATH}", timeout=timeout) as response:
+            return json.load(response).get("status") == "healthy"
+    except (OSError, ValueError, AttributeError):
+        return False
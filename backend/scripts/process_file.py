@@ -12,16 +12,21 @@ Usage:
 import os
 import sys
 import asyncio
+from collections import Counter
+from operator import attrgetter
 from pathlib import Path
 from sqlalchemy.orm import Session
 
 # Add the parent directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.models.database import SessionLocal
+from app.models.database import SessionLocal, enable_bulk_load_pragmas
 from app.services.file_service import FileService
 from app.services.transaction_service import TransactionService
 
+# Skip fsyncs on SQLite when DB_BULK_LOAD_PRAGMAS=1 is set
+enable_bulk_load_pragmas()
+
 
 def process_file(file_path: str) -> None:
     """
@@ -51,9 +56,7 @@ def process_file(file_path: str) -> None:
         print(f"  Transactions extracted: {len(transactions)}")
         
         # Count transactions by type
-        transaction_types = {}
-        for transaction in transactions:
-            transaction_types[transaction.type] = transaction_types.get(transaction.type, 0) + 1
+        transaction_types = Counter(map(attrgetter("type"), transactions))
         
         print("Transaction types:")
         for transaction_type, count in transaction_types.items():
@@ -113,9 +116,7 @@ def process_directory(directory_path: str) -> None:
         print(f"  Transactions extracted: {len(transactions)}")
         
         # Count transactions by type
-        transaction_types = {}
-        for transaction in transactions:
-            transaction_types[transaction.type] = transaction_types.get(transaction.type, 0) + 1
+        transaction_types = Counter(map(attrgetter("type"), transactions))
         
         print("Transaction types:")
         for transaction_type, count in transaction_types.items():
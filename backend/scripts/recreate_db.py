@@ -11,7 +11,10 @@ import logging
 # Add the parent directory to the path so we can import from app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.models.database import SessionLocal, engine, Base, db_path
+from app.models.database import SessionLocal, enable_bulk_load_pragmas, engine, Base, db_path
+
+# Skip fsyncs on SQLite when DB_BULK_LOAD_PRAGMAS=1 is set
+enable_bulk_load_pragmas()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -10,14 +10,19 @@ import logging
 from datetime import datetime, timedelta
 import random
 
+from sqlalchemy import insert
+
 # Add the parent directory to the path so we can import from app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.models.database import SessionLocal, create_tables
+from app.models.database import SessionLocal, enable_bulk_load_pragmas, create_tables
 from app.models.election import Election
 from app.models.constituency import Constituency
 from app.models.transaction import Transaction
 
+# Skip fsyncs on SQLite when DB_BULK_LOAD_PRAGMAS=1 is set
+enable_bulk_load_pragmas()
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,6 +38,9 @@ TRANSACTION_SOURCES = ["mobile", "web", "kiosk", "admin"]
 REGIONS = ["North", "South", "East", "West", "Central"]
 CITIES = ["Metropolis", "Riverside", "Hilltown", "Lakeside", "Valley"]
 
+# Transaction rows per bulk insert and commit
+TRANSACTION_INSERT_CHUNK_SIZE = 10_000
+
 def seed_database():
     """Seed the database with sample data."""
     logger.info("Starting database seeding...")
@@ -46,10 +54,9 @@ def seed_database():
         
         # Create elections
         logger.info("Creating elections...")
-        elections = []
         
         # Active election (current)
-        active_election = Election(
+        active_election = dict(
             name="2025 Presidential Election",
             country="United States",
             start_date=datetime.utcnow() - timedelta(days=2),
@@ -60,12 +67,9 @@ def seed_database():
             timezone="America/New_York",
             total_constituencies=50
         )
-        db.add(active_election)
-        db.flush()  # Flush to get the ID
-        elections.append(active_election)
         
         # Upcoming election
-        upcoming_election = Election(
+        upcoming_election = dict(
             name="2026 Midterm Elections",
             country="United States",
             start_date=datetime.utcnow() + timedelta(days=180),
@@ -76,12 +80,9 @@ def seed_database():
             timezone="America/New_York",
             total_constituencies=435
         )
-        db.add(upcoming_election)
-        db.flush()
-        elections.append(upcoming_election)
         
         # Completed election
-        completed_election = Election(
+        completed_election = dict(
             name="2024 Local Elections",
             country="United States",
             start_date=datetime.utcnow() - timedelta(days=100),
@@ -92,13 +93,18 @@ def seed_database():
             timezone="America/New_York",
             total_constituencies=25
         )
-        db.add(completed_election)
-        db.flush()
-        elections.append(completed_election)
+        
+        # One INSERT ... RETURNING hands back the generated IDs in row order
+        active_election_id, upcoming_election_id, completed_election_id = db.scalars(
+            insert(Election).returning(Election.id, sort_by_parameter_order=True),
+            [active_election, upcoming_election, completed_election]
+        ).all()
         
         # Create constituencies
+        # Rows are built as plain dicts and inserted in bulk; the IDs are
+        # known up front, so no flush is needed to reference them
         logger.info("Creating constituencies...")
-        constituencies = []
+        constituency_rows = []
         
         # For active election
         for i in range(50):
@@ -106,9 +112,9 @@ def seed_database():
             bulletins_issued = random.randint(int(registered_voters * 0.5), registered_voters)
             votes_cast = random.randint(int(bulletins_issued * 0.9), bulletins_issued)
             
-            constituency = Constituency(
+            constituency = dict(
                 id=f"0x{i:08x}",  # Fake smart contract address
-                election_id=active_election.id,
+                election_id=active_election_id,
                 name=f"District {i+1}",
                 region=random.choice(REGIONS),
                 type=random.choice(CONSTITUENCY_TYPES),
@@ -120,32 +126,27 @@ def seed_database():
                 anomaly_score=random.random() * 0.5,  # Lower anomaly scores for most
                 last_update_time=datetime.utcnow()
             )
-            db.add(constituency)
-            db.flush()
-            constituencies.append(constituency)
             
             # Add a few high anomaly constituencies
             if i % 10 == 0:
-                constituency.anomaly_score = random.uniform(0.7, 0.95)
-                db.add(constituency)
+                constituency["anomaly_score"] = random.uniform(0.7, 0.95)
+            
+            constituency_rows.append(constituency)
         
         # For upcoming election (fewer constituencies as it's not active yet)
         for i in range(10):
             registered_voters = random.randint(5000, 50000)
             
-            constituency = Constituency(
+            constituency_rows.append(dict(
                 id=f"0x{i+100:08x}",
-                election_id=upcoming_election.id,
+                election_id=upcoming_election_id,
                 name=f"District {i+1}",
                 region=random.choice(REGIONS),
                 type=random.choice(CONSTITUENCY_TYPES),
                 status="inactive",  # Use inactive since scheduled is not in the allowed statuses
                 registered_voters=registered_voters,
                 last_update_time=datetime.utcnow()
-            )
-            db.add(constituency)
-            db.flush()
-            constituencies.append(constituency)
+            ))
         
         # For completed election
         for i in range(25):
@@ -153,9 +154,9 @@ def seed_database():
             bulletins_issued = random.randint(int(registered_voters * 0.5), registered_voters)
             votes_cast = random.randint(int(bulletins_issued * 0.9), bulletins_issued)
             
-            constituency = Constituency(
+            constituency_rows.append(dict(
                 id=f"0x{i+200:08x}",
-                election_id=completed_election.id,
+                election_id=completed_election_id,
                 name=f"District {i+1}",
                 region=random.choice(REGIONS),
                 type=random.choice(CONSTITUENCY_TYPES),
@@ -166,35 +167,33 @@ def seed_database():
                 participation_rate=votes_cast / registered_voters if registered_voters > 0 else 0,
                 anomaly_score=random.random() * 0.3,  # Lower anomaly scores for completed
                 last_update_time=datetime.utcnow() - timedelta(days=99)
-            )
-            db.add(constituency)
-            db.flush()
-            constituencies.append(constituency)
+            ))
+        
+        db.bulk_insert_mappings(Constituency, constituency_rows)
         
         # Create transactions
         logger.info("Creating transactions...")
+        transaction_rows = []
         
         # For active election constituencies
-        for constituency in constituencies[:50]:
+        for constituency in constituency_rows[:50]:
             # Create 20-50 transactions per constituency
             for _ in range(random.randint(20, 50)):
                 # Most transactions in the last 24 hours
                 hours_ago = random.randint(0, 48)
                 timestamp = datetime.utcnow() - timedelta(hours=hours_ago)
                 
-                transaction = Transaction(
-                    constituency_id=constituency.id,
+                transaction_rows.append(dict(
+                    constituency_id=constituency["id"],
                     block_height=random.randint(1000, 9999),
                     timestamp=timestamp,
                     type=random.choice(TRANSACTION_TYPES),
                     raw_data={"votes": random.randint(1, 100)},
                     operation_data={"processed": True}
-                )
-                
-                db.add(transaction)
+                ))
         
         # For completed election constituencies (fewer transactions)
-        for constituency in constituencies[-25:]:
+        for constituency in constituency_rows[-25:]:
             # Create 10-30 transactions per constituency
             for _ in range(random.randint(10, 30)):
                 # Transactions from when the election was active
@@ -202,16 +201,21 @@ def seed_database():
                 hours_variation = random.randint(0, 24)
                 timestamp = datetime.utcnow() - timedelta(days=days_ago, hours=hours_variation)
                 
-                transaction = Transaction(
-                    constituency_id=constituency.id,
+                transaction_rows.append(dict(
+                    constituency_id=constituency["id"],
                     block_height=random.randint(1000, 9999),
                     timestamp=timestamp,
                     type=random.choice(TRANSACTION_TYPES),
                     raw_data={"votes": random.randint(1, 100)},
                     operation_data={"processed": True}
-                )
-                
-                db.add(transaction)
+                ))
+        
+        # Insert and commit chunk by chunk to bound the journal size
+        for start in range(0, len(transaction_rows), TRANSACTION_INSERT_CHUNK_SIZE):
+            db.bulk_insert_mappings(
+                Transaction, transaction_rows[start:start + TRANSACTION_INSERT_CHUNK_SIZE]
+            )
+            db.commit()
         
         # Commit all changes
         db.commit()
@@ -5,13 +5,22 @@ This module provides fixtures for testing the application.
 """
 
 import os
+import tempfile
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from datetime import datetime
 
-from app.models.database import Base
+# Give each pytest-xdist worker its own application database, so test files
+# running at the same time on different workers never share a SQLite file.
+# Must run before app.models.database creates the application engine.
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+if XDIST_WORKER:
+    worker_db_path = os.path.join(tempfile.gettempdir(), f"election_monitoring_{XDIST_WORKER}.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{worker_db_path}"
+
+from app.models.database import Base, enable_sqlite_savepoints, engine as app_engine
 from app.models.election import Election
 from app.models.constituency import Constituency
 from app.models.transaction import Transaction
@@ -20,6 +29,37 @@ from app.models.hourly_stats import HourlyStats
 from app.models.file_processing import FileProcessingJob
 
 
+def _enable_foreign_keys(engine) -> None:
+    """Enable foreign key constraints on every connection of a SQLite engine."""
+    # The pragma has no effect inside a transaction, so set it as the
+    # connection opens
+    @event.listens_for(engine, "connect")
+    def _set_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def worker_database():
+    """
+    Create the schema of a pytest-xdist worker's own application database.
+    
+    Does nothing outside xdist workers, where the application database is
+    the one configured by DATABASE_URL.
+    """
+    if not XDIST_WORKER:
+        yield
+        return
+    
+    # Start from an empty schema even if an earlier run left the file behind
+    Base.metadata.drop_all(bind=app_engine)
+    Base.metadata.create_all(bind=app_engine)
+    
+    yield
+    
+    Base.metadata.drop_all(bind=app_engine)
+    app_engine.dispose()
+
+
 @pytest.fixture(scope="session")
 def engine():
     """
@@ -38,6 +78,16 @@ def engine():
             f"sqlite:///{test_db_path}",
             connect_args={"check_same_thread": False},
         )
+        
+        # The test database is recreated on every run, so skip journaling
+        # to disk and the fsync on every commit
+        @event.listens_for(engine, "connect")
+        def _set_ephemeral_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=MEMORY")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.close()
     else:
         # Use in-memory SQLite database for unit tests
         engine = create_engine(
@@ -46,9 +96,11 @@ def engine():
             poolclass=StaticPool,
         )
     
-    # Enable foreign key constraints in SQLite
-    with engine.connect() as conn:
-        conn.execute(text("PRAGMA foreign_keys=ON"))
+    # Use the application engine's transaction handling, so the SAVEPOINTs
+    # used by db_session and the services behave as they do in production
+    enable_sqlite_savepoints(engine)
+    
+    _enable_foreign_keys(engine)
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
@@ -64,7 +116,10 @@ def db_session(engine):
     """
     Create a SQLAlchemy session for testing.
     
-    This fixture creates a new session for each test function.
+    This fixture creates a new session for each test function. The session
+    joins an outer transaction that is rolled back after the test, and its
+    commits and rollbacks only release or roll back SAVEPOINTs, so every
+    test starts from the schema created once per test session.
     
     Args:
         engine: SQLAlchemy engine
@@ -72,14 +127,51 @@ def db_session(engine):
     Returns:
         SQLAlchemy session
     """
+    connection = engine.connect()
+    transaction = connection.begin()
+    
     # Create a new session for each test
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    SessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+    )
     session = SessionLocal()
     
     try:
         yield session
     finally:
         session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="function")
+def file_session_factory(tmp_path):
+    """
+    Create a session factory on a file-backed SQLite database.
+    
+    Unlike db_session, sessions from this factory commit and roll back for
+    real, so tests can check what a rollback leaves in the database.
+    
+    Args:
+        tmp_path: Per-test temporary directory
+        
+    Returns:
+        SQLAlchemy session factory
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    enable_sqlite_savepoints(engine)
+    _enable_foreign_keys(engine)
+    Base.metadata.create_all(bind=engine)
+    
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
@@ -107,7 +107,7 @@ def hourly_stats(constituency):
 def test_calculate_metrics(db_session_mock, constituency, hourly_stats):
     """Test calculating metrics for a constituency."""
     # Mock the database query results
-    db_session_mock.query.return_value.filter.return_value.first.return_value = constituency
+    db_session_mock.get.return_value = constituency
     
     # Mock the hourly_stats_service.get_hourly_stats method
     hourly_stats_service_mock = MagicMock()
@@ -146,7 +146,7 @@ def test_calculate_metrics(db_session_mock, constituency, hourly_stats):
 def test_calculate_metrics_update_constituency(db_session_mock, constituency, hourly_stats):
     """Test calculating metrics and updating the constituency."""
     # Mock the database query results
-    db_session_mock.query.return_value.filter.return_value.first.return_value = constituency
+    db_session_mock.get.return_value = constituency
     
     # Mock the hourly_stats_service.get_hourly_stats method
     hourly_stats_service_mock = MagicMock()
@@ -185,7 +185,7 @@ def test_calculate_metrics_with_time_range(db_session_mock, constituency, hourly
     end_time = datetime.utcnow()
     
     # Mock the database query results
-    db_session_mock.query.return_value.filter.return_value.first.return_value = constituency
+    db_session_mock.get.return_value = constituency
     
     # Mock the hourly_stats_service.get_hourly_stats method
     hourly_stats_service_mock = MagicMock()
@@ -217,7 +217,7 @@ def test_calculate_metrics_with_time_range(db_session_mock, constituency, hourly
 def test_calculate_metrics_by_time_period(db_session_mock, constituency, hourly_stats):
     """Test calculating metrics by time period."""
     # Mock the database query results
-    db_session_mock.query.return_value.filter.return_value.first.return_value = constituency
+    db_session_mock.get.return_value = constituency
     
     # Mock the hourly_stats_service.get_hourly_stats method
     hourly_stats_service_mock = MagicMock()
@@ -352,4 +352,24 @@ def test_calculate_trend():
     # Test with single value
     values = [5.0]
     trend = service._calculate_trend(values)
-    assert trend == 0.0  # Default value for single value
\ No newline at end of file
+    assert trend == 0.0  # Default value for single value
+
+def test_calculate_metrics_batch(db_session_mock, constituency, hourly_stats):
+    """Test calculating metrics for several constituencies, one of them unknown."""
+    # Setup
+    service = ConstituencyMetricsService(db_session_mock)
+    db_session_mock.query.return_value.filter.return_value.all.return_value = [constituency]
+    db_session_mock.query.return_value.filter.return_value.order_by.return_value = hourly_stats
+    
+    # Call the method
+    results = service.calculate_metrics_batch(
+        constituency_ids=[constituency.id, "missing-constituency"]
+    )
+    
+    # Assertions: the unknown constituency has no entry, which is how callers
+    # tell its update apart from the successful ones
+    assert "missing-constituency" not in results
+    assert list(results) == [constituency.id]
+    assert results[constituency.id]["total_votes_cast"] == sum(stats.votes_cast for stats in hourly_stats)
+    assert constituency.votes_cast == results[constituency.id]["total_votes_cast"]
+    db_session_mock.commit.assert_called_once()
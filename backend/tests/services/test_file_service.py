@@ -70,6 +70,22 @@ def test_parse_empty_json_like_structure():
     assert result == []
 
 
+def test_parse_json_like_structure_skips_invalid_items():
+    """Test that items which are not valid JSON are skipped."""
+    # Arrange
+    service = FileService()
+    data_str = '[{"key": "operation", "stringValue": "vote"},{invalid},{"key": "VOTE_7JKy"}]'
+    
+    # Act
+    result = service._parse_json_like_structure(data_str)
+    
+    # Assert
+    assert result == [
+        {"key": "operation", "stringValue": "vote"},
+        {"key": "VOTE_7JKy"}
+    ]
+
+
 def test_extract_transactions_from_csv():
     """Test extracting transactions from CSV content."""
     # Arrange
@@ -284,4 +300,24 @@ def test_process_directory_with_path_metadata():
         
         assert len(transactions) == 2
         assert transactions[0].type == "blindSigIssue"
-        assert transactions[1].type == "vote"
\ No newline at end of file
+        assert transactions[1].type == "vote"
+
+def test_process_directory_multiple_files():
+    """Test that every file is processed and a failing file is skipped."""
+    # Arrange
+    service = FileService()
+    row = "{id};AsrxMqfGWsXEgTmvdw95omtQ4Gv1Vi4mGAvLYy23DHpM;1;{height};1662453028819;1662453028819;1662453028819;1662453028819;{{\"key\": \"operation\", \"stringValue\": \"vote\"}};{{\"key\": \"VOTE_{id}\"}};1;1"
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for hour in range(8, 12):
+            file_path = Path(temp_dir) / f"AsrxMqfGWsXEgTmvdw95omtQ4Gv1Vi4mGAvLYy23DHpM_2024-09-06_{hour:02d}00-{hour + 1:02d}00.csv"
+            file_path.write_text(row.format(id=f"tx-{hour}", height=hour))
+        (Path(temp_dir) / "invalid_filename.csv").write_text("invalid")
+        
+        # Act
+        result, transactions = service.process_directory(temp_dir)
+    
+    # Assert
+    assert result.files_processed == 5
+    assert result.transactions_processed == 4
+    assert sorted(t.transaction_id for t in transactions) == ["tx-10", "tx-11", "tx-8", "tx-9"]
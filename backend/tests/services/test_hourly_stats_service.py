@@ -120,8 +120,8 @@ def test_aggregate_hourly_stats(db_session_mock, constituency, transactions):
         # Mock the query for existing stats to return None (no existing stats)
         db_session_mock.query.return_value.filter.return_value.first.return_value = None
         
-        # Mock the query for transactions
-        db_session_mock.query.return_value.filter.return_value.filter.return_value.filter.return_value.all.return_value = transactions
+        # Mock the aggregate query for transaction counts
+        db_session_mock.query.return_value.filter.return_value.one.return_value = (20, 10, 10, 2)
         
         # Mock the _calculate_metrics method to return predefined metrics
         with patch.object(service, '_calculate_metrics') as mock_calculate:
@@ -270,8 +270,8 @@ def test_aggregate_hourly_stats_force_recalculate(db_session_mock, constituency,
         # Mock the query for existing stats to return the existing stats
         db_session_mock.query.return_value.filter.return_value.first.return_value = existing_stats
         
-        # Mock the query for transactions
-        db_session_mock.query.return_value.filter.return_value.filter.return_value.filter.return_value.all.return_value = transactions
+        # Mock the aggregate query for transaction counts
+        db_session_mock.query.return_value.filter.return_value.one.return_value = (20, 10, 10, 2)
         
         # Mock the _calculate_metrics method to return predefined metrics
         with patch.object(service, '_calculate_metrics') as mock_calculate:
@@ -491,4 +491,24 @@ def test_get_hourly_stats_with_time_range(db_session_mock, constituency):
     
     # Verify that the correct filters were applied
     assert query_mock.filter.call_count == 1  # Called once for constituency_id filter
-    assert filter_mock.filter.call_count == 2  # Called twice for start_time and end_time filters
\ No newline at end of file
+    assert filter_mock.filter.call_count == 2  # Called twice for start_time and end_time filters
+
+def test_calculate_metrics_from_counts(db_session_mock, constituency):
+    """Test calculating metrics from aggregated transaction counts."""
+    service = HourlyStatsService(db_session_mock)
+    counts = {
+        "transaction_count": 20,
+        "bulletins_issued": 10,
+        "votes_cast": 10,
+        "anomaly_count": 2
+    }
+    
+    metrics = service._calculate_metrics(counts, constituency)
+    
+    assert metrics["transaction_count"] == 20
+    assert metrics["bulletins_issued"] == 10
+    assert metrics["votes_cast"] == 10
+    assert metrics["anomaly_count"] == 2
+    assert metrics["bulletin_velocity"] == 10.0
+    assert metrics["vote_velocity"] == 10.0
+    assert metrics["participation_rate"] == 1.0  # 10 votes / 1000 registered voters * 100
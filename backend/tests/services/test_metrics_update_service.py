@@ -0,0 +1,351 @@
+"""
+Tests for the MetricsUpdateService.
+
+This module contains tests for the MetricsUpdateService.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from app.models.transaction import Transaction
+from app.services import metrics_update_service
+from app.services.metrics_update_service import MetricsUpdateService, UpdateTask
+
+
+@pytest.fixture
+def db_session_mock():
+    """Create a mock database session usable as a context manager."""
+    session = MagicMock()
+    session.__enter__.return_value = session
+    return session
+
+
+@pytest.fixture
+def service(db_session_mock):
+    """Create a MetricsUpdateService with a mock session factory."""
+    return MetricsUpdateService(lambda: db_session_mock)
+
+
+def test_schedule_hourly_stats_update_enqueues_task(service):
+    """Test that scheduling an hourly stats update puts a task on the queue."""
+    hour = datetime(2024, 9, 6, 8)
+
+    task_id = service.schedule_hourly_stats_update("test-constituency", hour)
+
+    assert service.queue_size() == 1
+    task = service._pop_task()
+    assert task.task_id == task_id
+    assert task.task_type == "hourly_stats"
+    assert task.params["constituency_id"] == "test-constituency"
+
+
+def test_queue_pops_tasks_by_priority(service):
+    """Test that tasks are popped in priority order, FIFO within a priority."""
+    service.schedule_hourly_stats_update("constituency-1", datetime(2024, 9, 6, 8), priority=10)
+    service.schedule_hourly_stats_update("constituency-2", datetime(2024, 9, 6, 8), priority=1)
+    service.schedule_hourly_stats_update("constituency-3", datetime(2024, 9, 6, 8), priority=10)
+
+    order = [service._pop_task().params["constituency_id"] for _ in range(3)]
+
+    assert order == ["constituency-2", "constituency-1", "constituency-3"]
+    assert service._pop_task() is None
+
+
+def test_update_task_ordering():
+    """Test that tasks are ordered by priority."""
+    high = UpdateTask("high", 1, "hourly_stats", {})
+    low = UpdateTask("low", 10, "hourly_stats", {})
+
+    assert high < low
+    assert not low < high
+
+
+def test_worker_processes_queued_tasks(service):
+    """Test that the async worker drains the queue and processes tasks."""
+    async def run():
+        service.start()
+        service.schedule_hourly_stats_update("test-constituency", datetime(2024, 9, 6, 8))
+        for _ in range(50):
+            if hourly_stats_service_mock.return_value.aggregate_hourly_stats.called:
+                break
+            await asyncio.sleep(0.1)
+        service.stop()
+
+    with patch(
+        "app.services.metrics_update_service.HourlyStatsService"
+    ) as hourly_stats_service_mock:
+        asyncio.run(run())
+
+    hourly_stats_service_mock.return_value.aggregate_hourly_stats.assert_called_once()
+    assert service.running is False
+
+
+def test_process_task_unknown_type(service):
+    """Test that an unknown task type fails without raising."""
+    task = UpdateTask("unknown", 1, "unknown_type", {})
+
+    assert service._process_task(task) is False
+    assert task.attempts == 1
+    assert "Unknown task type" in task.last_error
+
+
+def test_schedule_transaction_triggered_update(service):
+    """Test that a transaction schedules hourly stats and metrics updates."""
+    transaction = Transaction(
+        id="tx-1",
+        constituency_id="test-constituency",
+        block_height=1,
+        timestamp=datetime(2024, 9, 6, 8, 42, 17),
+        type="BULLETIN_ISSUED",
+        raw_data={},
+        operation_data={}
+    )
+
+    task_ids = service.schedule_transaction_triggered_update(transaction)
+
+    assert len(task_ids) == 2
+    tasks = [service._pop_task() for _ in range(service.queue_size())]
+    task_types = {task.task_type for task in tasks}
+    assert task_types == {"hourly_stats", "constituency_metrics"}
+    hourly_task = next(task for task in tasks if task.task_type == "hourly_stats")
+    assert hourly_task.params["hour"] == datetime(2024, 9, 6, 8)
+
+
+def test_schedule_hourly_stats_update_coalesces_pending_tasks(service):
+    """Test that repeated schedules for the same hour enqueue a single task."""
+    hour = datetime(2024, 9, 6, 8)
+
+    first_id = service.schedule_hourly_stats_update("test-constituency", hour)
+    second_id = service.schedule_hourly_stats_update(
+        "test-constituency", hour, force_recalculate=True
+    )
+
+    assert first_id == second_id
+    assert service.queue_size() == 1
+    task = service._pop_task()
+    assert task.params["force_recalculate"] is True
+
+
+def test_schedule_constituency_metrics_update_coalesces_pending_tasks(service):
+    """Test that repeated constituency metrics schedules enqueue a single task."""
+    for _ in range(5):
+        service.schedule_constituency_metrics_update("test-constituency")
+
+    assert service.queue_size() == 1
+
+
+def test_schedule_election_metrics_update(service, db_session_mock):
+    """Test that an election schedules one task per constituency ID."""
+    db_session_mock.execute.return_value.scalars.return_value.all.return_value = [
+        "constituency-1", "constituency-2"
+    ]
+
+    task_ids = service.schedule_election_metrics_update("test-election")
+
+    assert len(task_ids) == 2
+    assert service.queue_size() == 2
+    db_session_mock.query.assert_not_called()
+    db_session_mock.__exit__.assert_called_once()
+
+
+def test_process_task_closes_session_on_error(service, db_session_mock):
+    """Test that the session is released when a task raises."""
+    task = UpdateTask("broken", 1, "hourly_stats", {})
+
+    assert service._process_task(task) is False
+    assert "Missing required parameters" in task.last_error
+    db_session_mock.__exit__.assert_called_once()
+
+
+def test_periodic_update_skips_cycle_when_backlogged(service):
+    """Test that the periodic update does not schedule while the queue is backlogged."""
+    async def run():
+        service.running = True
+        service.schedule_hourly_stats_update("test-constituency", datetime(2024, 9, 6, 8))
+        service.schedule_periodic_updates(interval_seconds=60)
+        await asyncio.sleep(0.1)
+        service.stop()
+
+    with patch.object(metrics_update_service, "PERIODIC_UPDATE_HIGH_WATER", 0), \
+            patch.object(service, "_schedule_active_election_updates") as schedule_mock:
+        asyncio.run(run())
+
+    schedule_mock.assert_not_called()
+
+
+def test_get_stats(service):
+    """Test that queue depth and per task type stats are reported."""
+    service.schedule_hourly_stats_update("test-constituency", datetime(2024, 9, 6, 8))
+    service._process_task(UpdateTask("unknown", 1, "unknown_type", {}))
+
+    stats = service.get_stats()
+
+    assert stats["queue_depth"] == 1
+    assert stats["pending_tasks"] == 1
+    assert stats["task_types"]["unknown_type"]["failed"] == 1
+    assert stats["task_types"]["unknown_type"]["processed"] == 0
+
+
+def test_update_task_uses_slots():
+    """Test that UpdateTask instances do not carry a per-instance __dict__."""
+    task = UpdateTask("slots", 1, "hourly_stats", {})
+
+    assert not hasattr(task, "__dict__")
+    with pytest.raises(AttributeError):
+        task.unexpected = True
+
+
+def test_transaction_triggered_updates_are_debounced(service):
+    """Test that transactions within the debounce window schedule one set of tasks."""
+    transactions = [
+        Transaction(
+            id=f"tx-{i}",
+            constituency_id="test-constituency",
+            block_height=i,
+            timestamp=datetime(2024, 9, 6, 8, i),
+            type="VOTE_CAST",
+            raw_data={},
+            operation_data={}
+        )
+        for i in range(10)
+    ]
+
+    async def run():
+        service.loop = asyncio.get_running_loop()
+        for transaction in transactions:
+            service.schedule_transaction_triggered_update(transaction)
+        queued_before_window = service.queue_size()
+        await asyncio.sleep(0.1)
+        return queued_before_window
+
+    with patch.object(metrics_update_service, "TRANSACTION_DEBOUNCE_SECONDS", 0.05):
+        queued_before_window = asyncio.run(run())
+
+    assert queued_before_window == 0
+    assert service.queue_size() == 2
+    assert service._debounce == {}
+
+
+def test_hourly_stats_task_id_uses_epoch_hour(service):
+    """Test that hourly stats task IDs are keyed by the epoch hour."""
+    task_id = service.schedule_hourly_stats_update("test-constituency", datetime(1970, 1, 2, 1))
+
+    assert task_id == "hs:test-constituency:25"
+
+
+def test_schedule_hourly_stats_update_does_not_query(service, db_session_mock):
+    """Test that scheduling an hourly stats update does no database work."""
+    service.schedule_hourly_stats_update("test-constituency", datetime(2024, 9, 6, 8))
+    
+    assert service.queue_size() == 1
+    db_session_mock.execute.assert_not_called()
+
+
+def test_process_hourly_stats_task_leaves_stored_stats_to_service(service, db_session_mock):
+    """Test that unforced hourly stats tasks defer the stored-stats check to HourlyStatsService."""
+    task = UpdateTask(
+        "unforced", 10, "hourly_stats",
+        {"constituency_id": "test-constituency", "hour": datetime(2024, 9, 6, 8)}
+    )
+    
+    with patch(
+        "app.services.metrics_update_service.HourlyStatsService"
+    ) as hourly_stats_service_mock:
+        assert service._process_task(task)
+    
+    db_session_mock.execute.assert_not_called()
+    hourly_stats_service_mock.return_value.aggregate_hourly_stats.assert_called_once_with(
+        constituency_id="test-constituency",
+        hour=datetime(2024, 9, 6, 8),
+        force_recalculate=False
+    )
+
+
+def test_transaction_triggered_update_recalculates_stats(service):
+    """Test that a transaction recalculates hourly stats that are already stored."""
+    transaction = Transaction(
+        id="tx-1",
+        constituency_id="test-constituency",
+        block_height=1,
+        timestamp=datetime(2024, 9, 6, 8, 42, 17),
+        type="vote",
+        raw_data={},
+        operation_data={}
+    )
+    
+    service.schedule_transaction_triggered_update(transaction)
+    hourly_task = next(
+        task for task in (service._pop_task() for _ in range(service.queue_size()))
+        if task.task_type == "hourly_stats"
+    )
+    with patch(
+        "app.services.metrics_update_service.HourlyStatsService"
+    ) as hourly_stats_service_mock:
+        assert service._process_task(hourly_task)
+    
+    hourly_stats_service_mock.return_value.aggregate_hourly_stats.assert_called_once_with(
+        constituency_id="test-constituency",
+        hour=datetime(2024, 9, 6, 8),
+        force_recalculate=True
+    )
+
+
+def test_pop_task_batch_drains_same_type_tasks(service):
+    """Test that consecutive constituency metrics tasks are drained as one batch."""
+    for i in range(3):
+        service.schedule_constituency_metrics_update(f"constituency-{i}", priority=20)
+    service.schedule_hourly_stats_update("constituency-0", datetime(2024, 9, 6, 8), priority=30)
+
+    batch = service._pop_task_batch()
+
+    assert [task.task_type for task in batch] == ["constituency_metrics"] * 3
+    assert service.queue_size() == 1
+
+
+def test_process_task_batch(service):
+    """Test that a batch of constituency metrics tasks makes one service call."""
+    tasks = [
+        UpdateTask(f"cm-{i}", 20, "constituency_metrics", {"constituency_id": f"constituency-{i}"})
+        for i in range(3)
+    ]
+
+    with patch(
+        "app.services.metrics_update_service.ConstituencyMetricsService"
+    ) as metrics_service_mock:
+        metrics_service_mock.return_value.calculate_metrics_batch.return_value = {
+            f"constituency-{i}": {} for i in range(3)
+        }
+        results = service._process_task_batch(tasks)
+
+    assert results == [True, True, True]
+    metrics_service_mock.return_value.calculate_metrics_batch.assert_called_once_with(
+        constituency_ids=["constituency-0", "constituency-1", "constituency-2"],
+        start_time=None,
+        end_time=None,
+        update_constituencies=True
+    )
+    assert all(task.attempts == 1 for task in tasks)
+
+
+def test_process_task_batch_fails_missing_constituencies(service):
+    """Test that batch tasks for unknown constituencies fail like single tasks do."""
+    tasks = [
+        UpdateTask(f"cm-{i}", 20, "constituency_metrics", {"constituency_id": f"constituency-{i}"})
+        for i in range(3)
+    ]
+
+    with patch(
+        "app.services.metrics_update_service.ConstituencyMetricsService"
+    ) as metrics_service_mock:
+        metrics_service_mock.return_value.calculate_metrics_batch.return_value = {
+            "constituency-0": {}, "constituency-2": {}
+        }
+        results = service._process_task_batch(tasks)
+
+    assert results == [True, False, True]
+    assert tasks[1].last_error == "Constituency not found: constituency-1"
+    assert tasks[0].last_error is None
+    assert service.task_stats["constituency_metrics"]["processed"] == 2
+    assert service.task_stats["constituency_metrics"]["failed"] == 1
@@ -218,6 +218,28 @@ def test_create_or_update_region_update(db_session):
     assert db_region.name == "Updated Region"
 
 
+def test_bulk_create_or_update_regions(db_session):
+    """Test creating and updating several regions with one upsert."""
+    # Arrange
+    db_session.add(Region(id="59", name="Old Name", country="Russia"))
+    db_session.commit()
+    
+    service = RegionService(db_session)
+    
+    # Act
+    count = service.bulk_create_or_update_regions([
+        ("59", "Пермский край"),
+        ("66", "Свердловская область"),
+        ("66", "Свердловская обл."),
+    ])
+    
+    # Assert
+    assert count == 2
+    db_session.expire_all()
+    assert db_session.query(Region).filter(Region.id == "59").one().name == "Пермский край"
+    assert db_session.query(Region).filter(Region.id == "66").one().name == "Свердловская обл."
+
+
 def test_extract_region_from_path():
     """Test extracting region ID and name from a path part."""
     # Arrange
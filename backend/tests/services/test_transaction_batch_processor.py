@@ -4,10 +4,15 @@ Tests for the TransactionBatchProcessor.
 This module contains tests for the transaction batch processing service.
 """
 
+import asyncio
 import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime
 
+from app.crud.transaction import transaction_crud
+from app.models.constituency import Constituency
+from app.models.election import Election
+from app.models.transaction import Transaction
 from app.services.transaction_batch_processor import TransactionBatchProcessor
 from app.models.schemas.transaction import TransactionCreate, TransactionBatchRequest, TransactionBatchResponse
 from app.api.errors.exceptions import BatchProcessingError
@@ -72,8 +77,27 @@ def test_process_batch(batch_processor, sample_transaction, mock_db):
             assert result["processed"] == 2
             assert result["failed"] == 0
             assert result["errors"] == []
-            mock_validate.assert_called_once_with(mock_db, transactions)
-            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions)
+            mock_validate.assert_called_once_with(mock_db, transactions, existing_constituency_ids=set())
+            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions, commit=True)
+
+
+def test_process_batch_prefetches_constituencies(batch_processor, sample_transaction, mock_db):
+    """Test that a batch resolves its constituencies with a single query."""
+    # Arrange
+    transaction = sample_transaction.copy(update={"timestamp": datetime(2024, 9, 6, 8, 30)})
+    transactions = [transaction, transaction]
+    mock_db.scalars.return_value.all.return_value = [transaction.constituency_id]
+    
+    with patch('app.crud.transaction.transaction_crud.create_batch') as mock_create_batch:
+        mock_create_batch.return_value = {"success": True, "processed": 2, "failed": 0, "errors": []}
+        
+        # Act
+        result = batch_processor.process_batch(transactions)
+        
+        # Assert
+        assert result["errors"] == []
+        mock_db.scalars.assert_called_once()
+        mock_db.scalar.assert_not_called()
 
 
 def test_process_batch_with_validation_errors(batch_processor, sample_transaction, mock_db):
@@ -103,8 +127,8 @@ def test_process_batch_with_validation_errors(batch_processor, sample_transactio
             assert result["errors"][0]["index"] == 1
             assert result["errors"][0]["error"] == "Database error"
             assert result["errors"][0]["validation_errors"] == ["Constituency not found"]
-            mock_validate.assert_called_once_with(mock_db, transactions)
-            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions)
+            mock_validate.assert_called_once_with(mock_db, transactions, existing_constituency_ids=set())
+            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions, commit=True)
 
 
 def test_process_batch_with_database_error(batch_processor, sample_transaction, mock_db):
@@ -123,8 +147,8 @@ def test_process_batch_with_database_error(batch_processor, sample_transaction,
                 batch_processor.process_batch(transactions)
             
             assert "Failed to process transaction batch" in str(excinfo.value)
-            mock_validate.assert_called_once_with(mock_db, transactions)
-            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions)
+            mock_validate.assert_called_once_with(mock_db, transactions, existing_constituency_ids=set())
+            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions, commit=True)
             mock_db.rollback.assert_called_once()
 
 
@@ -196,6 +220,112 @@ def test_process_large_batch_with_errors(batch_processor, sample_transaction, mo
         assert mock_process_batch.call_count == 3
 
 
+def test_process_large_batch_small_input(batch_processor, sample_transaction, mock_db):
+    """Test that an input fitting in one batch is processed directly."""
+    # Arrange
+    transactions = [sample_transaction] * 2
+    
+    with patch.object(batch_processor, 'process_batch') as mock_process_batch, \
+            patch.object(batch_processor, 'split_into_batches') as mock_split:
+        mock_process_batch.return_value = {"success": True, "processed": 2, "failed": 0, "errors": []}
+        
+        # Act
+        result = batch_processor.process_large_batch(transactions)
+        
+        # Assert
+        assert result["processed"] == 2
+        mock_split.assert_not_called()
+        mock_process_batch.assert_called_once_with(transactions)
+
+
+def test_combine_results(batch_processor):
+    """Test combining sub-batch results rebases error indices."""
+    # Arrange
+    batch_processor.batch_size = 10
+    results = [
+        {"success": True, "processed": 10, "failed": 0, "errors": []},
+        {"success": False, "processed": 9, "failed": 1, "errors": [{"index": 3, "error": "Database error"}]},
+        {"success": False, "processed": 0, "failed": 10, "errors": [{"batch": 2, "error": "Batch failed"}]}
+    ]
+    
+    # Act
+    result = batch_processor._combine_results(results)
+    
+    # Assert
+    assert result["success"] is False
+    assert result["processed"] == 19
+    assert result["failed"] == 11
+    assert result["errors"] == [
+        {"index": 13, "batch": 1, "batch_index": 3, "error": "Database error"},
+        {"batch": 2, "error": "Batch failed"}
+    ]
+    assert results[1]["errors"][0]["index"] == 3  # Sub-batch results are left untouched
+
+
+def test_process_large_batch_commits_every_commit_size(batch_processor, sample_transaction, mock_db):
+    """Test that sub-batches share a transaction committed every commit_size batches."""
+    # Arrange
+    transactions = [sample_transaction] * 5  # 5 transactions
+    batch_processor.batch_size = 1  # Set batch size to 1 to force multiple batches
+    
+    with patch.object(batch_processor, 'process_batch') as mock_process_batch:
+        mock_process_batch.return_value = {"success": True, "processed": 1, "failed": 0, "errors": []}
+        
+        # Act
+        result = batch_processor.process_large_batch(transactions, commit_size=2)
+        
+        # Assert
+        assert result["processed"] == 5
+        mock_process_batch.assert_called_with([sample_transaction], commit=False)
+        assert mock_db.commit.call_count == 3
+
+
+
+def test_process_large_batch_rolls_back_uncommitted_batches(file_session_factory, sample_transaction):
+    """Test that a failure rolls back the sub-batches written since the last commit."""
+    # Arrange
+    election = Election(
+        id="batch-election",
+        name="Test Election",
+        country="Test Country",
+        start_date=datetime(2024, 9, 6),
+        end_date=datetime(2024, 9, 7),
+        status="ACTIVE",
+        type="GENERAL",
+        timezone="UTC"
+    )
+    constituency = Constituency(
+        id=sample_transaction.constituency_id,
+        election_id=election.id,
+        name="Test Constituency",
+        region="Test Region"
+    )
+    db = file_session_factory()
+    db.add_all([election, constituency])
+    db.commit()
+    
+    batch_processor = TransactionBatchProcessor(db=db, batch_size=1)
+    transactions = [sample_transaction.model_copy(update={"timestamp": datetime(2024, 9, 6, 8, 30)})] * 5
+    create_batch = transaction_crud.create_batch
+    calls = []
+    
+    def fail_on_fourth_batch(*args, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 4:
+            raise Exception("Database error")
+        return create_batch(*args, **kwargs)
+    
+    with patch('app.crud.transaction.transaction_crud.create_batch', side_effect=fail_on_fourth_batch):
+        # Act
+        with pytest.raises(BatchProcessingError):
+            batch_processor.process_large_batch(transactions, commit_size=2)
+    
+    # Assert: the first two sub-batches were committed, the third was rolled back
+    with file_session_factory() as check_db:
+        assert check_db.query(Transaction).count() == 2
+    db.close()
+
+
 def test_process_batch_request(batch_processor, sample_batch_request, mock_db):
     """Test processing a batch request."""
     # Arrange
@@ -230,4 +360,82 @@ def test_process_batch_request_with_error(batch_processor, sample_batch_request,
             batch_processor.process_batch_request(sample_batch_request)
         
         assert "Failed to process batch request" in str(excinfo.value)
-        mock_process_large_batch.assert_called_once_with(sample_batch_request.transactions)
\ No newline at end of file
+        mock_process_large_batch.assert_called_once_with(sample_batch_request.transactions)
+
+def test_process_batch_async_uses_shared_executor(batch_processor, sample_transaction):
+    """Test that async batches run on the shared, bounded thread pool."""
+    # Arrange
+    transactions = [sample_transaction]
+    
+    with patch.object(batch_processor, 'process_batch') as mock_process_batch:
+        mock_process_batch.return_value = {"success": True, "processed": 1, "failed": 0, "errors": []}
+        
+        with patch('app.services.transaction_batch_processor.ThreadPoolExecutor') as mock_executor_class:
+            # Act
+            result = asyncio.run(batch_processor.process_batch_async(transactions))
+        
+        # Assert
+        assert result["processed"] == 1
+        mock_executor_class.assert_not_called()
+        mock_process_batch.assert_called_once_with(transactions)
+
+
+def test_process_large_batch_async_uses_session_per_batch(sample_transaction, mock_db):
+    """Test that async batches each get their own session from the factory."""
+    # Arrange
+    sessions = [MagicMock(), MagicMock(), MagicMock()]
+    for session in sessions:
+        session.__enter__.return_value = session
+    session_factory = MagicMock(side_effect=sessions)
+    batch_processor = TransactionBatchProcessor(db=mock_db, batch_size=1, session_factory=session_factory)
+    transactions = [sample_transaction] * 3
+    
+    with patch.object(TransactionBatchProcessor, 'process_batch', autospec=True) as mock_process_batch:
+        mock_process_batch.return_value = {"success": True, "processed": 1, "failed": 0, "errors": []}
+        
+        # Act
+        result = asyncio.run(batch_processor.process_large_batch_async(transactions))
+    
+    # Assert
+    assert result["processed"] == 3
+    assert session_factory.call_count == 3
+    used_sessions = {call.args[0].db for call in mock_process_batch.call_args_list}
+    assert used_sessions == set(sessions)
+    for session in sessions:
+        session.__exit__.assert_called_once()
+
+
+def test_process_large_batch_async_bounds_in_flight_batches(sample_transaction, mock_db):
+    """Test that async batches are bounded by the worker count and merged in batch order."""
+    # Arrange
+    session_factory = MagicMock()
+    batch_processor = TransactionBatchProcessor(db=mock_db, batch_size=1, session_factory=session_factory)
+    transactions = [sample_transaction] * 6
+    in_flight = 0
+    max_in_flight = 0
+    started = 0
+    
+    async def fake_process_batch_async(batch):
+        nonlocal in_flight, max_in_flight, started
+        started += 1
+        should_fail = started in (2, 5)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if should_fail:
+            raise ValueError("Database error")
+        return {"success": True, "processed": 1, "failed": 0, "errors": []}
+    
+    with patch('app.services.transaction_batch_processor.MAX_BATCH_WORKERS', 2), \
+            patch.object(batch_processor, 'process_batch_async', side_effect=fake_process_batch_async):
+        # Act
+        result = asyncio.run(batch_processor.process_large_batch_async(transactions))
+    
+    # Assert
+    assert max_in_flight == 2
+    assert result["processed"] == 4
+    assert result["failed"] == 2
+    batches_with_errors = [error["batch"] for error in result["errors"]]
+    assert len(batches_with_errors) == 2
+    assert batches_with_errors == sorted(batches_with_errors)
@@ -9,7 +9,11 @@ from unittest.mock import MagicMock, patch
 from datetime import datetime, timedelta
 from sqlalchemy import desc, asc
 
-from app.services.transaction_query_service import TransactionQueryService
+from app.services import transaction_query_service as query_service_module
+from app.services.metrics_cache_service import MetricsCacheService
+from app.services.transaction_query_service import TransactionQueryService, invalidate_transaction_stats
+from app.models.constituency import Constituency
+from app.models.election import Election
 from app.models.transaction import Transaction
 
 
@@ -20,8 +24,16 @@ def mock_db():
 
 
 @pytest.fixture
-def query_service(mock_db):
-    """Create a TransactionQueryService with a mock database session."""
+def cache():
+    """Replace the shared statistics cache with a fresh one."""
+    cache = MetricsCacheService()
+    with patch.object(query_service_module, "stats_cache", cache):
+        yield cache
+
+
+@pytest.fixture
+def query_service(mock_db, cache):
+    """Create a TransactionQueryService with a mock database session and a fresh cache."""
     return TransactionQueryService(db=mock_db)
 
 
@@ -97,10 +109,10 @@ def test_execute_query(query_service, mock_db):
     """Test executing a query with pagination."""
     # Arrange
     mock_query = MagicMock()
-    mock_query.count.return_value = 100
+    mock_query.add_columns.return_value = mock_query
     mock_query.offset.return_value = mock_query
     mock_query.limit.return_value = mock_query
-    mock_query.all.return_value = ["transaction1", "transaction2"]
+    mock_query.all.return_value = [("transaction1", 100), ("transaction2", 100)]  # (transaction, total_count)
     
     # Act
     transactions, total = query_service.execute_query(mock_query, page=2, limit=10)
@@ -108,12 +120,95 @@ def test_execute_query(query_service, mock_db):
     # Assert
     assert total == 100
     assert transactions == ["transaction1", "transaction2"]
-    mock_query.count.assert_called_once()
+    mock_query.count.assert_not_called()
+    mock_query.add_columns.assert_called_once()
     mock_query.offset.assert_called_once_with(10)  # (page - 1) * limit
     mock_query.limit.assert_called_once_with(10)
     mock_query.all.assert_called_once()
 
 
+def test_execute_query_past_last_page(query_service, mock_db):
+    """Test that an empty page past the end still reports the total count."""
+    # Arrange
+    mock_query = MagicMock()
+    mock_query.add_columns.return_value = mock_query
+    mock_query.offset.return_value = mock_query
+    mock_query.limit.return_value = mock_query
+    mock_query.all.return_value = []
+    mock_query.whereclause = Transaction.constituency_id == "test_constituency"
+    mock_db.scalar.return_value = 15
+    
+    # Act
+    transactions, total = query_service.execute_query(mock_query, page=3, limit=10)
+    
+    # Assert
+    assert transactions == []
+    assert total == 15
+    mock_query.count.assert_not_called()
+    count_sql = str(mock_db.scalar.call_args.args[0])
+    assert "count(*)" in count_sql
+    assert "FROM transactions WHERE" in " ".join(count_sql.split())
+
+
+def test_execute_query_stream(query_service, mock_db):
+    """Test executing a query that streams its rows."""
+    # Arrange
+    mock_query = MagicMock()
+    mock_query.add_columns.return_value = mock_query
+    mock_query.offset.return_value = mock_query
+    mock_query.limit.return_value = mock_query
+    mock_query.yield_per.return_value = iter([("transaction1", 2), ("transaction2", 2)])
+    
+    # Act
+    transactions, total = query_service.execute_query(mock_query, stream=True)
+    
+    # Assert
+    assert total == 2
+    assert list(transactions) == ["transaction1", "transaction2"]
+    mock_query.yield_per.assert_called_once_with(200)
+    mock_query.all.assert_not_called()
+
+
+def test_execute_keyset_query(query_service, mock_db):
+    """Test keyset pagination filters after the cursor and returns the next cursor."""
+    # Arrange
+    last = MagicMock(timestamp=datetime(2024, 9, 6, 8), id="transaction2")
+    mock_query = MagicMock()
+    mock_query.order_by.return_value = mock_query
+    mock_query.filter.return_value = mock_query
+    mock_query.limit.return_value = mock_query
+    mock_query.all.return_value = ["transaction1", last]
+    
+    # Act
+    transactions, next_cursor = query_service.execute_keyset_query(
+        mock_query, cursor=(datetime(2024, 9, 6, 9), "transaction0"), limit=2
+    )
+    
+    # Assert
+    assert transactions == ["transaction1", last]
+    assert next_cursor == (datetime(2024, 9, 6, 8), "transaction2")
+    mock_query.filter.assert_called_once()
+    mock_query.offset.assert_not_called()
+    mock_query.limit.assert_called_once_with(2)
+
+
+def test_execute_keyset_query_last_page(query_service, mock_db):
+    """Test that a short page has no next cursor."""
+    # Arrange
+    mock_query = MagicMock()
+    mock_query.order_by.return_value = mock_query
+    mock_query.limit.return_value = mock_query
+    mock_query.all.return_value = ["transaction1"]
+    
+    # Act
+    transactions, next_cursor = query_service.execute_keyset_query(mock_query, limit=2)
+    
+    # Assert
+    assert transactions == ["transaction1"]
+    assert next_cursor is None
+    mock_query.filter.assert_not_called()
+
+
 def test_get_transaction_counts_by_hour(query_service, mock_db):
     """Test getting transaction counts by hour."""
     # Arrange
@@ -194,6 +289,64 @@ def test_get_transaction_counts_by_type_with_constituency(query_service, mock_db
     mock_query.all.assert_called_once()
 
 
+def test_get_transaction_counts_by_type_is_cached(query_service, mock_db):
+    """Test that repeated statistics calls are served from the cache."""
+    # Arrange
+    mock_db.query.return_value = mock_query = MagicMock()
+    mock_query.filter.return_value = mock_query
+    mock_query.group_by.return_value = mock_query
+    mock_query.all.return_value = [("vote", 75)]
+    
+    # Act
+    first = query_service.get_transaction_counts_by_type("test_constituency")
+    second = query_service.get_transaction_counts_by_type("test_constituency")
+    query_service.get_transaction_counts_by_type("other_constituency")
+    
+    # Assert
+    assert first == second == {"vote": 75}
+    assert mock_db.query.call_count == 2
+
+
+def test_invalidate_transaction_stats(mock_db, cache):
+    """Test that writes invalidate the cached statistics of affected constituencies."""
+    # Arrange
+    service = TransactionQueryService(db=mock_db)
+    mock_db.query.return_value = mock_query = MagicMock()
+    mock_query.filter.return_value = mock_query
+    mock_query.group_by.return_value = mock_query
+    mock_query.all.return_value = [("vote", 75)]
+    service.get_transaction_counts_by_type()
+    service.get_transaction_counts_by_type("test_constituency")
+    service.get_transaction_counts_by_type("other_constituency")
+    
+    # Act
+    invalidated = invalidate_transaction_stats(["test_constituency", "test_constituency"])
+    
+    # Assert
+    assert invalidated == 2
+    service.get_transaction_counts_by_type("other_constituency")
+    assert mock_db.query.call_count == 3
+
+
+def test_cached_stats_return_copies(query_service, mock_db):
+    """Test that mutating a cached statistics result does not alter later results."""
+    # Arrange
+    service = query_service
+    mock_db.query.return_value = mock_query = MagicMock()
+    mock_query.filter.return_value = mock_query
+    mock_query.group_by.return_value = mock_query
+    mock_query.all.return_value = [("vote", 75)]
+    
+    # Act
+    first = service.get_transaction_counts_by_type()
+    first["vote"] = 0
+    second = service.get_transaction_counts_by_type()
+    
+    # Assert
+    assert second == {"vote": 75}
+    assert mock_db.query.call_count == 1
+
+
 def test_get_transaction_rate(query_service, mock_db):
     """Test getting transaction rate."""
     # Arrange
@@ -233,16 +386,13 @@ def test_get_anomaly_statistics(query_service, mock_db):
     """Test getting anomaly statistics."""
     # Arrange
     mock_db.query.return_value = mock_query = MagicMock()
-    mock_query.count.side_effect = [100, 10]  # Total: 100, Anomalies: 10
-    
-    mock_db.query.return_value = mock_query2 = MagicMock()
-    mock_query2.filter.return_value = mock_query2
-    mock_query2.group_by.return_value = mock_query2
-    mock_query2.all.return_value = [
-        ("Invalid signature", 5),
-        ("Duplicate vote", 3),
-        (None, 2)
-    ]  # (reason, count) pairs
+    mock_query.group_by.return_value = mock_query
+    mock_query.all.return_value = [
+        (False, None, 90),
+        (True, "Invalid signature", 5),
+        (True, "Duplicate vote", 3),
+        (True, None, 2)
+    ]  # (anomaly_detected, reason, count) rows
     
     # Act
     result = query_service.get_anomaly_statistics()
@@ -256,45 +406,61 @@ def test_get_anomaly_statistics(query_service, mock_db):
         "Duplicate vote": 3,
         "unknown": 2
     }
+    mock_db.query.assert_called_once()
 
 
 def test_get_transaction_statistics(query_service, mock_db):
-    """Test getting comprehensive transaction statistics."""
+    """Test getting comprehensive transaction statistics from one aggregate query."""
     # Arrange
-    with patch.object(query_service, 'get_transaction_counts_by_type') as mock_by_type:
-        mock_by_type.return_value = {"blindSigIssue": 200, "vote": 150}
-        
-        with patch.object(query_service, 'get_transaction_counts_by_status') as mock_by_status:
-            mock_by_status.return_value = {"processed": 300, "pending": 50}
-            
-            with patch.object(query_service, 'get_transaction_counts_by_source') as mock_by_source:
-                mock_by_source.return_value = {"file_upload": 250, "api": 100}
-                
-                with patch.object(query_service, 'get_transaction_rate') as mock_rate:
-                    mock_rate.side_effect = [15.0, 360.0]  # per hour, per day
-                    
-                    with patch.object(query_service, 'get_anomaly_statistics') as mock_anomalies:
-                        mock_anomalies.return_value = {
-                            "total_transactions": 350,
-                            "anomaly_count": 20,
-                            "anomaly_percentage": 5.7,
-                            "anomaly_reasons": {"Invalid signature": 12, "Duplicate vote": 8}
-                        }
-                        
-                        # Act
-                        result = query_service.get_transaction_statistics()
-                        
-                        # Assert
-                        assert result["counts_by_type"] == {"blindSigIssue": 200, "vote": 150}
-                        assert result["counts_by_status"] == {"processed": 300, "pending": 50}
-                        assert result["counts_by_source"] == {"file_upload": 250, "api": 100}
-                        assert result["total_transactions"] == 350
-                        assert result["total_bulletins"] == 200
-                        assert result["total_votes"] == 150
-                        assert result["transactions_per_hour"] == 15.0
-                        assert result["transactions_per_day"] == 360.0
-                        assert result["anomalies"]["anomaly_count"] == 20
-                        assert result["anomalies"]["anomaly_percentage"] == 5.7
+    mock_db.query.return_value = mock_query = MagicMock()
+    mock_query.group_by.return_value = mock_query
+    mock_query.all.return_value = [
+        # (type, status, source, anomaly_detected, anomaly_reason, count, last_hour, last_day)
+        ("blindSigIssue", "processed", "file_upload", False, None, 180, 10, 200),
+        ("blindSigIssue", "pending", "api", True, "Invalid signature", 20, 0, 20),
+        ("vote", "processed", "file_upload", False, None, 70, 5, 100),
+        ("vote", "processed", None, True, None, 80, 0, 40)
+    ]
+    
+    # Act
+    result = query_service.get_transaction_statistics()
+    
+    # Assert
+    assert result["counts_by_type"] == {"blindSigIssue": 200, "vote": 150}
+    assert result["counts_by_status"] == {"processed": 330, "pending": 20}
+    assert result["counts_by_source"] == {"file_upload": 250, "api": 20, "unknown": 80}
+    assert result["total_transactions"] == 350
+    assert result["total_bulletins"] == 200
+    assert result["total_votes"] == 150
+    assert result["transactions_per_hour"] == 15.0
+    assert result["transactions_per_day"] == 15.0
+    assert result["anomalies"]["anomaly_count"] == 100
+    assert result["anomalies"]["anomaly_reasons"] == {"Invalid signature": 20, "unknown": 80}
+    assert "counts_by_hour" not in result
+    mock_db.query.assert_called_once()
+    mock_query.all.assert_called_once()
+
+
+def test_get_transaction_statistics_with_constituency(query_service, mock_db):
+    """Test that constituency statistics include hourly and daily counts."""
+    # Arrange
+    mock_db.query.return_value = mock_query = MagicMock()
+    mock_query.filter.return_value = mock_query
+    mock_query.group_by.return_value = mock_query
+    mock_query.all.return_value = [
+        # (type, status, source, anomaly_detected, anomaly_reason, hour, day, count, last_hour, last_day)
+        ("vote", "processed", "api", False, None, 8, "2024-09-01", 10, 0, 0),
+        ("vote", "processed", "api", False, None, 9, "2024-09-01", 15, 0, 0),
+        ("vote", "processed", "api", False, None, 8, "2024-09-02", 5, 0, 0)
+    ]
+    
+    # Act
+    result = query_service.get_transaction_statistics("test_constituency")
+    
+    # Assert
+    assert result["counts_by_hour"] == {8: 15, 9: 15}
+    assert result["counts_by_day"] == {"2024-09-01": 25, "2024-09-02": 5}
+    mock_query.filter.assert_called_once()
 
 
 def test_search_transactions(query_service, mock_db):
@@ -315,4 +481,47 @@ def test_search_transactions(query_service, mock_db):
         assert total == 2
         mock_db.query.assert_called_once_with(Transaction)
         mock_query.filter.assert_called_once()
-        mock_execute.assert_called_once_with(mock_query, 1, 100)
\ No newline at end of file
+        mock_execute.assert_called_once_with(mock_query, 1, 100)
+
+
+def test_search_transactions_matches_within_columns(clean_db):
+    """Test that every search word must match within one of the searchable columns."""
+    # Arrange
+    election = Election(
+        id="search-election",
+        name="Test Election",
+        country="Test Country",
+        start_date=datetime(2024, 9, 6),
+        end_date=datetime(2024, 9, 7),
+        status="ACTIVE",
+        type="GENERAL",
+        timezone="UTC"
+    )
+    constituency = Constituency(
+        id="search-constituency",
+        election_id=election.id,
+        name="Test Constituency",
+        region="Test Region",
+        registered_voters=1000
+    )
+    transaction = Transaction(
+        id="tx-search",
+        constituency_id=constituency.id,
+        block_height=1,
+        timestamp=datetime(2024, 9, 6, 8, 30),
+        type="vote",
+        status="processed",
+        raw_data={},
+        source="batch"
+    )
+    clean_db.add_all([election, constituency, transaction])
+    clean_db.commit()
+    service = TransactionQueryService(db=clean_db)
+    
+    # Act & Assert
+    assert service.search_transactions("VOTE")[1] == 1
+    # Each word is matched on its own, so "vote processed" matches as two
+    # column values rather than as text spanning the type/status boundary
+    assert service.search_transactions("processed vote")[1] == 1
+    assert service.search_transactions("vote missing")[1] == 0
+    assert service.search_transactions("")[1] == 1
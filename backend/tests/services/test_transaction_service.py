@@ -8,6 +8,15 @@ import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime
 
+from app.crud.transaction import transaction_crud
+from app.models.constituency import Constituency
+from app.models.election import Election
+from app.models.transaction import Transaction
+from app.models.schemas.transaction import TransactionCreate
+from app.services import transaction_query_service as query_service_module
+from app.services import transaction_service as transaction_service_module
+from app.services.metrics_cache_service import MetricsCacheService
+from app.services.transaction_query_service import TransactionQueryService
 from app.services.transaction_service import TransactionService
 from app.models.schemas.processing_result import TransactionData
 from app.api.errors.exceptions import TransactionSaveError, MetricsUpdateError
@@ -42,130 +51,231 @@ def sample_transaction_data():
 def test_save_transactions(transaction_service, sample_transaction_data, mock_db):
     """Test saving transactions to the database."""
     # Arrange
-    with patch.object(transaction_service.validator, 'check_duplicate') as mock_check_duplicate:
-        mock_check_duplicate.return_value = False  # Transaction doesn't exist
+    with patch.object(transaction_service.validator, 'validate_transaction_batch') as mock_validate:
+        mock_validate.return_value = {}  # No validation errors
+        
+        saved_rows = []
+        
+        def create_ignore_existing(db, rows):
+            saved_rows.extend(rows)
+            return len(rows)
         
-        with patch('app.crud.transaction.transaction_crud.get_by_constituency') as mock_get_by_constituency:
-            mock_get_by_constituency.return_value = []  # No existing transactions
+        with patch('app.crud.transaction.transaction_crud.create_ignore_existing',
+                   side_effect=create_ignore_existing):
+            # Act
+            result = transaction_service.save_transactions([sample_transaction_data])
             
-            with patch.object(transaction_service.validator, 'validate_transaction') as mock_validate:
-                mock_validate.return_value = []  # No validation errors
-                
-                with patch('app.crud.transaction.transaction_crud.create') as mock_create:
-                    # Act
-                    result = transaction_service.save_transactions([sample_transaction_data])
-                    
-                    # Assert
-                    assert result == 1
-                    mock_check_duplicate.assert_called_once_with(mock_db, sample_transaction_data.transaction_id)
-                    mock_validate.assert_called_once()
+            # Assert
+            assert result == 1
+            mock_validate.assert_called_once()
+            assert [row["id"] for row in saved_rows] == [sample_transaction_data.transaction_id]
+            assert saved_rows[0]["source"] == "file_upload"
+
+
+def test_save_transactions_commits_in_chunks(transaction_service, sample_transaction_data, mock_db):
+    """Test that saved transactions are inserted per chunk rather than per row."""
+    # Arrange
+    transactions = []
+    for i in range(5):
+        transaction = TransactionData(**vars(sample_transaction_data))
+        transaction.transaction_id = f"tx-{i}"
+        transactions.append(transaction)
+    chunk_sizes = []
+    
+    def create_ignore_existing(db, rows):
+        chunk_sizes.append(len(rows))
+        return len(rows)
+    
+    with patch.object(transaction_service.validator, 'validate_transaction_batch', return_value={}), \
+            patch('app.crud.transaction.transaction_crud.create_ignore_existing',
+                  side_effect=create_ignore_existing), \
+            patch.object(transaction_service_module, 'SAVE_COMMIT_SIZE', 2):
+        # Act
+        result = transaction_service.save_transactions(transactions)
+    
+    # Assert
+    assert result == 5
+    assert chunk_sizes == [2, 2, 1]
+    mock_db.refresh.assert_not_called()
+
+
+def test_save_transactions_skips_invalid_rows(transaction_service, sample_transaction_data, mock_db):
+    """Test that rows failing validation are skipped after one batch validation."""
+    # Arrange
+    valid = TransactionData(**vars(sample_transaction_data))
+    valid.timestamp = "2024-09-06T08:30:28.819"
+    invalid = TransactionData(**vars(valid))
+    invalid.transaction_id = "invalid-type"
+    invalid.type = "unknown"
+    unparseable = TransactionData(**vars(valid))
+    unparseable.transaction_id = "unparseable-timestamp"
+    unparseable.timestamp = "not a timestamp"
+    mock_db.scalars.return_value.all.return_value = [valid.constituency_id]
+    saved_rows = []
+    
+    def create_ignore_existing(db, rows):
+        saved_rows.extend(rows)
+        return len(rows)
+    
+    with patch('app.crud.transaction.transaction_crud.create_ignore_existing',
+               side_effect=create_ignore_existing):
+        # Act
+        result = transaction_service.save_transactions([valid, invalid, unparseable])
+    
+    # Assert
+    assert result == 1
+    assert [row["id"] for row in saved_rows] == [valid.transaction_id]
+    mock_db.scalars.assert_called_once()  # constituencies looked up once
 
 
 def test_save_transactions_duplicate(transaction_service, sample_transaction_data, mock_db):
     """Test saving duplicate transactions to the database."""
     # Arrange
-    with patch('app.crud.transaction.transaction_crud.get_by_constituency') as mock_get_by_constituency:
-        # Create a mock transaction with the same ID
-        mock_transaction = MagicMock()
-        mock_transaction.id = sample_transaction_data.transaction_id
-        mock_get_by_constituency.return_value = [mock_transaction]
+    with patch.object(transaction_service.validator, 'validate_transaction_batch', return_value={}), \
+            patch.object(transaction_service.validator, 'check_duplicate') as mock_check_duplicate, \
+            patch('app.crud.transaction.transaction_crud.create_ignore_existing') as mock_create:
+        mock_create.return_value = 0  # Database skipped the existing ID
         
-        with patch('app.crud.transaction.transaction_crud.create') as mock_create:
-            # Act
-            result = transaction_service.save_transactions([sample_transaction_data])
-            
-            # Assert
-            assert result == 0  # No transactions saved
-            mock_get_by_constituency.assert_called_once_with(
-                db=mock_db,
-                constituency_id=sample_transaction_data.constituency_id
-            )
-            mock_create.assert_not_called()
+        # Act
+        result = transaction_service.save_transactions([sample_transaction_data])
+        
+        # Assert
+        assert result == 0  # No transactions saved
+        mock_check_duplicate.assert_not_called()
+        mock_create.assert_called_once()
+
+
+def test_save_transactions_invalidates_stats(transaction_service, sample_transaction_data, mock_db):
+    """Test that each committed chunk invalidates the cached stats of its constituencies."""
+    # Arrange
+    first = TransactionData(**vars(sample_transaction_data))
+    first.transaction_id = "tx-1"
+    second = TransactionData(**vars(sample_transaction_data))
+    second.transaction_id = "tx-2"
+    second.constituency_id = "other-constituency"
+    invalidated = []
+    
+    with patch.object(transaction_service.validator, 'validate_transaction_batch', return_value={}), \
+            patch('app.crud.transaction.transaction_crud.create_ignore_existing',
+                  side_effect=lambda db, rows: len(rows)), \
+            patch.object(transaction_service_module, 'SAVE_COMMIT_SIZE', 1), \
+            patch.object(transaction_service_module, 'invalidate_transaction_stats',
+                         side_effect=lambda ids: invalidated.append(set(ids))):
+        # Act
+        transaction_service.save_transactions([first, second])
+    
+    # Assert
+    assert invalidated == [{first.constituency_id}, {"other-constituency"}]
+
+
+def test_save_transactions_duplicate_keeps_stats(transaction_service, sample_transaction_data, mock_db):
+    """Test that a chunk that inserts nothing leaves the cached stats alone."""
+    # Arrange
+    with patch.object(transaction_service.validator, 'validate_transaction_batch', return_value={}), \
+            patch('app.crud.transaction.transaction_crud.create_ignore_existing', return_value=0), \
+            patch.object(transaction_service_module, 'invalidate_transaction_stats') as mock_invalidate:
+        # Act
+        transaction_service.save_transactions([sample_transaction_data])
+    
+    # Assert
+    mock_invalidate.assert_not_called()
 
 
 def test_save_transactions_error(transaction_service, sample_transaction_data, mock_db):
     """Test error handling when saving transactions."""
     # Arrange
-    with patch('app.crud.transaction.transaction_crud.get_by_constituency') as mock_get_by_constituency:
-        mock_get_by_constituency.side_effect = Exception("Database error")
+    with patch.object(transaction_service.validator, 'validate_transaction_batch', return_value={}), \
+            patch('app.crud.transaction.transaction_crud.create_ignore_existing') as mock_create:
+        mock_create.side_effect = Exception("Database error")
         
         # Act & Assert
         with pytest.raises(TransactionSaveError):
             transaction_service.save_transactions([sample_transaction_data])
+        mock_db.rollback.assert_called_once()
+
+
+def _constituency_row(registered_voters=1000, bulletins_issued=0, votes_cast=0, participation_rate=0.0):
+    """Build the column row update_constituency_metrics reads."""
+    row = MagicMock()
+    row.registered_voters = registered_voters
+    row.bulletins_issued = bulletins_issued
+    row.votes_cast = votes_cast
+    row.participation_rate = participation_rate
+    return row
 
 
 def test_update_constituency_metrics(transaction_service, mock_db):
     """Test updating constituency metrics."""
     # Arrange
     constituency_id = "AsrxMqfGWsXEgTmvdw95omtQ4Gv1Vi4mGAvLYy23DHpM"
+    mock_db.execute.return_value.first.return_value = _constituency_row()
     
-    # Mock constituency
-    mock_constituency = MagicMock()
-    mock_constituency.registered_voters = 1000
-    
-    # Mock transactions
-    mock_transaction1 = MagicMock()
-    mock_transaction1.type = "blindSigIssue"
-    mock_transaction2 = MagicMock()
-    mock_transaction2.type = "blindSigIssue"
-    mock_transaction3 = MagicMock()
-    mock_transaction3.type = "vote"
+    with patch('app.crud.transaction.transaction_crud.get_transaction_counts_by_type') as mock_counts:
+        mock_counts.return_value = {"blindSigIssue": 2, "vote": 1}
+        
+        # Act
+        transaction_service.update_constituency_metrics(constituency_id)
+        
+        # Assert
+        mock_counts.assert_called_once_with(
+            db=mock_db,
+            constituency_id=constituency_id
+        )
+        
+        # Check that the constituency row was updated in place
+        assert mock_db.execute.call_count == 2
+        update_stmt = mock_db.execute.call_args_list[1].args[0]
+        params = update_stmt.compile().params
+        assert params["bulletins_issued"] == 2
+        assert params["votes_cast"] == 1
+        assert params["participation_rate"] == 0.1  # 1/1000 * 100
+        assert "last_update_time=timezone('utc', now())" in str(update_stmt)
+        mock_db.commit.assert_called_once()
+        mock_db.refresh.assert_not_called()
+
+
+def test_update_constituency_metrics_unchanged(transaction_service, mock_db):
+    """Test that unchanged metrics are not written again."""
+    # Arrange
+    constituency_id = "AsrxMqfGWsXEgTmvdw95omtQ4Gv1Vi4mGAvLYy23DHpM"
+    mock_db.execute.return_value.first.return_value = _constituency_row(
+        bulletins_issued=2, votes_cast=1, participation_rate=0.1
+    )
     
-    with patch('app.crud.constituency.constituency_crud.get') as mock_get:
-        mock_get.return_value = mock_constituency
+    with patch('app.crud.transaction.transaction_crud.get_transaction_counts_by_type') as mock_counts:
+        mock_counts.return_value = {"blindSigIssue": 2, "vote": 1}
         
-        with patch('app.crud.transaction.transaction_crud.get_by_constituency') as mock_get_by_constituency:
-            mock_get_by_constituency.return_value = [mock_transaction1, mock_transaction2, mock_transaction3]
-            
-            # Act
-            transaction_service.update_constituency_metrics(constituency_id)
-            
-            # Assert
-            mock_get.assert_called_once_with(db=mock_db, id=constituency_id)
-            mock_get_by_constituency.assert_called_once_with(
-                db=mock_db,
-                constituency_id=constituency_id
-            )
-            
-            # Check that constituency was updated correctly
-            assert mock_constituency.bulletins_issued == 2
-            assert mock_constituency.votes_cast == 1
-            assert mock_constituency.participation_rate == 0.1  # 1/1000 * 100
-            assert mock_constituency.last_update_time is not None
-            
-            # Check that changes were saved
-            assert mock_db.add.called
-            assert mock_db.commit.called
-            assert mock_db.refresh.called
+        # Act
+        transaction_service.update_constituency_metrics(constituency_id)
+    
+    # Assert
+    assert mock_db.execute.call_count == 1  # only the read
+    mock_db.commit.assert_not_called()
 
 
 def test_update_constituency_metrics_not_found(transaction_service, mock_db):
     """Test updating metrics for a constituency that doesn't exist."""
     # Arrange
     constituency_id = "NonexistentConstituency"
+    mock_db.execute.return_value.first.return_value = None
     
-    with patch('app.crud.constituency.constituency_crud.get') as mock_get:
-        mock_get.return_value = None
-        
-        # Act & Assert
-        with pytest.raises(MetricsUpdateError):
-            transaction_service.update_constituency_metrics(constituency_id)
+    # Act & Assert
+    with pytest.raises(MetricsUpdateError):
+        transaction_service.update_constituency_metrics(constituency_id)
 
 
 def test_update_constituency_metrics_error(transaction_service, mock_db):
     """Test error handling when updating constituency metrics."""
     # Arrange
     constituency_id = "AsrxMqfGWsXEgTmvdw95omtQ4Gv1Vi4mGAvLYy23DHpM"
+    mock_db.execute.side_effect = Exception("Database error")
     
-    with patch('app.crud.constituency.constituency_crud.get') as mock_get:
-        mock_get.side_effect = Exception("Database error")
-        
-        # Act & Assert
-        with pytest.raises(MetricsUpdateError):
-            transaction_service.update_constituency_metrics(constituency_id)
-        
-        # Check that transaction was rolled back
-        assert mock_db.rollback.called
+    # Act & Assert
+    with pytest.raises(MetricsUpdateError):
+        transaction_service.update_constituency_metrics(constituency_id)
+    
+    # Check that transaction was rolled back
+    assert mock_db.rollback.called
 
 
 def test_get_transaction_statistics(transaction_service, mock_db):
@@ -180,22 +290,13 @@ def test_get_transaction_statistics(transaction_service, mock_db):
     mock_constituency.participation_rate = 75.0
     mock_constituency.registered_voters = 200
     
-    # Mock transactions
-    mock_transaction1 = MagicMock()
-    mock_transaction1.type = "blindSigIssue"
-    mock_transaction1.timestamp = datetime(2024, 9, 6, 8, 0, 0)
-    mock_transaction2 = MagicMock()
-    mock_transaction2.type = "blindSigIssue"
-    mock_transaction2.timestamp = datetime(2024, 9, 6, 8, 15, 0)
-    mock_transaction3 = MagicMock()
-    mock_transaction3.type = "vote"
-    mock_transaction3.timestamp = datetime(2024, 9, 6, 8, 30, 0)
-    
     with patch('app.crud.constituency.constituency_crud.get') as mock_get:
         mock_get.return_value = mock_constituency
         
-        with patch('app.crud.transaction.transaction_crud.get_by_constituency') as mock_get_by_constituency:
-            mock_get_by_constituency.return_value = [mock_transaction1, mock_transaction2, mock_transaction3]
+        with patch('app.crud.transaction.transaction_crud.get_transaction_counts_by_type') as mock_counts, \
+                patch('app.crud.transaction.transaction_crud.get_latest_timestamp') as mock_latest:
+            mock_counts.return_value = {"blindSigIssue": 2, "vote": 1}
+            mock_latest.return_value = datetime(2024, 9, 6, 8, 30, 0)
             
             # Act
             result = transaction_service.get_transaction_statistics(constituency_id)
@@ -439,7 +540,26 @@ def test_process_transaction_batch(transaction_service, mock_db):
             # Assert
             assert result == mock_result
             mock_validate.assert_called_once_with(mock_db, transactions)
-            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions)
+            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions, commit=False)
+            mock_db.commit.assert_called_once()
+
+
+def test_process_transaction_batch_invalidates_stats(transaction_service, mock_db):
+    """Test that a committed batch invalidates the cached stats of its constituencies."""
+    # Arrange
+    transactions = [MagicMock(constituency_id="c1"), MagicMock(constituency_id="c2")]
+    invalidated = []
+    
+    with patch.object(transaction_service.validator, 'validate_transaction_batch', return_value={}), \
+            patch('app.crud.transaction.transaction_crud.create_batch',
+                  return_value={"success": True, "processed": 2, "failed": 0, "errors": []}), \
+            patch.object(transaction_service_module, 'invalidate_transaction_stats',
+                         side_effect=lambda ids: invalidated.append(set(ids))):
+        # Act
+        transaction_service.process_transaction_batch(transactions)
+    
+    # Assert
+    assert invalidated == [{"c1", "c2"}]
 
 
 def test_process_transaction_batch_with_validation_errors(transaction_service, mock_db):
@@ -470,7 +590,120 @@ def test_process_transaction_batch_with_validation_errors(transaction_service, m
             assert result["errors"][0]["index"] == 1
             assert result["errors"][0]["validation_errors"] == ["Constituency not found"]
             mock_validate.assert_called_once_with(mock_db, transactions)
-            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions)
+            mock_create_batch.assert_called_once_with(db=mock_db, obj_in_list=transactions, commit=False)
+
+
+def test_process_transaction_batch_in_chunks(transaction_service, mock_db):
+    """Test that a batch is inserted chunk by chunk with rebased error indexes."""
+    # Arrange
+    transactions = [MagicMock() for _ in range(5)]
+    chunk_results = [
+        {"success": True, "processed": 2, "failed": 0, "errors": []},
+        {"success": False, "processed": 1, "failed": 1, "errors": [{"index": 1, "error": "Database error"}]},
+        {"success": True, "processed": 1, "failed": 0, "errors": []},
+    ]
+    
+    with patch.object(transaction_service.validator, 'validate_transaction_batch', return_value={}), \
+            patch('app.crud.transaction.transaction_crud.create_batch', side_effect=chunk_results) as mock_create_batch, \
+            patch.object(transaction_service_module, 'BATCH_CHUNK_SIZE', 2):
+        # Act
+        result = transaction_service.process_transaction_batch(transactions)
+    
+    # Assert
+    assert mock_create_batch.call_count == 3
+    assert result["success"] is False
+    assert result["processed"] == 4
+    assert result["failed"] == 1
+    assert result["errors"] == [{"index": 3, "error": "Database error"}]
+    mock_db.commit.assert_called_once()
+
+
+
+def test_process_transaction_batch_rolls_back_earlier_chunks(file_session_factory):
+    """Test that a failing chunk also undoes the chunks inserted before it."""
+    # Arrange
+    db = file_session_factory()
+    election = Election(
+        id="batch-election",
+        name="Test Election",
+        country="Test Country",
+        start_date=datetime(2024, 9, 6),
+        end_date=datetime(2024, 9, 7),
+        status="ACTIVE",
+        type="GENERAL",
+        timezone="UTC"
+    )
+    db.add_all([election, Constituency(id="batch-constituency", election_id=election.id,
+                                       name="Test Constituency", region="Test Region")])
+    db.commit()
+    transactions = [
+        TransactionCreate(
+            constituency_id="batch-constituency",
+            block_height=i,
+            timestamp=datetime(2024, 9, 6, 8, 30),
+            type="vote",
+            raw_data={"key": "operation", "stringValue": "vote"},
+            source="batch"
+        )
+        for i in range(5)
+    ]
+    create_batch = transaction_crud.create_batch
+    calls = []
+    
+    def fail_on_third_chunk(*args, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 3:
+            raise Exception("Database error")
+        return create_batch(*args, **kwargs)
+    
+    with patch('app.crud.transaction.transaction_crud.create_batch', side_effect=fail_on_third_chunk), \
+            patch.object(transaction_service_module, 'BATCH_CHUNK_SIZE', 2):
+        # Act
+        with pytest.raises(TransactionSaveError):
+            TransactionService(db=db).process_transaction_batch(transactions)
+    
+    # Assert
+    with file_session_factory() as check_db:
+        assert check_db.query(Transaction).count() == 0
+    db.close()
+
+
+
+def test_single_row_writes_invalidate_stats(clean_db):
+    """Test that creating and deleting one transaction refreshes the cached statistics."""
+    # Arrange
+    election = Election(
+        id="stats-election",
+        name="Test Election",
+        country="Test Country",
+        start_date=datetime(2024, 9, 6),
+        end_date=datetime(2024, 9, 7),
+        status="ACTIVE",
+        type="GENERAL",
+        timezone="UTC"
+    )
+    clean_db.add_all([election, Constituency(id="stats-constituency", election_id=election.id,
+                                             name="Test Constituency", region="Test Region")])
+    clean_db.commit()
+    service = TransactionService(db=clean_db)
+    
+    with patch.object(query_service_module, "stats_cache", MetricsCacheService()):
+        query_service = TransactionQueryService(db=clean_db)
+        assert query_service.get_transaction_counts_by_type("stats-constituency") == {}
+        
+        # Act & Assert
+        transaction = service.create_transaction(TransactionCreate(
+            constituency_id="stats-constituency",
+            block_height=1,
+            timestamp=datetime(2024, 9, 6, 8, 30),
+            type="vote",
+            raw_data={"key": "operation", "stringValue": "vote"},
+            source="api"
+        ))
+        assert query_service.get_transaction_counts_by_type("stats-constituency") == {"vote": 1}
+        
+        assert service.delete_transaction(transaction.id) is True
+        assert query_service.get_transaction_counts_by_type("stats-constituency") == {}
 
 
 def test_get_transaction_statistics_error(transaction_service, mock_db):
@@ -8,6 +8,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime
 
+from app.services import transaction_validator as transaction_validator_module
 from app.services.transaction_validator import TransactionValidator
 from app.models.schemas.transaction import TransactionCreate
 from app.api.errors.exceptions import TransactionValidationError
@@ -43,72 +44,28 @@ def sample_transaction():
 def test_validate_transaction_valid(transaction_validator, sample_transaction, mock_db):
     """Test validating a valid transaction."""
     # Arrange
-    with patch('app.crud.constituency.constituency_crud.get') as mock_get:
-        mock_get.return_value = MagicMock()  # Constituency exists
-        
-        # Act
-        errors = transaction_validator.validate_transaction(mock_db, sample_transaction)
-        
-        # Assert
-        assert errors == []
-        mock_get.assert_called_once_with(db=mock_db, id=sample_transaction.constituency_id)
+    mock_db.scalar.return_value = True  # Constituency exists
+    
+    # Act
+    errors = transaction_validator.validate_transaction(mock_db, sample_transaction)
+    
+    # Assert
+    assert errors == []
+    mock_db.scalar.assert_called_once()
 
 
 def test_validate_transaction_invalid_constituency(transaction_validator, sample_transaction, mock_db):
     """Test validating a transaction with an invalid constituency."""
     # Arrange
-    with patch('app.crud.constituency.constituency_crud.get') as mock_get:
-        mock_get.return_value = None  # Constituency doesn't exist
-        
-        # Act
-        errors = transaction_validator.validate_transaction(mock_db, sample_transaction)
-        
-        # Assert
-        assert len(errors) == 1
-        assert "Constituency not found" in errors[0]
-        mock_get.assert_called_once_with(db=mock_db, id=sample_transaction.constituency_id)
-
-
-def test_validate_transaction_invalid_type(transaction_validator, mock_db):
-    """Test validating a transaction with an invalid type."""
-    # Arrange
-    invalid_transaction = TransactionCreate(
-        constituency_id="AsrxMqfGWsXEgTmvdw95omtQ4Gv1Vi4mGAvLYy23DHpM",
-        block_height=104,
-        timestamp=datetime.fromisoformat("2024-09-06T08:30:28.819Z"),
-        type="invalid_type",  # Invalid type
-        raw_data={"key": "operation", "stringValue": "invalid_type"},
-        operation_data={"key": "INVALID_65dbpXPGsbH3UsuYfvshDQsC9AcHTQx3emmKWbZKYQQS"},
-        status="processed",
-        source="api"
-    )
+    mock_db.scalar.return_value = False  # Constituency doesn't exist
     
-    # Act & Assert
-    with pytest.raises(ValueError) as excinfo:
-        transaction_validator.validate_transaction(mock_db, invalid_transaction)
+    # Act
+    errors = transaction_validator.validate_transaction(mock_db, sample_transaction)
     
-    assert "Type must be one of" in str(excinfo.value)
-
-
-def test_validate_transaction_invalid_status(transaction_validator, mock_db):
-    """Test validating a transaction with an invalid status."""
-    # Arrange
-    invalid_transaction = TransactionCreate(
-        constituency_id="AsrxMqfGWsXEgTmvdw95omtQ4Gv1Vi4mGAvLYy23DHpM",
-        block_height=104,
-        timestamp=datetime.fromisoformat("2024-09-06T08:30:28.819Z"),
-        type="blindSigIssue",
-        raw_data={"key": "operation", "stringValue": "blindSigIssue"},
-        operation_data={"key": "BLINDSIG_65dbpXPGsbH3UsuYfvshDQsC9AcHTQx3emmKWbZKYQQS"},
-        status="invalid_status",  # Invalid status
-        source="api"
-    )
-    
-    # Act & Assert
-    with pytest.raises(ValueError) as excinfo:
-        transaction_validator.validate_transaction(mock_db, invalid_transaction)
-    
-    assert "Status must be one of" in str(excinfo.value)
+    # Assert
+    assert len(errors) == 1
+    assert "Constituency not found" in errors[0]
+    mock_db.scalar.assert_called_once()
 
 
 def test_validate_transaction_invalid_source(transaction_validator, mock_db):
@@ -137,15 +94,14 @@ def test_check_duplicate_exists(transaction_validator, mock_db):
     # Arrange
     transaction_id = "65dbpXPGsbH3UsuYfvshDQsC9AcHTQx3emmKWbZKYQQS"
     
-    with patch('app.crud.transaction.transaction_crud.get') as mock_get:
-        mock_get.return_value = MagicMock()  # Transaction exists
-        
-        # Act
-        result = transaction_validator.check_duplicate(mock_db, transaction_id)
-        
-        # Assert
-        assert result is True
-        mock_get.assert_called_once_with(db=mock_db, id=transaction_id)
+    mock_db.scalar.return_value = True  # Transaction exists
+    
+    # Act
+    result = transaction_validator.check_duplicate(mock_db, transaction_id)
+    
+    # Assert
+    assert result is True
+    assert "EXISTS" in str(mock_db.scalar.call_args.args[0])
 
 
 def test_check_duplicate_not_exists(transaction_validator, mock_db):
@@ -153,49 +109,212 @@ def test_check_duplicate_not_exists(transaction_validator, mock_db):
     # Arrange
     transaction_id = "65dbpXPGsbH3UsuYfvshDQsC9AcHTQx3emmKWbZKYQQS"
     
-    with patch('app.crud.transaction.transaction_crud.get') as mock_get:
-        mock_get.return_value = None  # Transaction doesn't exist
-        
-        # Act
-        result = transaction_validator.check_duplicate(mock_db, transaction_id)
-        
-        # Assert
-        assert result is False
-        mock_get.assert_called_once_with(db=mock_db, id=transaction_id)
+    mock_db.scalar.return_value = False  # Transaction doesn't exist
+    
+    # Act
+    result = transaction_validator.check_duplicate(mock_db, transaction_id)
+    
+    # Assert
+    assert result is False
+    mock_db.scalar.assert_called_once()
+
+
+def _batch_transaction(constituency_id="known", **overrides):
+    """Build a naive-timestamp transaction for batch validation tests."""
+    data = dict(
+        constituency_id=constituency_id,
+        block_height=104,
+        timestamp=datetime(2024, 9, 6, 8, 30),
+        type="vote",
+        raw_data={"key": "operation", "stringValue": "vote"}
+    )
+    data.update(overrides)
+    return TransactionCreate(**data)
 
 
-def test_validate_transaction_batch(transaction_validator, sample_transaction, mock_db):
+def test_validate_transaction_batch(transaction_validator, mock_db):
     """Test validating a batch of transactions."""
     # Arrange
-    transactions = [sample_transaction, sample_transaction]
+    transactions = [_batch_transaction(), _batch_transaction()]
+    mock_db.scalars.return_value.all.return_value = ["known"]
     
-    with patch.object(transaction_validator, 'validate_transaction') as mock_validate:
-        mock_validate.return_value = []  # No errors
-        
-        # Act
-        result = transaction_validator.validate_transaction_batch(mock_db, transactions)
-        
-        # Assert
-        assert result == {}  # No errors
-        assert mock_validate.call_count == 2
+    # Act
+    result = transaction_validator.validate_transaction_batch(mock_db, transactions)
+    
+    # Assert
+    assert result == {}  # No errors
 
 
-def test_validate_transaction_batch_with_errors(transaction_validator, sample_transaction, mock_db):
+def test_validate_transaction_batch_with_errors(transaction_validator, mock_db):
     """Test validating a batch of transactions with errors."""
     # Arrange
-    transactions = [sample_transaction, sample_transaction]
+    transactions = [_batch_transaction(), _batch_transaction("unknown")]
+    mock_db.scalars.return_value.all.return_value = ["known"]
+    
+    # Act
+    result = transaction_validator.validate_transaction_batch(mock_db, transactions)
+    
+    # Assert
+    assert len(result) == 1
+    assert 1 in result  # Error for second transaction (index 1)
+    assert result[1] == ["Constituency with ID unknown does not exist"]
+
+
+def test_validate_transaction_batch_skips_lookup_for_invalid_rows(transaction_validator, mock_db):
+    """Test that rows failing in-memory checks are not looked up in the database."""
+    # Arrange
+    transactions = [_batch_transaction("bad-row", block_height=0), _batch_transaction()]
+    mock_db.scalars.return_value.all.return_value = ["known"]
+    
+    # Act
+    result = transaction_validator.validate_transaction_batch(mock_db, transactions)
+    
+    # Assert
+    assert result == {0: ["Block height must be a positive integer"]}
+    lookup_sql = mock_db.scalars.call_args.args[0].compile()
+    assert list(lookup_sql.params.values()) == [["known"]]
+
+
+def test_validate_transaction_batch_looks_up_constituencies_once(transaction_validator, mock_db):
+    """Test that a batch looks up all constituencies with a single query."""
+    # Arrange
+    transactions = [
+        TransactionCreate(
+            constituency_id=constituency_id,
+            block_height=104,
+            timestamp=datetime(2024, 9, 6, 8, 30),
+            type="vote",
+            raw_data={"key": "operation", "stringValue": "vote"}
+        )
+        for constituency_id in ["known", "known", "unknown"]
+    ]
+    mock_db.scalars.return_value.all.return_value = ["known"]
+    
+    # Act
+    result = transaction_validator.validate_transaction_batch(mock_db, transactions)
+    
+    # Assert
+    assert result == {2: ["Constituency with ID unknown does not exist"]}
+    mock_db.scalars.assert_called_once()
+    mock_db.scalar.assert_not_called()
+
+
+def test_get_existing_transaction_ids(transaction_validator, mock_db):
+    """Test that stored transaction IDs are fetched with one query."""
+    # Arrange
+    mock_db.scalars.return_value.all.return_value = ["tx-1"]
+    
+    # Act
+    result = transaction_validator.get_existing_transaction_ids(mock_db, ["tx-1", "tx-2", "tx-1"])
+    
+    # Assert
+    assert result == {"tx-1"}
+    mock_db.scalars.assert_called_once()
+
+
+def test_get_existing_transaction_ids_empty(transaction_validator, mock_db):
+    """Test that no query is issued for an empty ID list."""
+    assert transaction_validator.get_existing_transaction_ids(mock_db, []) == set()
+    mock_db.scalars.assert_not_called()
+
+
+def test_validate_constituency_exists_with_known_ids(transaction_validator, mock_db):
+    """Test that a prefetched ID set answers existence checks without a query."""
+    assert transaction_validator._validate_constituency_exists(mock_db, "known", {"known"}) is True
+    assert transaction_validator._validate_constituency_exists(mock_db, "unknown", {"known"}) is False
+    mock_db.scalar.assert_not_called()
+
+
+def test_validate_constituency_exists_remembers_found_ids(transaction_validator, mock_db):
+    """Test that a confirmed constituency is not looked up again."""
+    mock_db.scalar.return_value = True
+    
+    assert transaction_validator._validate_constituency_exists(mock_db, "known") is True
+    assert transaction_validator._validate_constituency_exists(mock_db, "known") is True
     
-    with patch.object(transaction_validator, 'validate_transaction') as mock_validate:
-        mock_validate.side_effect = [
-            [],  # No errors for first transaction
-            ["Constituency not found"]  # Error for second transaction
-        ]
+    mock_db.scalar.assert_called_once()
+
+
+def test_validate_constituency_exists_does_not_remember_missing_ids(transaction_validator, mock_db):
+    """Test that a missing constituency is looked up again on the next call."""
+    mock_db.scalar.return_value = False
+    
+    transaction_validator._validate_constituency_exists(mock_db, "missing")
+    transaction_validator._validate_constituency_exists(mock_db, "missing")
+    
+    assert mock_db.scalar.call_count == 2
+
+
+def test_get_existing_constituency_ids_queries_only_unknown_ids(transaction_validator, mock_db):
+    """Test that batch lookups skip constituencies confirmed by an earlier batch."""
+    mock_db.scalars.return_value.all.return_value = ["a"]
+    assert transaction_validator.get_existing_constituency_ids(mock_db, ["a", "b"]) == {"a"}
+    
+    mock_db.scalars.reset_mock()
+    assert transaction_validator.get_existing_constituency_ids(mock_db, ["a"]) == {"a"}
+    mock_db.scalars.assert_not_called()
+
+
+
+def test_constituency_cache_evicts_least_recently_used(transaction_validator, mock_db):
+    """Test that a full constituency cache evicts only its least recently used ID."""
+    mock_db.scalar.return_value = True
+    
+    with patch.object(transaction_validator_module, "CONSTITUENCY_CACHE_SIZE", 2):
+        transaction_validator._validate_constituency_exists(mock_db, "a")
+        transaction_validator._validate_constituency_exists(mock_db, "b")
+        transaction_validator._validate_constituency_exists(mock_db, "a")  # "b" is now least recent
+        transaction_validator._validate_constituency_exists(mock_db, "c")
+        mock_db.scalar.reset_mock()
         
-        # Act
-        result = transaction_validator.validate_transaction_batch(mock_db, transactions)
+        transaction_validator._validate_constituency_exists(mock_db, "a")
+        transaction_validator._validate_constituency_exists(mock_db, "c")
+        mock_db.scalar.assert_not_called()
         
-        # Assert
-        assert len(result) == 1
-        assert 1 in result  # Error for second transaction (index 1)
-        assert result[1] == ["Constituency not found"]
-        assert mock_validate.call_count == 2
\ No newline at end of file
+        transaction_validator._validate_constituency_exists(mock_db, "b")
+        mock_db.scalar.assert_called_once()
+
+
+def test_constituency_cache_entries_expire(transaction_validator, mock_db):
+    """Test that a remembered constituency is looked up again once its entry expires."""
+    mock_db.scalar.return_value = True
+    
+    with patch.object(transaction_validator_module.time, "monotonic", return_value=1000.0):
+        transaction_validator._validate_constituency_exists(mock_db, "deleted")
+    
+    mock_db.scalar.return_value = False
+    expired = 1000.0 + transaction_validator_module.CONSTITUENCY_CACHE_TTL
+    with patch.object(transaction_validator_module.time, "monotonic", return_value=expired):
+        assert transaction_validator._validate_constituency_exists(mock_db, "deleted") is False
+    
+    assert mock_db.scalar.call_count == 2
+
+
+def test_get_existing_transaction_ids_in_chunks(transaction_validator, mock_db):
+    """Test that large ID lists are looked up in bounded IN chunks."""
+    # Arrange
+    mock_db.scalars.return_value.all.return_value = []
+    
+    with patch.object(transaction_validator_module, 'IN_CLAUSE_CHUNK_SIZE', 2):
+        # Act
+        transaction_validator.get_existing_transaction_ids(mock_db, [f"tx-{i}" for i in range(5)])
+    
+    # Assert
+    assert mock_db.scalars.call_count == 3
+
+
+@pytest.mark.parametrize("field, value", [("type", "invalid_type"), ("status", "invalid_status")])
+def test_schema_enforces_type_and_status(field, value):
+    """Test that the schema rejects the type and status the validator no longer checks."""
+    data = {
+        "constituency_id": "AsrxMqfGWsXEgTmvdw95omtQ4Gv1Vi4mGAvLYy23DHpM",
+        "block_height": 104,
+        "timestamp": datetime(2024, 9, 6, 8, 30, 28),
+        "type": "vote",
+        "raw_data": {"key": "operation", "stringValue": "vote"},
+        "status": "processed",
+        field: value
+    }
+    
+    with pytest.raises(ValueError):
+        TransactionCreate(**data)
@@ -0,0 +1,215 @@
+"""
+Tests for the Transaction CRUD operations.
+
+This module contains tests for the Transaction CRUD operations.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from app.models.transaction import Transaction
+from app.models.constituency import Constituency
+from app.models.election import Election
+from app.crud.constituency import constituency_crud
+from app.crud.transaction import transaction_crud
+from app.models.schemas.transaction import TransactionCreate
+
+
+@pytest.fixture
+def constituency(clean_db):
+    """Create a test constituency with its election."""
+    election = Election(
+        id="txn-crud-election",
+        name="Test Election",
+        country="Test Country",
+        start_date=datetime.utcnow(),
+        end_date=datetime.utcnow() + timedelta(days=1),
+        status="ACTIVE",
+        type="GENERAL",
+        timezone="UTC"
+    )
+    constituency = Constituency(
+        id="txn-crud-constituency",
+        election_id=election.id,
+        name="Test Constituency",
+        region="Test Region",
+        registered_voters=1000
+    )
+    clean_db.add_all([election, constituency])
+    clean_db.commit()
+    return constituency
+
+
+def _transaction(constituency_id: str, block_height: int) -> TransactionCreate:
+    return TransactionCreate(
+        constituency_id=constituency_id,
+        block_height=block_height,
+        timestamp=datetime(2024, 9, 6, 8, 30),
+        type="vote",
+        raw_data={"key": "operation", "stringValue": "vote"},
+        source="batch"
+    )
+
+
+def test_create_batch(clean_db, constituency):
+    """Test that a batch of transactions is inserted in one pass."""
+    transactions = [_transaction(constituency.id, i) for i in range(5)]
+
+    result = transaction_crud.create_batch(clean_db, obj_in_list=transactions)
+
+    assert result == {"success": True, "processed": 5, "failed": 0, "errors": []}
+    stored = clean_db.query(Transaction).filter(Transaction.constituency_id == constituency.id).all()
+    assert sorted(t.block_height for t in stored) == [0, 1, 2, 3, 4]
+    assert all(t.id and t.created_at for t in stored)
+
+
+def test_create_batch_reports_failed_rows(clean_db, constituency):
+    """Test that rows failing the bulk insert are reported individually."""
+    transactions = [
+        _transaction(constituency.id, 1),
+        _transaction("missing-constituency", 2),
+    ]
+
+    result = transaction_crud.create_batch(clean_db, obj_in_list=transactions)
+
+    assert result["success"] is False
+    assert result["processed"] == 1
+    assert result["failed"] == 1
+    assert result["errors"][0]["index"] == 1
+
+
+def test_get_transactions_with_filters_total(clean_db, constituency):
+    """Test that the total counts every filtered row, not just the page."""
+    transaction_crud.create_batch(
+        clean_db, obj_in_list=[_transaction(constituency.id, i) for i in range(5)]
+    )
+
+    transactions, total = transaction_crud.get_transactions_with_filters(
+        clean_db, constituency_id=constituency.id, limit=2
+    )
+
+    assert len(transactions) == 2
+    assert total == 5
+    assert transaction_crud.count(clean_db) == 5
+
+
+def test_create_ignore_existing(clean_db, constituency):
+    """Test that rows with an already stored ID are skipped by the insert."""
+    rows = [
+        {"id": f"tx-{i}", **_transaction(constituency.id, i).model_dump()}
+        for i in range(3)
+    ]
+    assert transaction_crud.create_ignore_existing(clean_db, rows=rows[:2]) == 2
+
+    inserted = transaction_crud.create_ignore_existing(clean_db, rows=rows)
+
+    assert inserted == 1
+    assert transaction_crud.count(clean_db) == 3
+
+
+def test_get_transaction_counts_by_type_for_constituency(clean_db, constituency):
+    """Test that type counts can be restricted to one constituency."""
+    transactions = [_transaction(constituency.id, i) for i in range(3)]
+    transactions[0].type = "blindSigIssue"
+    transaction_crud.create_batch(clean_db, obj_in_list=transactions)
+
+    counts = transaction_crud.get_transaction_counts_by_type(
+        clean_db, constituency_id=constituency.id
+    )
+
+    assert counts == {"blindSigIssue": 1, "vote": 2}
+    assert transaction_crud.get_transaction_counts_by_type(
+        clean_db, constituency_id="other-constituency"
+    ) == {}
+
+
+def test_get_latest_timestamp(clean_db, constituency):
+    """Test that the latest timestamp is read with a MAX aggregate."""
+    transactions = [_transaction(constituency.id, i) for i in range(3)]
+    transactions[1].timestamp = datetime(2024, 9, 6, 9, 45)
+    transaction_crud.create_batch(clean_db, obj_in_list=transactions)
+
+    assert transaction_crud.get_latest_timestamp(
+        clean_db, constituency_id=constituency.id
+    ) == datetime(2024, 9, 6, 9, 45)
+    assert transaction_crud.get_latest_timestamp(
+        clean_db, constituency_id="other-constituency"
+    ) is None
+
+
+def test_get_by_constituency_stream(clean_db, constituency):
+    """Test that a constituency's transactions can be streamed in chunks."""
+    transaction_crud.create_batch(
+        clean_db, obj_in_list=[_transaction(constituency.id, i) for i in range(5)]
+    )
+
+    stream = transaction_crud.get_by_constituency_stream(
+        clean_db, constituency_id=constituency.id, chunk_size=2
+    )
+
+    assert not isinstance(stream, list)
+    assert sorted(t.block_height for t in stream) == [0, 1, 2, 3, 4]
+
+
+def test_get_transactions_with_filters_past_last_page(clean_db, constituency):
+    """Test that the total is still reported for a page past the last one."""
+    transaction_crud.create_batch(
+        clean_db, obj_in_list=[_transaction(constituency.id, i) for i in range(3)]
+    )
+
+    transactions, total = transaction_crud.get_transactions_with_filters(
+        clean_db, constituency_id=constituency.id, page=3, limit=2
+    )
+
+    assert transactions == []
+    assert total == 3
+
+
+def test_get_uses_identity_map(clean_db, constituency):
+    """Test that getting an already loaded row is served from the identity map."""
+    assert constituency_crud.get(clean_db, constituency.id) is constituency
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(clean_db.get_bind(), "before_cursor_execute", record)
+    try:
+        assert constituency_crud.get(clean_db, constituency.id) is constituency
+    finally:
+        event.remove(clean_db.get_bind(), "before_cursor_execute", record)
+
+    assert statements == []
+
+
+@pytest.mark.parametrize("failing_rows", [0, 1])
+def test_create_batch_without_commit_rolls_back(file_session_factory, failing_rows):
+    """Test that an uncommitted batch on a file-backed SQLite engine is undone by a rollback."""
+    with file_session_factory() as db:
+        election = Election(
+            id="txn-crud-election",
+            name="Test Election",
+            country="Test Country",
+            start_date=datetime.utcnow(),
+            end_date=datetime.utcnow() + timedelta(days=1),
+            status="ACTIVE",
+            type="GENERAL",
+            timezone="UTC"
+        )
+        db.add_all([election, Constituency(id="txn-crud-constituency", election_id=election.id,
+                                           name="Test Constituency", region="Test Region")])
+        db.commit()
+
+    # A row for an unknown constituency sends create_batch down its
+    # row-by-row fallback
+    transactions = [_transaction("txn-crud-constituency", i) for i in range(3)]
+    transactions += [_transaction("missing-constituency", 3)] * failing_rows
+
+    with file_session_factory() as db:
+        result = transaction_crud.create_batch(db, obj_in_list=transactions, commit=False)
+        assert result["processed"] == 3
+        db.rollback()
+
+    with file_session_factory() as db:
+        assert db.query(Transaction).count() == 0